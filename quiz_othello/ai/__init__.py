@@ -0,0 +1,4 @@
+"""
+ai パッケージ
+コンピュータ対戦用の探索エンジンを提供するモジュール群
+"""
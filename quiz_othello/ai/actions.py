@@ -0,0 +1,70 @@
+"""
+探索で扱う行動（通常の手とアタックチャンス）を整数で表すモジュール
+
+通常の手は盤面の位置番号（row * 8 + col）、アタックチャンスは
+ATTACK_OFFSET に対象の位置番号を足した値で表す。置換表や棋譜にも
+この値をそのまま保存する。
+"""
+
+from game.constants import BOARD_SIZE, ACTION_MOVE, ACTION_ATTACK
+
+# アタックチャンスを表す行動の開始値
+ATTACK_OFFSET = BOARD_SIZE * BOARD_SIZE
+
+
+def encode_move(row, col):
+    """
+    通常の手を行動値に変換する
+    
+    Args:
+        row (int): 行インデックス
+        col (int): 列インデックス
+        
+    Returns:
+        int: 行動値
+    """
+    return row * BOARD_SIZE + col
+
+
+def encode_attack(row, col):
+    """
+    アタックチャンスを行動値に変換する
+    
+    Args:
+        row (int): 対象の行インデックス
+        col (int): 対象の列インデックス
+        
+    Returns:
+        int: 行動値
+    """
+    return ATTACK_OFFSET + row * BOARD_SIZE + col
+
+
+def is_attack(action):
+    """
+    行動値がアタックチャンスかどうかを返す
+    
+    Args:
+        action (int): 行動値
+        
+    Returns:
+        bool: アタックチャンスかどうか
+    """
+    return action >= ATTACK_OFFSET
+
+
+def decode_action(action):
+    """
+    行動値を種類と位置に変換する
+    
+    Args:
+        action (int): 行動値
+        
+    Returns:
+        tuple: (ACTION_MOVE または ACTION_ATTACK, row, col)
+    """
+    if action >= ATTACK_OFFSET:
+        row, col = divmod(action - ATTACK_OFFSET, BOARD_SIZE)
+        return ACTION_ATTACK, row, col
+    row, col = divmod(action, BOARD_SIZE)
+    return ACTION_MOVE, row, col
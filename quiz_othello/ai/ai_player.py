@@ -0,0 +1,118 @@
+"""
+コンピュータプレイヤーを管理するモジュール
+"""
+
+import random
+import time
+
+from game.player import Player
+from quiz.quiz_manager import QuizManager
+from .actions import decode_action
+from .endgame import EndgameSolver, ENDGAME_EMPTIES, ENDGAME_TIME_RATIO, count_empties, endgame_empties_limit
+from .search import SearchEngine, SearchTimeout, DEFAULT_SUCCESS_RATES
+
+
+class AIPlayer(Player):
+    """探索エンジンで手を選ぶプレイヤークラス"""
+    
+    is_ai = True
+    
+    def __init__(self, player_id, name, engine=None, quiz_accuracy=None, seed=None,
+                 endgame_empties=ENDGAME_EMPTIES, book=None):
+        """
+        コンピュータプレイヤーを初期化
+        
+        Args:
+            player_id (int): プレイヤーID（0:黒, 1:白）
+            name (str): プレイヤー名
+            engine (SearchEngine): 探索エンジン、省略時はクイズ正解率を成功確率とするエンジンを作成
+            quiz_accuracy (dict): 難易度ごとのクイズ正解率（省略時は DEFAULT_SUCCESS_RATES）
+            seed (int): クイズの回答に使う乱数のシード
+            endgame_empties (int): アタックチャンスが残っていない場合に完全読みに切り替える空きマス数
+                                   （0の場合は完全読みを行わない、残っている場合は endgame_empties_limit 参照）
+            book (OpeningBook): 定跡、定跡に有る局面では探索せずに定跡手を選ぶ
+        """
+        super().__init__(player_id, name)
+        self.quiz_accuracy = dict(quiz_accuracy or DEFAULT_SUCCESS_RATES)
+        self.engine = engine or SearchEngine(success_rates=self.quiz_accuracy)
+        self.random = random.Random(seed)
+        self.endgame_empties = endgame_empties
+        self.endgame_solver = EndgameSolver(success_rates=self.quiz_accuracy)
+        self.book = book
+        self.last_result = None  # 直前の探索結果
+    
+    def on_game_start(self, initial_attack_chances):
+        """
+        ゲーム開始時に探索エンジンと完全読みにアタックチャンスの初期回数を設定する
+        
+        Args:
+            initial_attack_chances (tuple): (黒の初期回数, 白の初期回数)
+        """
+        self.engine.set_initial_attack_chances(initial_attack_chances)
+        self.endgame_solver.set_initial_attack_chances(initial_attack_chances)
+    
+    def choose_action(self, board, attack_chances):
+        """
+        次の行動を選ぶ
+        
+        Args:
+            board (Board): 盤面
+            attack_chances (tuple): (黒の残り回数, 白の残り回数)
+            
+        Returns:
+            tuple: (ACTION_MOVE または ACTION_ATTACK, row, col)、行動が無い場合はNone
+        """
+        start_time = time.perf_counter()
+        time_limit = None
+        book_entry = self.book.probe(board, self.player_id, attack_chances) if self.book else None
+        if book_entry is not None:
+            self.last_result = {
+                "action": book_entry["action"],
+                "score": book_entry["score"],
+                "depth": 0,
+                "nodes": 0,
+                "time": 0.0,
+            }
+        elif count_empties(board) <= endgame_empties_limit(attack_chances, self.endgame_empties):
+            self.last_result = self._solve_endgame(board, attack_chances)
+            # 読み切れなかった場合は、完全読みに使った時間を除いた残りの持ち時間で通常の探索を行う
+            time_limit = max(0.0, self.engine.time_limit - (time.perf_counter() - start_time))
+        else:
+            self.last_result = None
+        
+        if self.last_result is None:
+            self.last_result = self.engine.search(board, self.player_id, attack_chances, time_limit)
+        action = self.last_result["action"]
+        if action is None:
+            return None
+        return decode_action(action)
+    
+    def _solve_endgame(self, board, attack_chances):
+        """
+        持ち時間の一部を使って終局まで読み切る（内部メソッド）
+        
+        Args:
+            board (Board): 盤面
+            attack_chances (tuple): (黒の残り回数, 白の残り回数)
+            
+        Returns:
+            dict: 読み切りの結果、時間内に読み切れなかった場合はNone
+        """
+        time_limit = self.engine.time_limit * ENDGAME_TIME_RATIO
+        try:
+            return self.endgame_solver.solve(board, self.player_id, attack_chances, time_limit)
+        except SearchTimeout:
+            return None
+    
+    def answer_quiz(self, quiz, difficulty):
+        """
+        クイズに回答する（難易度ごとの正解率で正解を選ぶ）
+        
+        Args:
+            quiz (dict): クイズデータ
+            difficulty (str): 難易度 ("easy" または "hard")
+            
+        Returns:
+            int: 選択した回答のインデックス
+        """
+        return QuizManager.answer_with_accuracy(quiz, self.quiz_accuracy.get(difficulty, 0.0), self.random)
@@ -0,0 +1,133 @@
+"""
+アタックチャンスの対象を評価して順位を付けるモジュール
+
+相手の石それぞれについて、アタックチャンスが成功した場合に得られる石の数
+（対象の石と挟まれて反転する石）と、成功後の局面の評価値を求める。
+既定では得られる石の数で順位を付け、評価値は同数の場合の順序に使う。
+評価値で順位を付ける場合（RANK_BY_EVALUATION）に探索の深さを指定すると、
+SearchEngine.evaluate_attacks で1つの盤面を make_attack / unmake しながら評価する。
+反転数と静的評価はビットボードの演算だけで求めるため盤面を変更しない。結果は局面のハッシュ値ごとに
+保持するため、画面の描画ごとに呼んでも局面が変わるまで再計算しない。
+"""
+
+from game.constants import BOARD_SIZE
+from game.bitboard import popcount, flips
+from .evaluation import evaluate
+from .search import SearchEngine, SearchTimeout
+
+# 探索で評価する場合の既定の持ち時間（秒）
+DEFAULT_RANKING_TIME_LIMIT = 0.2
+
+# 順位の付け方（得られる石の数、成功後の局面の評価値）
+RANK_BY_FLIPS = "flips"
+RANK_BY_EVALUATION = "evaluation"
+
+
+def attack_gains(player_bits, opponent_bits):
+    """
+    相手の石それぞれについて、アタックチャンスが成功した場合に反転する石を返す
+    
+    Args:
+        player_bits (int): 手番側の石
+        opponent_bits (int): 相手側の石
+        
+    Returns:
+        list: (対象の位置番号, 反転する石のビットボード（対象の石を含む）) のリスト
+    """
+    gains = []
+    bits = opponent_bits
+    while bits:
+        low = bits & -bits
+        gains.append((low.bit_length() - 1, low | flips(low, player_bits | low, opponent_bits & ~low)))
+        bits ^= low
+    return gains
+
+
+class AttackRanker:
+    """アタックチャンスの対象に順位を付けるクラス"""
+    
+    def __init__(self, method=RANK_BY_FLIPS, depth=0, engine=None, time_limit=DEFAULT_RANKING_TIME_LIMIT):
+        """
+        Args:
+            method (str): 順位の付け方（RANK_BY_FLIPS または RANK_BY_EVALUATION）
+            depth (int): RANK_BY_EVALUATION で成功後の局面を探索する深さ（0の場合は静的評価のみ）
+            engine (SearchEngine): 探索に使うエンジン、省略時は必要になった時に作成
+            time_limit (float): 探索の持ち時間（秒）、超えた場合は静的評価を使う
+        """
+        if method not in (RANK_BY_FLIPS, RANK_BY_EVALUATION):
+            raise ValueError(f"unknown ranking method: {method}")
+        self.method = method
+        self.depth = depth
+        self.engine = engine
+        self.time_limit = time_limit
+        
+        # 前回の局面のハッシュ値と結果
+        self._cache_key = None
+        self._cache = None
+    
+    def rank(self, board, side_to_move, attack_chances):
+        """
+        相手の石を、アタックチャンスの対象としての価値が高い順に並べて返す
+        
+        Args:
+            board (Board): 盤面（変更しない）
+            side_to_move (int): 手番のプレイヤーID（0:黒, 1:白）
+            attack_chances (tuple): (黒の残り回数, 白の残り回数)（使用前の回数）
+            
+        Returns:
+            list: 対象ごとの評価 [{"row", "col", "flips", "score", "value"}, ...]
+                flips (int): 成功した場合に得られる石の数（対象の石を含む）
+                score (int): 成功後の局面の手番側から見た評価値
+                value (float): 対象の中での相対的な価値（最善が1.0、最低が0.0、
+                               method の項目で計算する）
+        """
+        key = board.get_hash(side_to_move, attack_chances)
+        if key == self._cache_key:
+            return self._cache
+        
+        opponent = 1 - side_to_move
+        player_bits = board.bitboards[side_to_move]
+        opponent_bits = board.bitboards[opponent]
+        player_chances = max(0, attack_chances[side_to_move] - 1)
+        opponent_chances = attack_chances[opponent]
+        
+        searched = None
+        by_evaluation = self.method == RANK_BY_EVALUATION
+        if by_evaluation and self.depth > 0 and attack_chances[side_to_move] > 0:
+            searched = self._search_scores(board, side_to_move, attack_chances)
+        
+        ranking = []
+        for square, gained in attack_gains(player_bits, opponent_bits):
+            if searched is not None:
+                score = searched[square]
+            else:
+                # 成功後は相手の手番になるため、相手側から評価して符号を反転する
+                score = -evaluate(opponent_bits & ~gained, player_bits | gained, opponent_chances, player_chances)
+            row, col = divmod(square, BOARD_SIZE)
+            ranking.append({"row": row, "col": col, "flips": popcount(gained), "score": score, "value": 0.0})
+        
+        primary, secondary = ("score", "flips") if by_evaluation else ("flips", "score")
+        ranking.sort(key=lambda entry: (entry[primary], entry[secondary]), reverse=True)
+        if ranking:
+            best = ranking[0][primary]
+            worst = ranking[-1][primary]
+            for entry in ranking:
+                entry["value"] = (entry[primary] - worst) / (best - worst) if best > worst else 1.0
+        
+        self._cache_key = key
+        self._cache = ranking
+        return ranking
+    
+    def _search_scores(self, board, side_to_move, attack_chances):
+        """
+        探索エンジンで成功後の局面を評価する（内部メソッド）
+        
+        Returns:
+            dict: 対象の位置番号ごとの評価値、時間切れの場合はNone
+        """
+        if self.engine is None:
+            self.engine = SearchEngine(time_limit=self.time_limit)
+        try:
+            return self.engine.evaluate_attacks(board, side_to_move, attack_chances, self.depth, self.time_limit)
+        except SearchTimeout:
+            return None
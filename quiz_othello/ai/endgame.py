@@ -0,0 +1,449 @@
+"""
+終盤の完全読みを行うモジュール
+
+空きマスが少ない局面で、終局時の石差（GameManager.get_winner が比較する
+黒の石の数 - 白の石の数）を正確に求める。ビットボードを直接扱い、
+以下の工夫で探索量を減らす。
+
+- 空きマスが多いうちは相手の着手可能数が少ない手から調べる（速さ優先）
+- 空きマスが少なくなったら、空きマスが奇数個の象限から調べる（偶数理論）
+- 最後の1マスは着手せずに石差を直接計算する
+
+アタックチャンスが残っている場合は探索エンジンと同じく確率ノードとして扱い、
+石差の期待値を返す。アタックチャンスが残っている局面は置換表に記録する。
+失敗した場合の局面は対象によらず同じため、局面ごとに1度だけ読み、その値から
+どの対象でも窓に届かないことが分かればすべての対象を枝刈りする。
+"""
+
+import time
+
+from game.constants import BLACK, WHITE
+from game.bitboard import FULL_MASK, popcount, legal_moves, flips
+from .actions import ATTACK_OFFSET
+from .search import (
+    SearchTimeout, DEFAULT_SUCCESS_RATES, DEFAULT_INITIAL_ATTACK_CHANCES, attack_success_probabilities
+)
+
+# コンピュータプレイヤーが完全読みに切り替える既定の空きマス数
+# （Python の実装では空き12マスで1秒前後、16マスで数十秒かかる）
+ENDGAME_EMPTIES = 12
+
+# アタックチャンスが残っている場合に完全読みに切り替える空きマス数
+# （インデックスは両者の残り回数の合計 - 1、これより多く残っている場合は完全読みを行わない）
+# 相手の石ごとに確率ノードが増えるため、残り1回・空き6マスや残り2回・空き4マスで0.1秒前後かかる
+ENDGAME_ATTACK_EMPTIES = (6, 4)
+
+# 完全読みに使う持ち時間の割合（読み切れなければ残りの時間で通常の探索を行う）
+ENDGAME_TIME_RATIO = 0.5
+
+# 置換表に記録する局面数の上限（超えたら表を空にする）
+ENDGAME_TABLE_SIZE = 1 << 20
+
+# 速さ優先の並べ替えを行う最小の空きマス数（これより少ない場合は偶数理論の順）
+FASTEST_FIRST_EMPTIES = 7
+
+# 石差の上限と下限
+DISC_BOUND = 64
+
+# 盤面の4つの象限のマスク（左上、右上、左下、右下）
+QUADRANT_MASKS = (
+    0x000000000F0F0F0F,
+    0x00000000F0F0F0F0,
+    0x0F0F0F0F00000000,
+    0xF0F0F0F000000000,
+)
+
+# 角のマスク（速さ優先の並べ替えで優先する）
+CORNER_MASK = 0x8100000000000081
+
+# 時間切れを確認する間隔（ノード数、2のべき乗 - 1）
+_TIME_CHECK_MASK = 1023
+
+
+def endgame_empties_limit(attack_chances, empties=ENDGAME_EMPTIES):
+    """
+    アタックチャンスの残り回数に応じて、完全読みに切り替える空きマス数を返す
+    
+    Args:
+        attack_chances (tuple): (黒の残り回数, 白の残り回数)
+        empties (int): アタックチャンスが残っていない場合の空きマス数
+        
+    Returns:
+        int: 完全読みに切り替える空きマス数（0の場合は完全読みを行わない）
+    """
+    remaining = sum(attack_chances)
+    if remaining == 0:
+        return empties
+    if remaining > len(ENDGAME_ATTACK_EMPTIES):
+        return 0
+    return min(empties, ENDGAME_ATTACK_EMPTIES[remaining - 1])
+
+
+def count_empties(board):
+    """
+    盤面の空きマスの数を返す
+    
+    Args:
+        board (Board): 盤面
+        
+    Returns:
+        int: 空きマスの数
+    """
+    return popcount(~(board.bitboards[BLACK] | board.bitboards[WHITE]) & FULL_MASK)
+
+
+class EndgameSolver:
+    """終盤の完全読みを行うクラス"""
+    
+    def __init__(self, success_rates=None, initial_attack_chances=DEFAULT_INITIAL_ATTACK_CHANCES):
+        """
+        完全読みのソルバーを初期化
+        
+        Args:
+            success_rates (dict): 難易度ごとのアタックチャンス成功確率
+                                  （省略時は DEFAULT_SUCCESS_RATES）
+            initial_attack_chances (tuple): (黒の初期回数, 白の初期回数)（難易度の判定に使う）
+        """
+        self.success_rates = dict(success_rates or DEFAULT_SUCCESS_RATES)
+        
+        # アタックチャンスが残っている局面の置換表
+        # {(手番側の石, 相手側の石, 手番側の残り回数, 相手側の残り回数, 手番): (下限, 上限)}
+        self.table = {}
+        
+        self.initial_attack_chances = None
+        self.set_initial_attack_chances(initial_attack_chances)
+        self.nodes = 0
+        self.deadline = float("inf")
+    
+    def set_initial_attack_chances(self, initial_attack_chances):
+        """
+        アタックチャンスの初期回数を設定し、成功確率の表を作り直す
+        
+        初期回数が変わった場合は、以前の成功確率で求めた置換表の内容を消す。
+        
+        Args:
+            initial_attack_chances (tuple): (黒の初期回数, 白の初期回数)
+        """
+        initial_attack_chances = tuple(initial_attack_chances)
+        if initial_attack_chances == self.initial_attack_chances:
+            return
+        self.table.clear()
+        self.initial_attack_chances = initial_attack_chances
+        self.success_probabilities = attack_success_probabilities(self.success_rates, self.initial_attack_chances)
+    
+    def solve(self, board, side_to_move, attack_chances=(0, 0), time_limit=None):
+        """
+        局面を終局まで読み切る
+        
+        Args:
+            board (Board): 盤面
+            side_to_move (int): 手番のプレイヤーID（0:黒, 1:白）
+            attack_chances (tuple): (黒の残り回数, 白の残り回数)
+            time_limit (float): 持ち時間（秒）、省略時は制限なし
+            
+        Returns:
+            dict: 読み切りの結果
+                score (float): 終局時の石差（黒 - 白）。アタックチャンスが残っている場合は期待値
+                side_score (float): 手番側から見た石差
+                action (int): 最善の行動値（ai.actions 参照）、行動が無い場合はNone
+                nodes (int): 探索したノード数
+                time (float): 探索にかかった時間（秒）
+                
+        Raises:
+            SearchTimeout: 持ち時間内に読み切れなかった場合
+        """
+        start_time = time.perf_counter()
+        self.deadline = float("inf") if time_limit is None else start_time + time_limit
+        self.nodes = 0
+        if len(self.table) > ENDGAME_TABLE_SIZE:
+            self.table.clear()
+        
+        player_bits = board.bitboards[side_to_move]
+        opponent_bits = board.bitboards[1 - side_to_move]
+        player_chances = attack_chances[side_to_move]
+        opponent_chances = attack_chances[1 - side_to_move]
+        
+        action, side_score = self._solve_root(player_bits, opponent_bits, player_chances, opponent_chances, side_to_move)
+        
+        return {
+            "score": side_score if side_to_move == BLACK else -side_score,
+            "side_score": side_score,
+            "action": action,
+            "nodes": self.nodes,
+            "time": time.perf_counter() - start_time,
+        }
+    
+    def _solve_root(self, p, o, cp, co, side):
+        """
+        ルート局面の最善の行動と石差を求める（内部メソッド）
+        
+        Returns:
+            tuple: (最善の行動値, 手番側から見た石差)
+        """
+        moves = legal_moves(p, o)
+        if not moves:
+            # ルートで打てない場合はパスまたは終局
+            return None, self._solve(p, o, cp, co, side, -DISC_BOUND - 1, DISC_BOUND + 1)
+        
+        alpha = -DISC_BOUND - 1
+        beta = DISC_BOUND + 1
+        best_action = None
+        
+        for square_bit in self._order_moves(p, o, moves):
+            flipped = flips(square_bit, p, o)
+            score = -self._solve(o & ~flipped, p | flipped | square_bit, co, cp, 1 - side, -beta, -alpha)
+            if score > alpha or best_action is None:
+                alpha = max(alpha, score)
+                best_action = square_bit.bit_length() - 1
+        
+        if cp > 0:
+            score, target_bit = self._solve_attacks(p, o, cp, co, side, alpha, beta)
+            if target_bit is not None and score > alpha:
+                alpha = score
+                best_action = ATTACK_OFFSET + target_bit.bit_length() - 1
+        
+        return best_action, alpha
+    
+    def _solve(self, p, o, cp, co, side, alpha, beta):
+        """
+        手番側から見た終局時の石差を求める（内部メソッド）
+        
+        Args:
+            p (int): 手番側の石
+            o (int): 相手側の石
+            cp (int): 手番側の残りアタックチャンス回数
+            co (int): 相手側の残りアタックチャンス回数
+            side (int): 手番のプレイヤーID（成功確率の表を選ぶ）
+            alpha (float): 下限
+            beta (float): 上限
+            
+        Returns:
+            float: 手番側から見た石差
+        """
+        if not cp and not co:
+            return self._solve_plain(p, o, alpha, beta)
+        
+        self.nodes += 1
+        if not self.nodes & _TIME_CHECK_MASK and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+        
+        moves = legal_moves(p, o)
+        if not moves:
+            if not legal_moves(o, p):
+                return popcount(p) - popcount(o)
+            return -self._solve(o, p, co, cp, 1 - side, -beta, -alpha)
+        
+        # 置換表の上限と下限で窓を狭める
+        key = (p, o, cp, co, side)
+        lower, upper = self.table.get(key, (-DISC_BOUND, DISC_BOUND))
+        if lower >= beta:
+            return lower
+        if upper <= alpha or lower == upper:
+            return upper
+        alpha = max(alpha, lower)
+        beta = min(beta, upper)
+        original_alpha = alpha
+        
+        best = -DISC_BOUND - 1
+        for square_bit in self._order_moves(p, o, moves):
+            flipped = flips(square_bit, p, o)
+            score = -self._solve(o & ~flipped, p | flipped | square_bit, co, cp, 1 - side, -beta, -alpha)
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        
+        if cp > 0 and alpha < beta:
+            score, _ = self._solve_attacks(p, o, cp, co, side, alpha, beta)
+            best = max(best, score)
+        
+        if best <= original_alpha:
+            self.table[key] = (lower, best)
+        elif best >= beta:
+            self.table[key] = (best, upper)
+        else:
+            self.table[key] = (best, best)
+        return best
+    
+    def _solve_attacks(self, p, o, cp, co, side, alpha, beta):
+        """
+        すべての対象のアタックチャンスを確率ノードとして読み切る（内部メソッド）
+        
+        失敗した場合の局面は対象によらず同じため、先に1度だけ読む。その値から
+        どの対象でも期待値が窓に届かない（または必ず超える）ことが分かれば、
+        対象ごとの成功した場合の局面を読まずに返す。
+        
+        Returns:
+            tuple: (手番側から見た石差の期待値の最大値（窓の外の場合は上限または下限）,
+                    最善の対象の位置のビット、対象が無い場合はNone)
+        """
+        if not o:
+            return -DISC_BOUND - 1, None
+        
+        probability = self.success_probabilities[side][cp]
+        failure_weight = 1.0 - probability
+        failure = 0.0
+        if failure_weight > 0.0:
+            # 成功した場合の石差は -DISC_BOUND から DISC_BOUND の間のため、
+            # 失敗した場合の石差はこの窓の中だけを正確に求めればよい
+            failure_alpha = max(-DISC_BOUND, (alpha - probability * DISC_BOUND) / failure_weight)
+            failure_beta = min(DISC_BOUND, (beta + probability * DISC_BOUND) / failure_weight)
+            failure = -self._solve(o, p, co, cp - 1, 1 - side, -failure_beta, -failure_alpha)
+            if probability <= 0.0:
+                return failure, o & -o
+            if probability * DISC_BOUND + failure_weight * failure <= alpha:
+                return probability * DISC_BOUND + failure_weight * failure, None
+            if failure_weight * failure - probability * DISC_BOUND >= beta:
+                return failure_weight * failure - probability * DISC_BOUND, o & -o
+        
+        best = -DISC_BOUND - 1
+        best_target = None
+        for target_bit in self._order_attacks(p, o):
+            child_alpha = (alpha - failure_weight * failure) / probability
+            if child_alpha >= DISC_BOUND:
+                break
+            child_beta = (beta - failure_weight * failure) / probability
+            
+            # 成功時は対象の石と挟まれた石が反転する
+            attacked_p = p | target_bit
+            attacked_o = o & ~target_bit
+            flipped = flips(target_bit, attacked_p, attacked_o)
+            success = -self._solve(
+                attacked_o & ~flipped, attacked_p | flipped, co, cp - 1, 1 - side,
+                -min(DISC_BOUND, child_beta), -max(-DISC_BOUND, child_alpha)
+            )
+            score = probability * success + failure_weight * failure
+            if score > best:
+                best = score
+                best_target = target_bit
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        
+        if best_target is None:
+            # どの対象も窓に届かない場合は、残りの対象の上限を返す
+            return max(best, alpha), None
+        return best, best_target
+    
+    def _solve_plain(self, p, o, alpha, beta):
+        """
+        アタックチャンスが残っていない局面を読み切る（内部メソッド）
+        
+        Returns:
+            int: 手番側から見た石差
+        """
+        self.nodes += 1
+        if not self.nodes & _TIME_CHECK_MASK and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+        
+        empties = ~(p | o) & FULL_MASK
+        if not empties:
+            return popcount(p) - popcount(o)
+        if not empties & (empties - 1):
+            return self._solve_last_square(p, o, empties)
+        
+        moves = legal_moves(p, o)
+        if not moves:
+            if not legal_moves(o, p):
+                return popcount(p) - popcount(o)
+            return -self._solve_plain(o, p, -beta, -alpha)
+        
+        if popcount(empties) > FASTEST_FIRST_EMPTIES:
+            ordered = self._order_moves(p, o, moves)
+        else:
+            ordered = self._order_by_parity(moves, empties)
+        
+        best = -DISC_BOUND - 1
+        for square_bit in ordered:
+            flipped = flips(square_bit, p, o)
+            score = -self._solve_plain(o & ~flipped, p | flipped | square_bit, -beta, -alpha)
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        
+        return best
+    
+    def _solve_last_square(self, p, o, square_bit):
+        """
+        最後の1マスの局面の石差を直接計算する（内部メソッド）
+        
+        Returns:
+            int: 手番側から見た石差
+        """
+        self.nodes += 1
+        p_count = popcount(p)
+        o_count = popcount(o)
+        
+        flipped = popcount(flips(square_bit, p, o))
+        if flipped:
+            return p_count - o_count + 2 * flipped + 1
+        
+        # 手番側が打てなければ相手が打つ
+        flipped = popcount(flips(square_bit, o, p))
+        if flipped:
+            return p_count - o_count - 2 * flipped - 1
+        
+        return p_count - o_count
+    
+    def _order_moves(self, p, o, moves):
+        """
+        相手の着手可能数が少ない順（速さ優先）に手を並べる（内部メソッド）
+        
+        Returns:
+            list: 手の位置のビットのリスト
+        """
+        scored = []
+        bits = moves
+        while bits:
+            square_bit = bits & -bits
+            bits ^= square_bit
+            flipped = flips(square_bit, p, o)
+            mobility = popcount(legal_moves(o & ~flipped, p | flipped | square_bit))
+            if square_bit & CORNER_MASK:
+                mobility -= 1
+            scored.append((mobility, square_bit))
+        scored.sort()
+        return [square_bit for _, square_bit in scored]
+    
+    def _order_by_parity(self, moves, empties):
+        """
+        空きマスが奇数個の象限の手を先に並べる（内部メソッド）
+        
+        Returns:
+            list: 手の位置のビットのリスト
+        """
+        odd = []
+        even = []
+        for quadrant in QUADRANT_MASKS:
+            bits = moves & quadrant
+            if not bits:
+                continue
+            target = odd if popcount(empties & quadrant) & 1 else even
+            while bits:
+                square_bit = bits & -bits
+                bits ^= square_bit
+                target.append(square_bit)
+        return odd + even
+    
+    def _order_attacks(self, p, o):
+        """
+        反転する石が多い順にアタックチャンスの対象を並べる（内部メソッド）
+        
+        Returns:
+            list: 対象の位置のビットのリスト
+        """
+        scored = []
+        bits = o
+        while bits:
+            target_bit = bits & -bits
+            bits ^= target_bit
+            gain = popcount(flips(target_bit, p | target_bit, o & ~target_bit))
+            scored.append((-gain, target_bit))
+        scored.sort()
+        return [target_bit for _, target_bit in scored]
@@ -0,0 +1,103 @@
+"""
+探索用の局面評価関数を提供するモジュール
+
+評価値は手番側から見た整数で、終局時は石差に DISC_SCORE を掛けた値になる。
+途中局面の評価値は終局の評価値の範囲（±SCORE_BOUND）に収める。
+"""
+
+from game.constants import BOARD_SIZE
+from game.bitboard import popcount, legal_moves
+
+# 終局時の石1個あたりの評価値
+DISC_SCORE = 1000
+
+# 評価値の上限と下限（全64マスの石差）
+SCORE_BOUND = BOARD_SIZE * BOARD_SIZE * DISC_SCORE
+
+# 位置ごとの重み（角を高く、角の隣を低く評価する）
+SQUARE_WEIGHTS = (
+    100, -20, 10, 5, 5, 10, -20, 100,
+    -20, -50, -2, -2, -2, -2, -50, -20,
+    10, -2, -1, -1, -1, -1, -2, 10,
+    5, -2, -1, -1, -1, -1, -2, 5,
+    5, -2, -1, -1, -1, -1, -2, 5,
+    10, -2, -1, -1, -1, -1, -2, 10,
+    -20, -50, -2, -2, -2, -2, -50, -20,
+    100, -20, 10, 5, 5, 10, -20, 100,
+)
+
+# 着手可能数の差1つあたりの評価値
+MOBILITY_WEIGHT = 15
+
+# 残りアタックチャンス1回あたりの評価値
+ATTACK_CHANCE_WEIGHT = 150
+
+
+def _build_weight_masks():
+    """
+    同じ重みを持つ位置をまとめたマスクを作成する（内部関数）
+    
+    Returns:
+        tuple: ((重み, マスク), ...)
+    """
+    masks = {}
+    for square, weight in enumerate(SQUARE_WEIGHTS):
+        masks[weight] = masks.get(weight, 0) | (1 << square)
+    return tuple(sorted(masks.items(), reverse=True))
+
+
+# (重み, マスク) の組
+WEIGHT_MASKS = _build_weight_masks()
+
+
+def positional_score(bits):
+    """
+    石の配置の位置評価値を返す
+    
+    Args:
+        bits (int): 石のビットボード
+        
+    Returns:
+        int: 位置の重みの合計
+    """
+    score = 0
+    for weight, mask in WEIGHT_MASKS:
+        if bits & mask:
+            score += weight * popcount(bits & mask)
+    return score
+
+
+def final_score(player_bits, opponent_bits):
+    """
+    終局時の評価値を返す（GameManager.get_winner と同じく石の数だけで判定）
+    
+    Args:
+        player_bits (int): 手番側の石
+        opponent_bits (int): 相手側の石
+        
+    Returns:
+        int: 石差 × DISC_SCORE
+    """
+    return (popcount(player_bits) - popcount(opponent_bits)) * DISC_SCORE
+
+
+def evaluate(player_bits, opponent_bits, player_chances=0, opponent_chances=0):
+    """
+    途中局面を手番側から評価する
+    
+    Args:
+        player_bits (int): 手番側の石
+        opponent_bits (int): 相手側の石
+        player_chances (int): 手番側の残りアタックチャンス回数
+        opponent_chances (int): 相手側の残りアタックチャンス回数
+        
+    Returns:
+        int: 評価値（±SCORE_BOUND の範囲内）
+    """
+    score = positional_score(player_bits) - positional_score(opponent_bits)
+    score += MOBILITY_WEIGHT * (
+        popcount(legal_moves(player_bits, opponent_bits))
+        - popcount(legal_moves(opponent_bits, player_bits))
+    )
+    score += ATTACK_CHANCE_WEIGHT * (player_chances - opponent_chances)
+    return max(-SCORE_BOUND + 1, min(SCORE_BOUND - 1, score))
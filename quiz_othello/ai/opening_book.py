@@ -0,0 +1,357 @@
+"""
+定跡（オープニングブック）を提供するモジュール
+
+定跡は正規形の局面のハッシュ値（game.symmetry.canonical_position_hash）を
+キーとする固定長レコードをハッシュ値の順に並べたバイナリファイルとして
+保存する。行動値も正規形の盤面上の位置で記録するため、対称な局面は
+1つのエントリを共有する。読み込み時は
+ファイルを mmap して二分探索するだけなので、解析処理が不要で、
+複数のプロセスで同じページを共有できる。
+
+ファイル形式（リトルエンディアン）：
+    ヘッダ（32バイト）: マジック (8s), バージョン (I), レコード数 (I), レコード長 (I), 予約 (12x)
+    レコード（16バイト）: ハッシュ値 (Q), 評価値 (i), 行動値 (H), 重み (H)
+同じハッシュ値のレコードは評価値の高い順に並ぶ。
+
+初期配置から定跡を作成するコマンド：
+    python -m ai.opening_book --plies 6 --depth 4 --output data/opening_book.bin
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import time
+
+from game.board import Board
+from game.constants import BLACK, WHITE, BOARD_SIZE, INITIAL_ATTACK_CHANCES
+from game.symmetry import canonical_position_hash, transform_square, inverse_transform
+from .actions import ATTACK_OFFSET, decode_action, is_attack
+from .search import SearchEngine
+
+# ファイルの識別子と形式のバージョン
+BOOK_MAGIC = b"QOBOOK\x00\x00"
+BOOK_VERSION = 2
+
+# ヘッダとレコードの形式
+HEADER_FORMAT = struct.Struct("<8sIII12x")
+RECORD_FORMAT = struct.Struct("<QiHH")
+
+# ハッシュ値だけを読む形式
+_KEY_FORMAT = struct.Struct("<Q")
+
+# 重みの最大値（16ビット）
+MAX_WEIGHT = 0xFFFF
+
+
+def canonical_key(board, side_to_move, attack_chances):
+    """
+    盤面の定跡のキーを返す
+    
+    Args:
+        board (Board): 盤面
+        side_to_move (int): 手番のプレイヤーID（0:黒, 1:白）
+        attack_chances (tuple): (黒の残り回数, 白の残り回数)
+        
+    Returns:
+        tuple: (正規形の局面のハッシュ値, 正規形にするために使った変換番号)
+    """
+    return canonical_position_hash(
+        board.bitboards[BLACK], board.bitboards[WHITE], side_to_move, attack_chances
+    )
+
+
+def transform_action(action, transform):
+    """
+    行動値の位置に対称変換を適用する
+    
+    Args:
+        action (int): 行動値（ai.actions 参照）
+        transform (int): 変換番号（0〜7）
+        
+    Returns:
+        int: 変換した行動値
+    """
+    offset = ATTACK_OFFSET if is_attack(action) else 0
+    row, col = divmod(action - offset, BOARD_SIZE)
+    row, col = transform_square(row, col, transform)
+    return offset + row * BOARD_SIZE + col
+
+
+class OpeningBook:
+    """mmap した定跡ファイルを検索するクラス"""
+    
+    def __init__(self, path):
+        """
+        定跡ファイルを開く
+        
+        Args:
+            path (str): 定跡ファイルのパス
+            
+        Raises:
+            ValueError: 定跡ファイルの形式が正しくない場合
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size < HEADER_FORMAT.size:
+                raise ValueError(f"{path}: not an opening book")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        
+        magic, version, count, record_size = HEADER_FORMAT.unpack_from(self._map, 0)
+        if (magic != BOOK_MAGIC or version != BOOK_VERSION or record_size != RECORD_FORMAT.size
+                or size != HEADER_FORMAT.size + count * record_size):
+            self.close()
+            raise ValueError(f"{path}: not an opening book")
+        self.record_count = count
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def __len__(self):
+        return self.record_count
+    
+    def close(self):
+        """
+        ファイルを閉じる
+        """
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+    
+    def _key_at(self, index):
+        """
+        指定したレコードのハッシュ値を返す（内部メソッド）
+        """
+        return _KEY_FORMAT.unpack_from(self._map, HEADER_FORMAT.size + index * RECORD_FORMAT.size)[0]
+    
+    def _lower_bound(self, key):
+        """
+        ハッシュ値が key 以上の最初のレコードの番号を二分探索で返す（内部メソッド）
+        """
+        low = 0
+        high = self.record_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+    
+    def lookup(self, key):
+        """
+        局面の定跡手を返す
+        
+        Args:
+            key (int): 正規形の局面のハッシュ値（canonical_key 参照）
+            
+        Returns:
+            list: 評価値の高い順の定跡手（行動値は正規形の盤面上の位置） [{"action": 行動値, "score": 評価値, "weight": 重み}, ...]、
+                  定跡に無い場合は空のリスト
+        """
+        entries = []
+        index = self._lower_bound(key)
+        offset = HEADER_FORMAT.size + index * RECORD_FORMAT.size
+        while index < self.record_count:
+            record_key, score, action, weight = RECORD_FORMAT.unpack_from(self._map, offset)
+            if record_key != key:
+                break
+            entries.append({"action": action, "score": score, "weight": weight})
+            index += 1
+            offset += RECORD_FORMAT.size
+        return entries
+    
+    def probe(self, board, side_to_move, attack_chances):
+        """
+        盤面の最善の定跡手を返す
+        
+        Args:
+            board (Board): 盤面
+            side_to_move (int): 手番のプレイヤーID（0:黒, 1:白）
+            attack_chances (tuple): (黒の残り回数, 白の残り回数)
+            
+        Returns:
+            dict: 最善の定跡手（行動値は渡した盤面上の位置）、定跡に無い場合はNone
+        """
+        key, transform = canonical_key(board, side_to_move, attack_chances)
+        entries = self.lookup(key)
+        if not entries:
+            return None
+        entry = dict(entries[0])
+        entry["action"] = transform_action(entry["action"], inverse_transform(transform))
+        return entry
+
+
+class BookBuilder:
+    """定跡ファイルを作成するクラス"""
+    
+    def __init__(self):
+        # ハッシュ値ごとの {行動値: [評価値, 重み]}
+        self.entries = {}
+    
+    def __len__(self):
+        return sum(len(actions) for actions in self.entries.values())
+    
+    def add(self, key, action, score, weight=1):
+        """
+        定跡手を1つ追加する
+        
+        同じ局面と行動が既にある場合は評価値を置き換え、重みを加算する
+        （自己対戦の出現回数を重みとして積み上げられる）。
+        
+        Args:
+            key (int): 正規形の局面のハッシュ値（canonical_key 参照）
+            action (int): 正規形の盤面上の行動値（ai.actions 参照）
+            score (int): 手番側から見た評価値
+            weight (int): 重み
+        """
+        actions = self.entries.setdefault(key, {})
+        if action in actions:
+            actions[action][0] = score
+            actions[action][1] = min(MAX_WEIGHT, actions[action][1] + weight)
+        else:
+            actions[action] = [score, min(MAX_WEIGHT, weight)]
+    
+    def add_position(self, board, side_to_move, attack_chances, action, score, weight=1):
+        """
+        盤面と行動を正規形に変換して定跡手を追加する
+        
+        Args:
+            board (Board): 盤面
+            side_to_move (int): 手番のプレイヤーID（0:黒, 1:白）
+            attack_chances (tuple): (黒の残り回数, 白の残り回数)
+            action (int): 渡した盤面上の行動値（ai.actions 参照）
+            score (int): 手番側から見た評価値
+            weight (int): 重み
+        """
+        key, transform = canonical_key(board, side_to_move, attack_chances)
+        self.add(key, transform_action(action, transform), score, weight)
+    
+    def analyze(self, plies=6, depth=4, width=3, engine=None, progress=None):
+        """
+        初期配置から探索エンジンで解析した定跡手を追加する
+        
+        各局面のすべての行動を指定の深さで評価して記録し、評価値の高い
+        width 個の異なる子局面（通常の手のみ、対称な局面は1つとみなす）を
+        次の局面として展開する。対称な局面は1度だけ解析する。
+        
+        Args:
+            plies (int): 展開する手数
+            depth (int): 各行動の探索の深さ
+            width (int): 展開する手の数
+            engine (SearchEngine): 探索エンジン、省略時は時間制限なしのエンジンを作成
+            progress (function): 局面を解析するたびに呼ばれる関数（引数は解析した局面数）
+            
+        Returns:
+            int: 解析した局面数
+        """
+        engine = engine or SearchEngine(time_limit=float("inf"))
+        attack_chances = (INITIAL_ATTACK_CHANCES, INITIAL_ATTACK_CHANCES)
+        frontier = [(Board(), BLACK)]
+        visited = set()
+        
+        for ply in range(plies):
+            next_frontier = []
+            for board, side in frontier:
+                key, _ = canonical_key(board, side, attack_chances)
+                if key in visited:
+                    continue
+                visited.add(key)
+                
+                actions = engine.root_actions(board, side, attack_chances)
+                scored = []
+                for action in actions:
+                    result = engine.search_action(board, side, attack_chances, action, depth,
+                                                  time_limit=float("inf"))
+                    scored.append((result["score"], action))
+                scored.sort(key=lambda item: -item[0])
+                
+                for rank, (score, action) in enumerate(scored):
+                    self.add_position(board, side, attack_chances, action, score, max(1, len(scored) - rank))
+                
+                if progress:
+                    progress(len(visited))
+                
+                if ply + 1 == plies:
+                    continue
+                # 対称な子局面を1つにまとめてから、評価値の高い width 個を展開する
+                child_keys = set()
+                for _, action in scored:
+                    if len(child_keys) >= width:
+                        break
+                    if is_attack(action):
+                        continue
+                    _, row, col = decode_action(action)
+                    child = board.copy()
+                    child.place_stone(row, col, side)
+                    child_side = 1 - side
+                    if not child.get_valid_moves_mask(child_side):
+                        child_side = side
+                    if not child.get_valid_moves_mask(child_side):
+                        continue
+                    child_key, _ = canonical_key(child, child_side, attack_chances)
+                    if child_key in child_keys or child_key in visited:
+                        continue
+                    child_keys.add(child_key)
+                    next_frontier.append((child, child_side))
+            frontier = next_frontier
+        
+        return len(visited)
+    
+    def write(self, path):
+        """
+        定跡ファイルを書き出す（一時ファイルに書いてから置き換える）
+        
+        Args:
+            path (str): 定跡ファイルのパス
+            
+        Returns:
+            int: 書き出したレコード数
+        """
+        records = []
+        for key, actions in self.entries.items():
+            for action, (score, weight) in actions.items():
+                records.append((key, -score, -weight, action))
+        records.sort()
+        
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(HEADER_FORMAT.pack(BOOK_MAGIC, BOOK_VERSION, len(records), RECORD_FORMAT.size))
+            for key, negative_score, negative_weight, action in records:
+                f.write(RECORD_FORMAT.pack(key, -negative_score, action, -negative_weight))
+        os.replace(temp_path, path)
+        
+        return len(records)
+
+
+def main():
+    """初期配置から定跡ファイルを作成する"""
+    parser = argparse.ArgumentParser(description="Build a Quiz Othello opening book")
+    parser.add_argument("--plies", type=int, default=6, help="展開する手数")
+    parser.add_argument("--depth", type=int, default=4, help="各行動の探索の深さ")
+    parser.add_argument("--width", type=int, default=3, help="各局面で展開する手の数")
+    parser.add_argument("--output", default="opening_book.bin", help="定跡ファイルの出力先")
+    args = parser.parse_args()
+    
+    start_time = time.perf_counter()
+    builder = BookBuilder()
+    positions = builder.analyze(
+        args.plies, args.depth, args.width,
+        progress=lambda count: print(f"\r{count} positions", end="", flush=True)
+    )
+    records = builder.write(args.output)
+    print(f"\n{positions} positions, {records} records written to {args.output} "
+          f"in {time.perf_counter() - start_time:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+"""
+プロセスプールによるルート並列探索を提供するモジュール
+
+ルート局面の行動（通常の手とアタックチャンス）をワーカープロセスに分配する。
+最初の行動を全幅の窓で探索して下限を得た後、残りの行動をヌルウィンドウで
+並列に調べ、下限を超えた行動だけを全幅の窓で再探索する。局面はビット
+ボードのタプルとしてワーカーに送る。
+
+単一プロセスの探索との速度比は次のコマンドで計測できる：
+    python -m ai.parallel --workers 16 --depth 5
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from game.board import Board
+from game.constants import BLACK, WHITE, AI_TIME_LIMIT
+from .evaluation import SCORE_BOUND
+from .search import SearchEngine, SearchTimeout, DEFAULT_MAX_DEPTH, DEFAULT_SUCCESS_RATES
+
+# 速度計測用の固定局面 (黒のビットボード, 白のビットボード, 手番, (黒の残り回数, 白の残り回数))
+POSITION_SUITE = (
+    (0x005C301000100000, 0x0000080878404000, BLACK, (2, 2)),
+    (0x1C590A0402110000, 0x000074381C200000, BLACK, (2, 1)),
+    (0x412E042B40844201, 0x001058943E700000, BLACK, (1, 2)),
+    (0xFC60002018010201, 0x0010385FA67E1C1C, BLACK, (1, 1)),
+    (0x0038BFDCF21F4000, 0x7FC440200D203C28, BLACK, (0, 1)),
+)
+
+# 次の深さを始めない経過時間の割合（持ち時間に対する）
+_NEXT_DEPTH_RATIO = 0.5
+
+# ワーカープロセスごとの探索エンジン
+_worker_engine = None
+
+
+def _wait_timeout(deadline):
+    """
+    期限までの残り時間を wait 用のタイムアウトとして返す（内部関数）
+    
+    Args:
+        deadline (float): 期限（time.perf_counter の値）、期限なしの場合は無限大
+        
+    Returns:
+        float: 残り時間（秒）、期限なしの場合はNone
+    """
+    if deadline == float("inf"):
+        return None
+    return max(0.0, deadline - time.perf_counter())
+
+
+def _init_worker(max_depth, tt_bucket_bits, success_rates):
+    """
+    ワーカープロセスの探索エンジンを作成する（内部関数）
+    """
+    global _worker_engine
+    _worker_engine = SearchEngine(
+        max_depth=max_depth, tt_bucket_bits=tt_bucket_bits, success_rates=dict(success_rates)
+    )
+
+
+def _search_task(position, action, depth, alpha, beta, time_limit):
+    """
+    ワーカープロセスでルートの行動1つを探索する（内部関数）
+    
+    Args:
+        position (tuple): (黒のビットボード, 白のビットボード, 手番, 黒の残り回数, 白の残り回数,
+                          (黒の初期回数, 白の初期回数))
+        action (int): 探索する行動値
+        depth (int): 探索の深さ
+        alpha (int): 下限
+        beta (int): 上限
+        time_limit (float): 持ち時間（秒）
+        
+    Returns:
+        dict: 探索結果（score, nodes）、時間切れの場合はNone
+    """
+    black_bits, white_bits, side, black_chances, white_chances, initial_attack_chances = position
+    _worker_engine.set_initial_attack_chances(initial_attack_chances)
+    board = Board.from_bitboards(black_bits, white_bits)
+    try:
+        return _worker_engine.search_action(
+            board, side, (black_chances, white_chances), action, depth, alpha, beta, time_limit
+        )
+    except SearchTimeout:
+        return None
+
+
+class ParallelSearchEngine:
+    """ルートの行動をプロセスプールに分配して探索するクラス"""
+    
+    def __init__(self, workers=None, time_limit=AI_TIME_LIMIT, max_depth=DEFAULT_MAX_DEPTH,
+                 tt_bucket_bits=16, success_rates=None):
+        """
+        並列探索エンジンを初期化
+        
+        Args:
+            workers (int): ワーカープロセス数、省略時はCPUコア数
+            time_limit (float): 1手あたりの持ち時間（秒）
+            max_depth (int): 最大探索深さ
+            tt_bucket_bits (int): ワーカーごとの置換表のバケット数の2を底とする対数
+            success_rates (dict): 難易度ごとのアタックチャンス成功確率
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.tt_bucket_bits = tt_bucket_bits
+        self.success_rates = dict(success_rates or DEFAULT_SUCCESS_RATES)
+        self.pool = None
+        
+        # 行動の並べ替えに使う親プロセス側のエンジン
+        self.local_engine = SearchEngine(success_rates=self.success_rates)
+    
+    @property
+    def initial_attack_chances(self):
+        """(黒の初期回数, 白の初期回数)（ワーカーには探索ごとに送る）"""
+        return self.local_engine.initial_attack_chances
+    
+    def set_initial_attack_chances(self, initial_attack_chances):
+        """
+        アタックチャンスの初期回数を設定する
+        
+        Args:
+            initial_attack_chances (tuple): (黒の初期回数, 白の初期回数)
+        """
+        self.local_engine.set_initial_attack_chances(initial_attack_chances)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """
+        ワーカープロセスを終了する
+        """
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.pool = None
+    
+    def _get_pool(self):
+        """
+        プロセスプールを返す（初回のみ作成する）（内部メソッド）
+        """
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.max_depth, self.tt_bucket_bits, tuple(self.success_rates.items())),
+            )
+        return self.pool
+    
+    def search(self, board, side_to_move, attack_chances, time_limit=None):
+        """
+        最善の行動を並列に探索する
+        
+        Args:
+            board (Board): 盤面
+            side_to_move (int): 手番のプレイヤーID（0:黒, 1:白）
+            attack_chances (tuple): (黒の残り回数, 白の残り回数)
+            time_limit (float): 今回の持ち時間（秒）、省略時はエンジンの設定値
+            
+        Returns:
+            dict: SearchEngine.search と同じ形式の探索結果
+        """
+        start_time = time.perf_counter()
+        limit = self.time_limit if time_limit is None else time_limit
+        deadline = start_time + limit
+        
+        actions = self.local_engine.root_actions(board, side_to_move, attack_chances)
+        result = {
+            "action": actions[0] if actions else None,
+            "score": 0,
+            "depth": 0,
+            "nodes": 0,
+            "time": 0.0,
+        }
+        
+        if len(actions) > 1:
+            position = (
+                board.bitboards[BLACK], board.bitboards[WHITE], side_to_move,
+                attack_chances[BLACK], attack_chances[WHITE], self.initial_attack_chances,
+            )
+            for depth in range(1, self.max_depth + 1):
+                try:
+                    action, score, nodes = self._search_depth(position, actions, depth, deadline)
+                except SearchTimeout as timeout:
+                    result["nodes"] += timeout.args[0] if timeout.args else 0
+                    break
+                
+                result["action"] = action
+                result["score"] = score
+                result["depth"] = depth
+                result["nodes"] += nodes
+                
+                # 最善手を先頭にして次の深さの探索順にする
+                actions.remove(action)
+                actions.insert(0, action)
+                
+                if abs(score) >= SCORE_BOUND // 2:
+                    break
+                if time.perf_counter() - start_time > limit * _NEXT_DEPTH_RATIO:
+                    break
+        
+        result["time"] = time.perf_counter() - start_time
+        return result
+    
+    def _search_depth(self, position, actions, depth, deadline):
+        """
+        ルート局面を指定の深さで並列に探索する（内部メソッド）
+        
+        Args:
+            position (tuple): ワーカーに送る局面のタプル
+            actions (list): 探索順に並べた行動値のリスト
+            depth (int): 探索の深さ
+            deadline (float): 探索の期限（time.perf_counter の値）
+            
+        Returns:
+            tuple: (最善の行動値, 評価値, 探索したノード数)
+            
+        Raises:
+            SearchTimeout: 期限内に探索が終わらなかった場合（引数は探索したノード数）
+        """
+        pool = self._get_pool()
+        beta = SCORE_BOUND + 1
+        nodes = 0
+        
+        def submit(action, alpha, window_beta):
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise SearchTimeout(nodes)
+            return pool.submit(_search_task, position, action, depth, alpha, window_beta, remaining)
+        
+        # 最初の行動を全幅の窓で探索して下限を得る
+        first = submit(actions[0], -SCORE_BOUND - 1, beta)
+        done, _ = wait([first], timeout=_wait_timeout(deadline))
+        first_result = first.result() if done else None
+        if first_result is None:
+            first.cancel()
+            raise SearchTimeout(nodes)
+        nodes += first_result["nodes"]
+        best_action = actions[0]
+        alpha = first_result["score"]
+        
+        # 残りの行動をヌルウィンドウで並列に調べ、結果が届いた順に集計する
+        # （下限は結果が届くまでに上がることがあるため、送った時の下限を覚えておく）
+        pending = {}
+        try:
+            for action in actions[1:]:
+                pending[submit(action, alpha, alpha + 1)] = (action, alpha, False)
+            
+            while pending:
+                done, _ = wait(
+                    list(pending), timeout=_wait_timeout(deadline),
+                    return_when=FIRST_COMPLETED
+                )
+                if not done:
+                    raise SearchTimeout(nodes)
+                
+                for future in done:
+                    action, submitted_alpha, is_full_window = pending.pop(future)
+                    task_result = future.result()
+                    if task_result is None:
+                        raise SearchTimeout(nodes)
+                    nodes += task_result["nodes"]
+                    score = task_result["score"]
+                    
+                    # 送った時の下限以下なら、今の下限を超えることはない
+                    if score <= submitted_alpha:
+                        continue
+                    if is_full_window:
+                        # 全幅の窓の結果は正確な値なので今の下限と比べられる
+                        if score > alpha:
+                            alpha = score
+                            best_action = action
+                    elif submitted_alpha < alpha and score <= alpha:
+                        # 古い下限を超えただけでは分からないので今の下限で調べ直す
+                        pending[submit(action, alpha, alpha + 1)] = (action, alpha, False)
+                    else:
+                        # 下限を超えたので現在の下限で全幅の窓の再探索を行う
+                        pending[submit(action, alpha, beta)] = (action, alpha, True)
+        finally:
+            for future in pending:
+                future.cancel()
+        
+        return best_action, alpha, nodes
+
+
+def measure_speedup(workers=None, depth=4, positions=POSITION_SUITE):
+    """
+    固定局面で単一プロセスの探索と並列探索の時間を計測する
+    
+    どちらも時間制限なしで同じ深さまで探索する。
+    
+    Args:
+        workers (int): ワーカープロセス数、省略時はCPUコア数
+        depth (int): 探索の深さ
+        positions (tuple): 計測に使う局面
+        
+    Returns:
+        dict: 計測結果
+            positions (list): 局面ごとの結果
+            sequential_time (float): 単一プロセスの合計時間（秒）
+            parallel_time (float): 並列探索の合計時間（秒）
+            speedup (float): 速度比
+    """
+    rows = []
+    sequential_total = 0.0
+    parallel_total = 0.0
+    
+    with ParallelSearchEngine(workers=workers, time_limit=float("inf"), max_depth=depth) as parallel:
+        # プロセスの起動時間を計測に含めないように先に起動しておく
+        parallel.search(Board(), BLACK, (0, 0), time_limit=float("inf"))
+        
+        for black_bits, white_bits, side, attack_chances in positions:
+            board = Board.from_bitboards(black_bits, white_bits)
+            
+            sequential = SearchEngine(time_limit=float("inf"), max_depth=depth)
+            start = time.perf_counter()
+            sequential_result = sequential.search(board, side, attack_chances)
+            sequential_time = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            parallel_result = parallel.search(board, side, attack_chances)
+            parallel_time = time.perf_counter() - start
+            
+            sequential_total += sequential_time
+            parallel_total += parallel_time
+            rows.append({
+                "sequential_time": sequential_time,
+                "parallel_time": parallel_time,
+                "sequential_score": sequential_result["score"],
+                "parallel_score": parallel_result["score"],
+                "sequential_nodes": sequential_result["nodes"],
+                "parallel_nodes": parallel_result["nodes"],
+            })
+    
+    return {
+        "positions": rows,
+        "sequential_time": sequential_total,
+        "parallel_time": parallel_total,
+        "speedup": sequential_total / parallel_total if parallel_total else 0.0,
+    }
+
+
+def main():
+    """速度比を計測して表示する"""
+    parser = argparse.ArgumentParser(description="Measure root-parallel search speedup")
+    parser.add_argument("--workers", type=int, default=None, help="ワーカープロセス数")
+    parser.add_argument("--depth", type=int, default=4, help="探索の深さ")
+    args = parser.parse_args()
+    
+    report = measure_speedup(args.workers, args.depth)
+    workers = args.workers or os.cpu_count() or 1
+    print(f"workers={workers} depth={args.depth}")
+    for index, row in enumerate(report["positions"]):
+        print(
+            f"#{index}: sequential {row['sequential_time']:.3f}s ({row['sequential_nodes']} nodes, "
+            f"score {row['sequential_score']})  parallel {row['parallel_time']:.3f}s "
+            f"({row['parallel_nodes']} nodes, score {row['parallel_score']})"
+        )
+    print(
+        f"total: sequential {report['sequential_time']:.3f}s  parallel {report['parallel_time']:.3f}s  "
+        f"speedup x{report['speedup']:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
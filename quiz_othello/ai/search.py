@@ -0,0 +1,583 @@
+"""
+反復深化アルファベータ探索（PVS）を提供するモジュール
+
+Board の make_move / make_attack / unmake を使って盤面をその場で更新しながら
+探索する。通常の手に加えて、アタックチャンスが残っている場合は相手の石を
+対象にしたアタックチャンスも合法な行動として扱う。アタックチャンスは
+クイズの正解率を確率とする確率ノードとして期待値で評価する（Expectiminimax）。
+"""
+
+import math
+import time
+
+from game.constants import (
+    BOARD_SIZE, BLACK, WHITE, AI_TIME_LIMIT, DIFFICULTY_EASY, DIFFICULTY_HARD, INITIAL_ATTACK_CHANCES
+)
+from game.zobrist import MAX_ATTACK_CHANCES
+from quiz.quiz_manager import QuizManager
+from game.bitboard import popcount, flips
+from .actions import ATTACK_OFFSET
+from .evaluation import SQUARE_WEIGHTS, SCORE_BOUND, evaluate, final_score
+from .transposition import (
+    TranspositionTable, BOUND_EXACT, BOUND_LOWER, BOUND_UPPER, NO_MOVE
+)
+
+# アタックチャンスのクイズに正解する既定の確率（難易度ごと）
+DEFAULT_SUCCESS_RATES = {
+    DIFFICULTY_EASY: 0.8,
+    DIFFICULTY_HARD: 0.5,
+}
+
+# アタックチャンスの既定の初期回数 (黒, 白)
+DEFAULT_INITIAL_ATTACK_CHANCES = (INITIAL_ATTACK_CHANCES, INITIAL_ATTACK_CHANCES)
+
+# 既定の最大探索深さ
+DEFAULT_MAX_DEPTH = 60
+
+# 時間切れを確認する間隔（ノード数、2のべき乗 - 1）
+# 1ノードに100マイクロ秒以上かかるため、持ち時間を超える時間が数ミリ秒に収まるように細かく確認する
+_TIME_CHECK_MASK = 63
+
+# 次の深さを始めない経過時間の割合（持ち時間に対する）
+_NEXT_DEPTH_RATIO = 0.5
+
+
+class SearchTimeout(Exception):
+    """持ち時間を使い切ったことを示す例外"""
+
+
+def attack_success_probabilities(success_rates, initial_attack_chances=DEFAULT_INITIAL_ATTACK_CHANCES):
+    """
+    手番と残り回数ごとのアタックチャンスの成功確率の表を作る
+    
+    成功確率は次に出題されるクイズの難易度から決まり、難易度は初期回数と
+    残り回数から求めた使用回数で決まる。
+    
+    Args:
+        success_rates (dict): 難易度ごとのアタックチャンス成功確率
+        initial_attack_chances (tuple): (黒の初期回数, 白の初期回数)
+        
+    Returns:
+        tuple: (黒の表, 白の表)、表は残り回数をインデックスとする成功確率のリスト
+    """
+    return tuple(
+        [success_rates[QuizManager.get_difficulty_for_remaining_chances(remaining, initial)]
+         for remaining in range(MAX_ATTACK_CHANCES + 1)]
+        for initial in initial_attack_chances
+    )
+
+
+class SearchEngine:
+    """反復深化アルファベータ探索を行うクラス"""
+    
+    def __init__(self, time_limit=AI_TIME_LIMIT, max_depth=DEFAULT_MAX_DEPTH, tt_bucket_bits=16,
+                 success_rates=None, initial_attack_chances=DEFAULT_INITIAL_ATTACK_CHANCES):
+        """
+        探索エンジンを初期化
+        
+        Args:
+            time_limit (float): 1手あたりの持ち時間（秒）
+            max_depth (int): 最大探索深さ
+            tt_bucket_bits (int): 置換表のバケット数の2を底とする対数
+            success_rates (dict): 難易度ごとのアタックチャンス成功確率
+                                  （省略時は DEFAULT_SUCCESS_RATES）
+            initial_attack_chances (tuple): (黒の初期回数, 白の初期回数)（難易度の判定に使う）
+        """
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.tt = TranspositionTable(tt_bucket_bits)
+        self.success_rates = dict(success_rates or DEFAULT_SUCCESS_RATES)
+        self.initial_attack_chances = None
+        self.set_initial_attack_chances(initial_attack_chances)
+        
+        # 探索中の状態
+        self.board = None
+        self.attack_chances = [0, 0]
+        self.deadline = 0.0
+        self.nodes = 0
+    
+    def set_initial_attack_chances(self, initial_attack_chances):
+        """
+        アタックチャンスの初期回数を設定し、成功確率の表を作り直す
+        
+        初期回数が変わった場合は、以前の成功確率で求めた置換表の内容を消す。
+        
+        Args:
+            initial_attack_chances (tuple): (黒の初期回数, 白の初期回数)
+        """
+        initial_attack_chances = tuple(initial_attack_chances)
+        if initial_attack_chances == self.initial_attack_chances:
+            return
+        if self.initial_attack_chances is not None:
+            self.tt.clear()
+        self.initial_attack_chances = initial_attack_chances
+        
+        # 手番と残りアタックチャンス回数ごとの成功確率（次に出題される難易度から決まる）
+        self.success_probabilities = attack_success_probabilities(self.success_rates, initial_attack_chances)
+    
+    def search(self, board, side_to_move, attack_chances, time_limit=None):
+        """
+        最善の行動を探索する
+        
+        渡された盤面は変更せず、複製した盤面の上で探索する。
+        
+        Args:
+            board (Board): 盤面
+            side_to_move (int): 手番のプレイヤーID（0:黒, 1:白）
+            attack_chances (tuple): (黒の残り回数, 白の残り回数)
+            time_limit (float): 今回の持ち時間（秒）、省略時はエンジンの設定値
+            
+        Returns:
+            dict: 探索結果
+                action (int): 最善の行動値（ai.actions 参照）、行動が無い場合はNone
+                score (int): 手番側から見た評価値
+                depth (int): 探索を完了した深さ
+                nodes (int): 探索したノード数
+                time (float): 探索にかかった時間（秒）
+        """
+        start_time = time.perf_counter()
+        limit = self.time_limit if time_limit is None else time_limit
+        self._prepare(board, attack_chances, start_time + limit)
+        self.tt.new_search()
+        
+        actions = self._generate_actions(side_to_move, NO_MOVE)
+        result = {
+            "action": actions[0] if actions else None,
+            "score": 0,
+            "depth": 0,
+            "nodes": 0,
+            "time": 0.0,
+        }
+        
+        if len(actions) > 1:
+            for depth in range(1, self.max_depth + 1):
+                try:
+                    action, score = self._search_root(side_to_move, depth, actions)
+                except SearchTimeout:
+                    break
+                
+                result["action"] = action
+                result["score"] = score
+                result["depth"] = depth
+                
+                # 最善手を先頭にして次の深さの探索順にする
+                actions.remove(action)
+                actions.insert(0, action)
+                
+                # 決着がついた場合や、次の深さを終えられそうにない場合は打ち切る
+                if abs(score) >= SCORE_BOUND // 2:
+                    break
+                if time.perf_counter() - start_time > limit * _NEXT_DEPTH_RATIO:
+                    break
+        
+        result["nodes"] = self.nodes
+        result["time"] = time.perf_counter() - start_time
+        self.board = None
+        return result
+    
+    def root_actions(self, board, side_to_move, attack_chances):
+        """
+        ルート局面の行動を探索順に並べて返す
+        
+        Args:
+            board (Board): 盤面
+            side_to_move (int): 手番のプレイヤーID（0:黒, 1:白）
+            attack_chances (tuple): (黒の残り回数, 白の残り回数)
+            
+        Returns:
+            list: 行動値のリスト
+        """
+        self._prepare(board, attack_chances, None)
+        actions = self._generate_actions(side_to_move, NO_MOVE)
+        self.board = None
+        return actions
+    
+    def search_action(self, board, side_to_move, attack_chances, action, depth,
+                      alpha=-SCORE_BOUND - 1, beta=SCORE_BOUND + 1, time_limit=None):
+        """
+        ルートの行動1つを固定の深さと窓で探索する（並列探索のワーカー用）
+        
+        Args:
+            board (Board): 盤面
+            side_to_move (int): 手番のプレイヤーID（0:黒, 1:白）
+            attack_chances (tuple): (黒の残り回数, 白の残り回数)
+            action (int): 探索する行動値
+            depth (int): 探索の深さ（この行動を含む）
+            alpha (int): 下限
+            beta (int): 上限
+            time_limit (float): 持ち時間（秒）、省略時はエンジンの設定値
+            
+        Returns:
+            dict: 探索結果
+                score (int): 手番側から見た評価値（窓の外の場合は上限または下限）
+                nodes (int): 探索したノード数
+                
+        Raises:
+            SearchTimeout: 持ち時間内に探索が終わらなかった場合
+        """
+        limit = self.time_limit if time_limit is None else time_limit
+        self._prepare(board, attack_chances, time.perf_counter() + limit)
+        try:
+            score = self._search_action(action, side_to_move, depth, alpha, beta)
+        finally:
+            self.board = None
+        return {"score": score, "nodes": self.nodes}
+    
+    def evaluate_attacks(self, board, side_to_move, attack_chances, depth, time_limit=None):
+        """
+        相手の石それぞれについて、アタックチャンスが成功した後の局面を評価する
+        
+        盤面の複製は1回だけで、各対象は make_attack / unmake で調べる。
+        
+        Args:
+            board (Board): 盤面
+            side_to_move (int): 手番のプレイヤーID（0:黒, 1:白）
+            attack_chances (tuple): (黒の残り回数, 白の残り回数)（使用前の回数）
+            depth (int): 探索の深さ（アタックチャンスを含む）
+            time_limit (float): 持ち時間（秒）、省略時はエンジンの設定値
+            
+        Returns:
+            dict: 対象の位置番号ごとの、手番側から見た評価値
+            
+        Raises:
+            SearchTimeout: 持ち時間内に探索が終わらなかった場合
+        """
+        limit = self.time_limit if time_limit is None else time_limit
+        self._prepare(board, attack_chances, time.perf_counter() + limit)
+        self.attack_chances[side_to_move] -= 1
+        opponent = 1 - side_to_move
+        scores = {}
+        try:
+            bits = self.board.bitboards[opponent]
+            while bits:
+                low = bits & -bits
+                square = low.bit_length() - 1
+                row, col = divmod(square, BOARD_SIZE)
+                record = self.board.make_attack(row, col, side_to_move)
+                try:
+                    scores[square] = -self._search(opponent, depth - 1, -SCORE_BOUND - 1, SCORE_BOUND + 1)
+                finally:
+                    self.board.unmake(record)
+                bits ^= low
+        finally:
+            self.board = None
+        return scores
+    
+    def _prepare(self, board, attack_chances, deadline):
+        """
+        探索用の盤面と状態を準備する（内部メソッド）
+        
+        Args:
+            board (Board): 盤面（複製して使う）
+            attack_chances (tuple): (黒の残り回数, 白の残り回数)
+            deadline (float): 探索の期限（time.perf_counter の値）、Noneの場合は期限なし
+        """
+        self.board = board.copy()
+        self.attack_chances = [attack_chances[BLACK], attack_chances[WHITE]]
+        self.deadline = float("inf") if deadline is None else deadline
+        self.nodes = 0
+    
+    def _generate_actions(self, side, tt_move):
+        """
+        行動を生成し、探索順に並べて返す（内部メソッド）
+        
+        置換表の最善手、位置の重みが大きい通常の手、反転数が多いアタックチャンスの順に並べる
+        
+        Args:
+            side (int): 手番のプレイヤーID
+            tt_move (int): 置換表に記録された最善手
+            
+        Returns:
+            list: 行動値のリスト
+        """
+        board = self.board
+        moves_mask = board.get_valid_moves_mask(side)
+        if not moves_mask:
+            return []
+        
+        scored = []
+        bits = moves_mask
+        while bits:
+            low = bits & -bits
+            square = low.bit_length() - 1
+            scored.append((SQUARE_WEIGHTS[square], square))
+            bits ^= low
+        
+        if self.attack_chances[side] > 0:
+            player_bits = board.bitboards[side]
+            opponent_bits = board.bitboards[1 - side]
+            bits = opponent_bits
+            while bits:
+                low = bits & -bits
+                square = low.bit_length() - 1
+                gain = popcount(flips(low, player_bits | low, opponent_bits & ~low)) + 1
+                # アタックチャンスは通常の手の後に並べる
+                scored.append((gain - SCORE_BOUND, ATTACK_OFFSET + square))
+                bits ^= low
+        
+        scored.sort(reverse=True)
+        actions = [action for _, action in scored]
+        
+        if tt_move != NO_MOVE and tt_move in actions:
+            actions.remove(tt_move)
+            actions.insert(0, tt_move)
+        
+        return actions
+    
+    def _search_action(self, action, side, depth, alpha, beta):
+        """
+        行動を1つ適用して探索し、手番側から見た評価値を返す（内部メソッド）
+        
+        Args:
+            action (int): 行動値
+            side (int): 手番のプレイヤーID
+            depth (int): 残りの探索深さ（この行動を含む）
+            alpha (int): 下限
+            beta (int): 上限
+            
+        Returns:
+            int: 手番側から見た評価値
+        """
+        if action >= ATTACK_OFFSET:
+            return self._search_attack(action - ATTACK_OFFSET, side, depth, alpha, beta)
+        
+        row, col = divmod(action, BOARD_SIZE)
+        record = self.board.make_move(row, col, side)
+        try:
+            return -self._search(1 - side, depth - 1, -beta, -alpha)
+        finally:
+            self.board.unmake(record)
+    
+    def _search_outcome(self, square, success, side, depth, alpha, beta):
+        """
+        アタックチャンスの結果（成功または失敗）の1つを探索する（内部メソッド）
+        
+        アタックチャンスの回数は呼び出し側で消費済みとする
+        
+        Returns:
+            int: 手番側から見た評価値
+        """
+        if not success:
+            # 失敗した場合は盤面は変わらず、相手の手番になる
+            return -self._search(1 - side, depth - 1, -beta, -alpha)
+        
+        row, col = divmod(square, BOARD_SIZE)
+        record = self.board.make_attack(row, col, side)
+        try:
+            return -self._search(1 - side, depth - 1, -beta, -alpha)
+        finally:
+            self.board.unmake(record)
+    
+    def _probe_outcome(self, square, success, side, depth, threshold):
+        """
+        Star2 の事前調査として、結果の局面で相手の最初の手だけを調べる（内部メソッド）
+        
+        相手の手の1つの評価値は相手側の評価値の下限になるため、
+        手番側から見た評価値の上限が得られる
+        
+        Args:
+            square (int): アタックチャンスの対象の位置番号
+            success (bool): 成功した場合の局面を調べるかどうか
+            side (int): アタックチャンスを宣言した手番のプレイヤーID
+            depth (int): 残りの探索深さ（アタックチャンスを含む）
+            threshold (float): 上限がこの値以下になれば枝刈りできる値
+            
+        Returns:
+            float: 手番側から見た評価値の上限
+        """
+        board = self.board
+        opponent = 1 - side
+        record = None
+        if success:
+            row, col = divmod(square, BOARD_SIZE)
+            record = board.make_attack(row, col, side)
+        
+        try:
+            # 相手が打てない局面や葉に近い局面は調べない
+            if depth - 1 <= 0 or not board.get_valid_moves_mask(opponent):
+                return SCORE_BOUND
+            
+            key = board.get_hash(opponent, self.attack_chances)
+            entry = self.tt.probe(key)
+            actions = self._generate_actions(opponent, entry[3] if entry is not None else NO_MOVE)
+            move = next(action for action in actions if action < ATTACK_OFFSET)
+            
+            # 相手側から見て -threshold 以上かどうかをヌルウィンドウで調べる
+            bound = math.ceil(-threshold)
+            score = self._search_action(move, opponent, depth - 1, bound - 1, bound)
+            if score >= bound:
+                return -score
+            return SCORE_BOUND
+        finally:
+            if record is not None:
+                board.unmake(record)
+    
+    def _search_attack(self, square, side, depth, alpha, beta):
+        """
+        アタックチャンスを確率ノード（期待値ノード）として探索する（内部メソッド）
+        
+        クイズに正解する確率 p で対象の石と挟まれた石が反転し、確率 1 - p で
+        回数だけが消費される。Star2 の事前調査で各結果の上限を求めてから、
+        Star1 の窓で各結果を探索して枝刈りする。
+        
+        Args:
+            square (int): アタックチャンスの対象の位置番号
+            side (int): 手番のプレイヤーID
+            depth (int): 残りの探索深さ（アタックチャンスを含む）
+            alpha (int): 下限
+            beta (int): 上限
+            
+        Returns:
+            int: 手番側から見た評価値（期待値を整数に丸めた値）
+        """
+        probability = self.success_probabilities[side][self.attack_chances[side]]
+        outcomes = [(p, success) for p, success in ((probability, True), (1.0 - probability, False)) if p > 0.0]
+        lower = -SCORE_BOUND
+        
+        self.attack_chances[side] -= 1
+        try:
+            # Star2: 各結果の上限を事前調査する
+            uppers = []
+            rest_upper = float(SCORE_BOUND)
+            known_upper = 0.0
+            for p, success in outcomes:
+                rest_upper -= p * SCORE_BOUND
+                threshold = (alpha - known_upper - rest_upper) / p
+                upper = self._probe_outcome(square, success, side, depth, threshold)
+                uppers.append(upper)
+                known_upper += p * upper
+                if known_upper + rest_upper <= alpha:
+                    return math.ceil(known_upper + rest_upper)
+            
+            # Star1: 既知の結果と残りの上限・下限から各結果の窓を決めて探索する
+            known = 0.0
+            rest_upper = sum(p * upper for (p, _), upper in zip(outcomes, uppers))
+            rest_lower = lower
+            for (p, success), upper in zip(outcomes, uppers):
+                rest_upper -= p * upper
+                rest_lower -= p * lower
+                child_alpha = (alpha - known - rest_upper) / p
+                child_beta = (beta - known - rest_lower) / p
+                if child_alpha >= upper:
+                    return math.ceil(known + p * upper + rest_upper)
+                
+                window_alpha = math.floor(max(lower, child_alpha))
+                window_beta = math.ceil(min(upper, child_beta))
+                score = self._search_outcome(square, success, side, depth, window_alpha, window_beta)
+                
+                if score <= child_alpha:
+                    return math.ceil(known + p * score + rest_upper)
+                if score >= child_beta:
+                    return math.floor(known + p * score + rest_lower)
+                known += p * score
+            
+            return round(known)
+        finally:
+            self.attack_chances[side] += 1
+    
+    def _search_root(self, side, depth, actions):
+        """
+        ルート局面を探索する（内部メソッド）
+        
+        Returns:
+            tuple: (最善の行動値, 評価値)
+        """
+        alpha = -SCORE_BOUND - 1
+        beta = SCORE_BOUND + 1
+        best_action = actions[0]
+        
+        for index, action in enumerate(actions):
+            if index == 0:
+                score = self._search_action(action, side, depth, alpha, beta)
+            else:
+                score = self._search_action(action, side, depth, alpha, alpha + 1)
+                if alpha < score < beta:
+                    score = self._search_action(action, side, depth, alpha, beta)
+            
+            if score > alpha:
+                alpha = score
+                best_action = action
+        
+        key = self.board.get_hash(side, self.attack_chances)
+        self.tt.store(key, depth, BOUND_EXACT, alpha, best_action)
+        return best_action, alpha
+    
+    def _search(self, side, depth, alpha, beta):
+        """
+        PVS（Principal Variation Search）で局面を探索する（内部メソッド）
+        
+        Args:
+            side (int): 手番のプレイヤーID
+            depth (int): 残りの探索深さ
+            alpha (int): 下限
+            beta (int): 上限
+            
+        Returns:
+            int: 手番側から見た評価値
+        """
+        self.nodes += 1
+        if not self.nodes & _TIME_CHECK_MASK and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+        
+        board = self.board
+        opponent = 1 - side
+        player_bits = board.bitboards[side]
+        opponent_bits = board.bitboards[opponent]
+        
+        if not board.get_valid_moves_mask(side):
+            if not board.get_valid_moves_mask(opponent):
+                # 両者とも打てなければ終局
+                return final_score(player_bits, opponent_bits)
+            # パスして相手の手番にする
+            return -self._search(opponent, depth, -beta, -alpha)
+        
+        if depth <= 0:
+            return evaluate(
+                player_bits, opponent_bits,
+                self.attack_chances[side], self.attack_chances[opponent]
+            )
+        
+        key = board.get_hash(side, self.attack_chances)
+        entry = self.tt.probe(key)
+        tt_move = NO_MOVE
+        if entry is not None:
+            entry_depth, bound, entry_score, tt_move = entry
+            if entry_depth >= depth:
+                if bound == BOUND_EXACT:
+                    return entry_score
+                if bound == BOUND_LOWER and entry_score >= beta:
+                    return entry_score
+                if bound == BOUND_UPPER and entry_score <= alpha:
+                    return entry_score
+        
+        original_alpha = alpha
+        best_score = -SCORE_BOUND - 1
+        best_action = NO_MOVE
+        
+        for index, action in enumerate(self._generate_actions(side, tt_move)):
+            if index == 0:
+                score = self._search_action(action, side, depth, alpha, beta)
+            else:
+                # 最初の手以外はヌルウィンドウで調べ、超えた場合だけ再探索する
+                score = self._search_action(action, side, depth, alpha, alpha + 1)
+                if alpha < score < beta:
+                    score = self._search_action(action, side, depth, alpha, beta)
+            
+            if score > best_score:
+                best_score = score
+                best_action = action
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        
+        if best_score <= original_alpha:
+            bound = BOUND_UPPER
+        elif best_score >= beta:
+            bound = BOUND_LOWER
+        else:
+            bound = BOUND_EXACT
+        self.tt.store(key, depth, bound, best_score, best_action)
+        
+        return best_score
+
@@ -0,0 +1,183 @@
+"""
+探索用の置換表（トランスポジションテーブル）を提供するモジュール
+
+エントリは事前に確保した配列に格納するため、長時間の対局や自己対戦でも
+メモリ使用量は一定に保たれる。各バケットは深さ優先スロットと常時置換
+スロットの2つで構成される。
+"""
+
+from array import array
+
+# 評価値の種類
+BOUND_NONE = 0
+BOUND_EXACT = 1
+BOUND_LOWER = 2
+BOUND_UPPER = 3
+
+# 最善手が記録されていないことを示す値
+NO_MOVE = -1
+
+# 空きスロットを示す深さ
+_EMPTY_DEPTH = -1
+
+
+class TranspositionTable:
+    """固定サイズの置換表を管理するクラス"""
+    
+    def __init__(self, bucket_bits=16):
+        """
+        置換表を初期化
+        
+        Args:
+            bucket_bits (int): バケット数の2を底とする対数（バケット数は 2 ** bucket_bits）
+        """
+        self.bucket_count = 1 << bucket_bits
+        self.bucket_mask = self.bucket_count - 1
+        self.slot_count = self.bucket_count * 2
+        
+        # スロットごとの配列（インデックス bucket * 2 が深さ優先、bucket * 2 + 1 が常時置換）
+        self._allocate()
+        
+        # 現在の世代（探索ごとに進める）
+        self.generation = 0
+        
+        # 統計情報
+        self.probes = 0
+        self.hits = 0
+        self.collisions = 0
+        self.stores = 0
+        self.replacements = 0
+    
+    def _allocate(self):
+        """
+        エントリ用の配列を確保する（内部メソッド）
+        """
+        self.keys = array("Q", bytes(8 * self.slot_count))
+        self.depths = array("b", [_EMPTY_DEPTH]) * self.slot_count
+        self.bounds = array("B", bytes(self.slot_count))
+        self.scores = array("i", bytes(4 * self.slot_count))
+        self.moves = array("h", [NO_MOVE]) * self.slot_count
+        self.generations = array("B", bytes(self.slot_count))
+    
+    def clear(self):
+        """
+        全エントリと統計情報を消去する
+        """
+        self._allocate()
+        self.generation = 0
+        self.reset_stats()
+    
+    def reset_stats(self):
+        """
+        統計情報をリセットする
+        """
+        self.probes = 0
+        self.hits = 0
+        self.collisions = 0
+        self.stores = 0
+        self.replacements = 0
+    
+    def new_search(self):
+        """
+        世代を進める（着手ごとに呼び出す）
+        
+        古い世代のエントリは深さにかかわらず置換対象になる
+        """
+        self.generation = (self.generation + 1) & 0xFF
+    
+    def probe(self, key):
+        """
+        局面のエントリを検索する
+        
+        Args:
+            key (int): 局面の64ビットハッシュ値
+            
+        Returns:
+            tuple: (深さ, 評価値の種類, 評価値, 最善手)、見つからない場合はNone
+        """
+        self.probes += 1
+        base = (key & self.bucket_mask) << 1
+        
+        for index in (base, base + 1):
+            if self.depths[index] != _EMPTY_DEPTH and self.keys[index] == key:
+                self.hits += 1
+                # 参照されたエントリは現在の世代として扱う
+                self.generations[index] = self.generation
+                return self.depths[index], self.bounds[index], self.scores[index], self.moves[index]
+        
+        if self.depths[base] != _EMPTY_DEPTH or self.depths[base + 1] != _EMPTY_DEPTH:
+            # バケットが別の局面で埋まっている
+            self.collisions += 1
+        
+        return None
+    
+    def store(self, key, depth, bound, score, move=NO_MOVE):
+        """
+        局面のエントリを保存する
+        
+        深さ優先スロットは、同じ局面・古い世代・より浅い探索のいずれかの場合に
+        置き換える。それ以外は常時置換スロットに書き込む。
+        
+        Args:
+            key (int): 局面の64ビットハッシュ値
+            depth (int): 探索の深さ
+            bound (int): 評価値の種類（BOUND_EXACT / BOUND_LOWER / BOUND_UPPER）
+            score (int): 評価値
+            move (int): 最善手（記録しない場合は NO_MOVE）
+        """
+        self.stores += 1
+        base = (key & self.bucket_mask) << 1
+        
+        stored_depth = self.depths[base]
+        if (stored_depth == _EMPTY_DEPTH
+                or self.keys[base] == key
+                or self.generations[base] != self.generation
+                or depth >= stored_depth):
+            index = base
+        else:
+            index = base + 1
+        
+        if self.depths[index] != _EMPTY_DEPTH:
+            if self.keys[index] == key:
+                # 同じ局面で最善手が無い場合は以前の最善手を残す
+                if move == NO_MOVE:
+                    move = self.moves[index]
+            else:
+                self.replacements += 1
+        
+        self.keys[index] = key
+        self.depths[index] = min(depth, 127)
+        self.bounds[index] = bound
+        self.scores[index] = score
+        self.moves[index] = move
+        self.generations[index] = self.generation
+    
+    def hashfull(self):
+        """
+        現在の世代で使用中のスロットの割合を返す
+        
+        Returns:
+            float: 使用率（0.0〜1.0）
+        """
+        sample = min(self.slot_count, 1000)
+        used = 0
+        for index in range(sample):
+            if self.depths[index] != _EMPTY_DEPTH and self.generations[index] == self.generation:
+                used += 1
+        return used / sample
+    
+    def get_stats(self):
+        """
+        統計情報を返す
+        
+        Returns:
+            dict: 検索回数、ヒット数、ヒット率、衝突数、保存回数、置換回数
+        """
+        return {
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.probes if self.probes else 0.0,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "replacements": self.replacements,
+        }
@@ -0,0 +1,4 @@
+"""
+benchmarks パッケージ
+ゲーム・クイズ・描画の処理時間を測定するモジュール群
+"""
@@ -0,0 +1,208 @@
+"""
+測定する処理（ベンチマークケース）を定義するモジュール
+
+各ケースは準備を行って、測定する引数なしの関数を返す。局面は固定シードの
+乱数で作るため、実行ごとに同じ処理を測定できる。描画のケースは
+SDL_VIDEODRIVER=dummy で画面を開かずに1フレームを描画する。
+"""
+
+import os
+import random
+
+from game.board import Board
+from game.player import Player
+from game.game_manager import GameManager
+from game.constants import BLACK, WHITE, DIFFICULTY_EASY, DIFFICULTY_HARD
+from quiz.quiz_data import QuizData
+from simulation.quiz_model import SimulatedQuizManager
+
+# 局面を作る乱数のシード
+POSITION_SEED = 20240501
+
+# 中盤の局面を作るために打つ手数
+MIDGAME_PLIES = 20
+
+# 描画に使う画面の大きさ
+SCREEN_SIZE = (800, 600)
+
+
+def quiz_data_path():
+    """
+    ゲームが使うクイズデータファイルのパスを返す（pygame を読み込まない）
+    
+    Returns:
+        str: クイズデータファイルのパス
+    """
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "quiz_data.json")
+
+
+def midgame_board(plies=MIDGAME_PLIES, seed=POSITION_SEED):
+    """
+    初期配置から乱数で手を進めた局面を返す
+    
+    Args:
+        plies (int): 打つ手数
+        seed (int): 乱数のシード
+        
+    Returns:
+        tuple: (盤面, 手番のプレイヤーID)
+    """
+    rng = random.Random(seed)
+    board = Board()
+    side = BLACK
+    for _ in range(plies):
+        moves = board.get_valid_moves(side)
+        if not moves:
+            side = 1 - side
+            moves = board.get_valid_moves(side)
+            if not moves:
+                break
+        board.place_stone(*rng.choice(moves), side)
+        side = 1 - side
+    if not board.get_valid_moves(side):
+        side = 1 - side
+    return board, side
+
+
+def _started_game_manager():
+    """
+    中盤の局面で対局中のゲームマネージャーを作る（内部関数）
+    """
+    board, side = midgame_board()
+    game_manager = GameManager(SimulatedQuizManager())
+    game_manager.start_game(players=[Player(BLACK, "Player 1"), Player(WHITE, "Player 2")])
+    game_manager.board = board
+    game_manager.current_player_idx = side
+    return game_manager
+
+
+def bench_get_valid_moves():
+    """Board.get_valid_moves（盤面が変わった直後の計算）"""
+    board, side = midgame_board()
+    
+    def run():
+        # 版数を進めてキャッシュを使わずに計算させる
+        board.version += 1
+        board.get_valid_moves(side)
+    return run
+
+
+def bench_get_valid_moves_cached():
+    """Board.get_valid_moves（同じ盤面での2回目以降の呼び出し）"""
+    board, side = midgame_board()
+    board.get_valid_moves(side)
+    return lambda: board.get_valid_moves(side)
+
+
+def bench_copy():
+    """Board.copy（place_stone と attack_stone の測定に含まれる複製の時間）"""
+    board, _ = midgame_board()
+    return board.copy
+
+
+def bench_place_stone():
+    """Board.copy + Board.place_stone"""
+    board, side = midgame_board()
+    row, col = board.get_valid_moves(side)[0]
+    
+    def run():
+        board.copy().place_stone(row, col, side)
+    return run
+
+
+def bench_attack_stone():
+    """Board.copy + Board.attack_stone"""
+    board, side = midgame_board()
+    row, col = board.get_opponent_stones(side)[0]
+    
+    def run():
+        board.copy().attack_stone(row, col, side)
+    return run
+
+
+def bench_count_stones():
+    """Board.count_stones"""
+    board, _ = midgame_board()
+    return board.count_stones
+
+
+def bench_switch_turn():
+    """GameManager.switch_turn（両者が打てる局面で手番を交代する）"""
+    game_manager = _started_game_manager()
+    return game_manager.switch_turn
+
+
+def bench_quiz_load():
+    """QuizData の読み込み"""
+    path = quiz_data_path()
+    return lambda: QuizData(path)
+
+
+def bench_quiz_sample():
+    """QuizData.get_random_quiz（難易度を交互に）"""
+    random.seed(POSITION_SEED)
+    quiz_data = QuizData(quiz_data_path())
+    
+    def run():
+        quiz_data.get_random_quiz(DIFFICULTY_EASY)
+        quiz_data.get_random_quiz(DIFFICULTY_HARD)
+    return run
+
+
+def _headless_screen():
+    """
+    画面を開かずに描画できるように pygame を初期化する（内部関数）
+    
+    Returns:
+        pygame.Surface: 描画先の画面
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    pygame.init()
+    return pygame.display.set_mode(SCREEN_SIZE)
+
+
+def bench_game_view_draw():
+    """GameView.draw（通常モードの1フレーム）"""
+    screen = _headless_screen()
+    from ui.game_view import GameView
+    game_view = GameView(_started_game_manager(), *SCREEN_SIZE)
+    return lambda: game_view.draw(screen)
+
+
+def bench_game_view_draw_attack():
+    """GameView.draw（アタックモードの1フレーム）"""
+    screen = _headless_screen()
+    from ui.game_view import GameView
+    game_view = GameView(_started_game_manager(), *SCREEN_SIZE)
+    game_view.attack_mode = True
+    return lambda: game_view.draw(screen)
+
+
+def bench_quiz_view_draw():
+    """QuizView.draw（クイズ画面の1フレーム）"""
+    screen = _headless_screen()
+    from ui.quiz_view import QuizView
+    from quiz.quiz_manager import QuizManager
+    quiz_data = QuizData(quiz_data_path())
+    quiz_view = QuizView(QuizManager(quiz_data), *SCREEN_SIZE)
+    quiz = quiz_data.quizzes[DIFFICULTY_HARD][0]
+    return lambda: quiz_view.draw(screen, quiz, 12.5)
+
+
+# (名前, 準備関数) の一覧
+BENCHMARKS = (
+    ("board.get_valid_moves", bench_get_valid_moves),
+    ("board.get_valid_moves_cached", bench_get_valid_moves_cached),
+    ("board.copy", bench_copy),
+    ("board.place_stone", bench_place_stone),
+    ("board.attack_stone", bench_attack_stone),
+    ("board.count_stones", bench_count_stones),
+    ("game_manager.switch_turn", bench_switch_turn),
+    ("quiz_data.load", bench_quiz_load),
+    ("quiz_data.get_random_quiz", bench_quiz_sample),
+    ("ui.game_view.draw", bench_game_view_draw),
+    ("ui.game_view.draw_attack", bench_game_view_draw_attack),
+    ("ui.quiz_view.draw", bench_quiz_view_draw),
+)
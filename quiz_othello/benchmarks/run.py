@@ -0,0 +1,189 @@
+"""
+ベンチマークを実行して結果を保存・比較するモジュール
+
+各ケースは timeit で1回の測定が一定時間以上になる回数を決めてから
+複数回測定し、1回あたりの最小時間と中央値を記録する。結果は実行環境の
+情報とともに JSON で保存し、以前の結果（ベースライン）と比べて
+遅くなったケースを表示する。
+
+ベースラインの作成と比較：
+    python -m benchmarks.run --output baseline.json
+    python -m benchmarks.run --output current.json --baseline baseline.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+
+from .cases import BENCHMARKS
+
+# 既定の測定回数
+DEFAULT_REPEAT = 5
+
+# 遅くなったとみなす最小時間の増加率の既定値
+DEFAULT_THRESHOLD = 0.10
+
+
+def measure(function, repeat=DEFAULT_REPEAT):
+    """
+    関数の1回あたりの実行時間を測定する
+    
+    Args:
+        function (function): 測定する引数なしの関数
+        repeat (int): 測定回数
+        
+    Returns:
+        dict: 測定結果
+            loops (int): 1回の測定で呼び出した回数
+            best (float): 1回あたりの最小時間（秒）
+            median (float): 1回あたりの時間の中央値（秒）
+    """
+    timer = timeit.Timer(function)
+    loops, _ = timer.autorange()
+    times = [total / loops for total in timer.repeat(repeat, loops)]
+    return {"loops": loops, "best": min(times), "median": statistics.median(times)}
+
+
+def machine_metadata():
+    """
+    実行環境の情報を返す
+    
+    Returns:
+        dict: Python のバージョン、OS、CPU、コミット、実行日時
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+        "time": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+
+
+def run_benchmarks(names=None, repeat=DEFAULT_REPEAT, progress=None):
+    """
+    ベンチマークを実行する
+    
+    準備に失敗したケース（pygame が無い場合の描画など）は理由を記録して飛ばす。
+    
+    Args:
+        names (list): 実行するケースの名前に含まれる文字列、省略時はすべて
+        repeat (int): 測定回数
+        progress (function): ケースが終わるたびに呼ばれる関数（引数は名前と結果）
+        
+    Returns:
+        dict: {"metadata": 実行環境の情報, "results": {名前: 測定結果}}
+    """
+    results = {}
+    for name, setup in BENCHMARKS:
+        if names and not any(part in name for part in names):
+            continue
+        try:
+            function = setup()
+        except Exception as e:
+            result = {"skipped": f"{type(e).__name__}: {e}"}
+        else:
+            result = measure(function, repeat)
+        results[name] = result
+        if progress:
+            progress(name, result)
+    
+    return {"metadata": machine_metadata(), "results": results}
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    ベースラインと比べて各ケースの時間の比を求める
+    
+    Args:
+        current (dict): run_benchmarks の結果
+        baseline (dict): 以前の run_benchmarks の結果
+        threshold (float): 遅くなったとみなす最小時間の増加率
+        
+    Returns:
+        list: 両方で測定したケースの [{"name", "baseline", "current", "ratio", "regression"}, ...]
+    """
+    rows = []
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if "best" not in result or not previous or "best" not in previous:
+            continue
+        ratio = result["best"] / previous["best"]
+        rows.append({
+            "name": name,
+            "baseline": previous["best"],
+            "current": result["best"],
+            "ratio": ratio,
+            "regression": ratio > 1.0 + threshold,
+        })
+    return rows
+
+
+def _format_time(seconds):
+    """
+    時間を読みやすい単位の文字列にする（内部関数）
+    """
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:9.3f} ms"
+    return f"{seconds * 1e6:9.3f} us"
+
+
+def main():
+    """ベンチマークを実行し、結果を保存してベースラインと比べる"""
+    parser = argparse.ArgumentParser(description="Quiz Othello microbenchmarks")
+    parser.add_argument("names", nargs="*", help="実行するケースの名前に含まれる文字列")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="測定回数")
+    parser.add_argument("--output", help="結果を保存する JSON ファイルのパス")
+    parser.add_argument("--baseline", help="比較するベースラインの JSON ファイルのパス")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="遅くなったとみなす増加率（0.1 で10%%）")
+    args = parser.parse_args()
+    
+    def progress(name, result):
+        if "skipped" in result:
+            print(f"{name:32s} skipped ({result['skipped']})")
+        else:
+            print(f"{name:32s} {_format_time(result['best'])} (median {_format_time(result['median'])})")
+    
+    current = run_benchmarks(args.names, args.repeat, progress)
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+    
+    if not args.baseline:
+        return
+    
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    
+    print(f"\ncompared with {args.baseline} ({baseline['metadata'].get('commit') or 'unknown commit'})")
+    regressions = 0
+    for row in compare(current, baseline, args.threshold):
+        mark = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['name']:32s} {_format_time(row['baseline'])} -> {_format_time(row['current'])} "
+              f"x{row['ratio']:.2f}{mark}")
+        regressions += row["regression"]
+    
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+"""
+棋譜ファイルを番号で参照するモジュール
+
+棋譜ファイル（game.record 形式）の各対局の開始位置をインデックスファイル
+（棋譜ファイル名 + ".idx"）に記録し、棋譜ファイルとインデックスを mmap して
+k 番目の対局を O(1) で取り出す。棋譜ファイルに追記された場合は、
+インデックスを追記された部分だけ更新する。
+
+インデックスファイルの形式（リトルエンディアン）：
+    ヘッダ（40バイト）: マジック (8s), インデックス済みの棋譜ファイルの長さ (Q), 対局数 (Q),
+                        インデックス済みの部分の先頭と末尾のチェックサム (16s)
+    対局ごとの開始位置 (Q) の配列
+
+チェックサムが棋譜ファイルと一致しない場合（同じ長さ以上のファイルで
+置き換えられた場合など）はインデックスを作り直す。
+
+対局数と勝敗を並列に集計するコマンド：
+    python -m game.archive games.rec --workers 8
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .constants import BLACK, WHITE
+from .record import RECORD_MAGIC, decode_body, final_board
+
+# インデックスファイルの拡張子
+INDEX_SUFFIX = ".idx"
+
+# インデックスファイルのヘッダと開始位置の形式
+INDEX_MAGIC = b"QOIDX\x00\x00\x02"
+INDEX_HEADER_FORMAT = struct.Struct("<8sQQ16s")
+OFFSET_FORMAT = struct.Struct("<Q")
+
+# チェックサムに含める、インデックス済みの部分の先頭と末尾のバイト数
+CHECKSUM_BYTES = 4096
+
+# 並列走査で1つのタスクが担当する対局数の既定値
+DEFAULT_SCAN_CHUNK = 10000
+
+# 開始位置をまとめて書き出す数
+_OFFSET_BATCH = 1 << 16
+
+
+def index_path_for(record_path):
+    """
+    棋譜ファイルに対応するインデックスファイルのパスを返す
+    
+    Args:
+        record_path (str): 棋譜ファイルのパス
+        
+    Returns:
+        str: インデックスファイルのパス
+    """
+    return record_path + INDEX_SUFFIX
+
+
+def _prefix_checksum(record_file, indexed_size):
+    """
+    棋譜ファイルのインデックス済みの部分の先頭と末尾のチェックサムを求める（内部関数）
+    
+    ファイル全体を読まずに済むように、先頭と末尾の CHECKSUM_BYTES バイトだけを使う。
+    
+    Args:
+        record_file (file): バイナリで開いた棋譜ファイル
+        indexed_size (int): インデックス済みの長さ
+        
+    Returns:
+        bytes: 16バイトのチェックサム
+    """
+    digest = hashlib.blake2b(struct.pack("<Q", indexed_size), digest_size=16)
+    record_file.seek(0)
+    digest.update(record_file.read(min(CHECKSUM_BYTES, indexed_size)))
+    tail_start = max(0, indexed_size - CHECKSUM_BYTES)
+    record_file.seek(tail_start)
+    digest.update(record_file.read(indexed_size - tail_start))
+    return digest.digest()
+
+
+def _read_index_header(index_path, record_file, record_size):
+    """
+    インデックスファイルのヘッダを読み、棋譜ファイルに対応しているか確かめる（内部関数）
+    
+    Args:
+        index_path (str): インデックスファイルのパス
+        record_file (file): バイナリで開いた棋譜ファイル
+        record_size (int): 棋譜ファイルの長さ
+        
+    Returns:
+        tuple: (インデックス済みの長さ, 対局数)、使えない場合はNone
+    """
+    try:
+        with open(index_path, "rb") as f:
+            header = f.read(INDEX_HEADER_FORMAT.size)
+            size = os.fstat(f.fileno()).st_size
+    except OSError:
+        return None
+    
+    if len(header) != INDEX_HEADER_FORMAT.size:
+        return None
+    magic, indexed_size, count, checksum = INDEX_HEADER_FORMAT.unpack(header)
+    if magic != INDEX_MAGIC or size != INDEX_HEADER_FORMAT.size + count * OFFSET_FORMAT.size:
+        return None
+    if not len(RECORD_MAGIC) <= indexed_size <= record_size:
+        return None
+    if checksum != _prefix_checksum(record_file, indexed_size):
+        return None
+    return indexed_size, count
+
+
+def read_index(record_path, index_path=None):
+    """
+    インデックスを更新せずに、棋譜ファイルに対応しているか確かめて対局数を返す
+    
+    Args:
+        record_path (str): 棋譜ファイルのパス
+        index_path (str): インデックスファイルのパス、省略時は index_path_for の結果
+        
+    Returns:
+        int: インデックスに含まれる対局数
+        
+    Raises:
+        ValueError: インデックスが無いか、棋譜ファイルに対応していない場合
+    """
+    index_path = index_path or index_path_for(record_path)
+    with open(record_path, "rb") as record_file:
+        header = _read_index_header(index_path, record_file, os.fstat(record_file.fileno()).st_size)
+    if header is None:
+        raise ValueError(f"{index_path}: index is missing or out of date")
+    return header[1]
+
+
+def build_index(record_path, index_path=None):
+    """
+    棋譜ファイルのインデックスを作成または更新する
+    
+    既存のインデックスが棋譜ファイルの先頭部分に対応している場合は、
+    それ以降に追記された対局だけを走査する。末尾で途切れている対局は含めない。
+    
+    Args:
+        record_path (str): 棋譜ファイルのパス
+        index_path (str): インデックスファイルのパス、省略時は index_path_for の結果
+        
+    Returns:
+        int: インデックスに含まれる対局数
+        
+    Raises:
+        ValueError: 棋譜ファイルでない場合
+    """
+    index_path = index_path or index_path_for(record_path)
+    record_size = os.path.getsize(record_path)
+    
+    with open(record_path, "rb") as record_file:
+        if record_file.read(len(RECORD_MAGIC)) != RECORD_MAGIC:
+            raise ValueError(f"{record_path}: not a game record file")
+        
+        header = _read_index_header(index_path, record_file, record_size)
+        if header is not None:
+            position, count = header
+            if position == record_size:
+                return count
+            index_file = open(index_path, "r+b")
+            index_file.seek(0, os.SEEK_END)
+        else:
+            position, count = len(RECORD_MAGIC), 0
+            index_file = open(index_path, "w+b")
+            index_file.write(
+                INDEX_HEADER_FORMAT.pack(INDEX_MAGIC, position, count, _prefix_checksum(record_file, position))
+            )
+        
+        with index_file, mmap.mmap(record_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            offsets = array("Q")
+            while position + 2 <= record_size:
+                frame_end = position + 2 + data[position]
+                if frame_end > record_size:
+                    break
+                offsets.append(position)
+                position = frame_end
+                if len(offsets) >= _OFFSET_BATCH:
+                    count += _write_offsets(index_file, offsets)
+                    offsets = array("Q")
+            count += _write_offsets(index_file, offsets)
+            
+            index_file.seek(0)
+            index_file.write(
+                INDEX_HEADER_FORMAT.pack(INDEX_MAGIC, position, count, _prefix_checksum(record_file, position))
+            )
+    
+    return count
+
+
+def _write_offsets(index_file, offsets):
+    """
+    開始位置の配列をリトルエンディアンで書き出す（内部関数）
+    
+    Returns:
+        int: 書き出した数
+    """
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    offsets.tofile(index_file)
+    return len(offsets)
+
+
+class GameArchive:
+    """棋譜ファイルの対局を番号で参照するクラス"""
+    
+    def __init__(self, record_path, index_path=None, read_only=False):
+        """
+        棋譜ファイルとインデックスを開く（インデックスが古ければ更新する）
+        
+        Args:
+            record_path (str): 棋譜ファイルのパス
+            index_path (str): インデックスファイルのパス、省略時は index_path_for の結果
+            read_only (bool): Trueの場合はインデックスを更新せず、
+                              インデックス済みの対局だけを参照する
+                              
+        Raises:
+            ValueError: read_only でインデックスが無いか、棋譜ファイルに対応していない場合
+        """
+        self.record_path = record_path
+        self.index_path = index_path or index_path_for(record_path)
+        if read_only:
+            self.count = read_index(record_path, self.index_path)
+        else:
+            self.count = build_index(record_path, self.index_path)
+        
+        self._files = []
+        self._maps = []
+        self._data = self._map_file(record_path)
+        self._index = self._map_file(self.index_path)
+    
+    def _map_file(self, path):
+        """
+        ファイルを読み取り専用で mmap する（内部メソッド）
+        """
+        f = open(path, "rb")
+        self._files.append(f)
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return mapped
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def __len__(self):
+        return self.count
+    
+    def __getitem__(self, index):
+        return self.get_game(index)
+    
+    def __iter__(self):
+        return self.iter_games()
+    
+    def close(self):
+        """
+        ファイルを閉じる
+        """
+        for mapped in self._maps:
+            mapped.close()
+        for f in self._files:
+            f.close()
+        self._maps = []
+        self._files = []
+    
+    def get_frame(self, index):
+        """
+        k 番目の対局のフレームを返す
+        
+        Args:
+            index (int): 対局番号（0から、負の場合は末尾から）
+            
+        Returns:
+            tuple: (アタックチャンスの初期回数のバイト, 本体のバイト列)
+            
+        Raises:
+            IndexError: 対局番号が範囲外の場合
+        """
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("game index out of range")
+        
+        offset = OFFSET_FORMAT.unpack_from(
+            self._index, INDEX_HEADER_FORMAT.size + index * OFFSET_FORMAT.size
+        )[0]
+        length = self._data[offset]
+        return self._data[offset + 1], self._data[offset + 2:offset + 2 + length]
+    
+    def get_game(self, index):
+        """
+        k 番目の対局の棋譜を返す
+        
+        Args:
+            index (int): 対局番号（0から、負の場合は末尾から）
+            
+        Returns:
+            dict: 棋譜（game.record.decode_body 参照）
+        """
+        return decode_body(*self.get_frame(index))
+    
+    def iter_games(self, start=0, stop=None):
+        """
+        指定範囲の対局を順に返す
+        
+        Args:
+            start (int): 最初の対局番号
+            stop (int): 最後の対局番号の次、省略時は最後まで
+            
+        Yields:
+            dict: 棋譜（game.record.decode_body 参照）
+        """
+        stop = self.count if stop is None else min(stop, self.count)
+        for index in range(start, stop):
+            yield self.get_game(index)
+
+
+def scan_ranges(count, chunk_size=DEFAULT_SCAN_CHUNK):
+    """
+    対局番号の範囲を一定数ずつに分割する
+    
+    Args:
+        count (int): 対局数
+        chunk_size (int): 1つの範囲の対局数
+        
+    Returns:
+        list: (最初の対局番号, 最後の対局番号の次) のリスト
+    """
+    return [(start, min(start + chunk_size, count)) for start in range(0, count, chunk_size)]
+
+
+def _scan_task(record_path, index_path, function, start, stop):
+    """
+    ワーカープロセスで範囲内の対局を処理する（内部関数）
+    """
+    # インデックスは親プロセスが更新済みのため、ワーカーは書き込まない
+    with GameArchive(record_path, index_path, read_only=True) as archive:
+        return start, function(archive, start, stop)
+
+
+def parallel_scan(record_path, function, workers=None, chunk_size=DEFAULT_SCAN_CHUNK):
+    """
+    棋譜ファイルを範囲に分割し、プロセスプールで並列に処理する
+    
+    各ワーカーは棋譜ファイルを mmap して担当範囲の対局だけを読むため、
+    ファイルを先頭から読み直す必要はない。インデックスは開始前に更新しておく。
+    
+    Args:
+        record_path (str): 棋譜ファイルのパス
+        function (function): function(archive, start, stop) の形の関数
+                             （ワーカーに渡すためモジュールの最上位で定義すること）
+        workers (int): ワーカープロセス数、省略時はCPUコア数
+        chunk_size (int): 1つのタスクが担当する対局数
+        
+    Yields:
+        tuple: (範囲の最初の対局番号, function の戻り値)（終わった範囲から順に返す）
+    """
+    index_path = index_path_for(record_path)
+    count = build_index(record_path, index_path)
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_scan_task, record_path, index_path, function, start, stop)
+            for start, stop in scan_ranges(count, chunk_size)
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def count_results(archive, start, stop):
+    """
+    範囲内の対局の勝敗を数える（parallel_scan 用）
+    
+    Args:
+        archive (GameArchive): 棋譜
+        start (int): 最初の対局番号
+        stop (int): 最後の対局番号の次
+        
+    Returns:
+        list: [黒の勝ち数, 白の勝ち数, 引き分け数]
+    """
+    counts = [0, 0, 0]
+    for game in archive.iter_games(start, stop):
+        black_count, white_count = final_board(game).count_stones()
+        if black_count > white_count:
+            counts[BLACK] += 1
+        elif white_count > black_count:
+            counts[WHITE] += 1
+        else:
+            counts[2] += 1
+    return counts
+
+
+def main():
+    """棋譜ファイルの対局数と勝敗を並列に集計して表示する"""
+    parser = argparse.ArgumentParser(description="Index a game record file and count results")
+    parser.add_argument("record", help="棋譜ファイルのパス")
+    parser.add_argument("--workers", type=int, default=None, help="ワーカープロセス数")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_SCAN_CHUNK, help="1タスクの対局数")
+    args = parser.parse_args()
+    
+    totals = [0, 0, 0]
+    for _, counts in parallel_scan(args.record, count_results, args.workers, args.chunk_size):
+        totals = [total + count for total, count in zip(totals, counts)]
+    
+    games = sum(totals)
+    print(f"games={games} black={totals[BLACK]} white={totals[WHITE]} draws={totals[2]}")
+
+
+if __name__ == "__main__":
+    main()
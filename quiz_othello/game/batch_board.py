@@ -0,0 +1,410 @@
+"""
+複数の盤面をまとめて処理するモジュール
+
+N局面の黒と白のビットボードを uint64 の配列として保持し、合法手の生成や
+着手、アタックチャンス、石数の集計を配列全体のシフト演算で一括して行う。
+自己対戦やモンテカルロ法で多数の対局を同時に進めるために使う。
+結果は Board の同名の処理と完全に一致する。
+
+NumPy が必要。スカラーの Board との1局面あたりの処理時間は次のコマンドで
+比較できる：
+    python -m game.batch_board --batch-size 4096
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from .constants import BOARD_SIZE, BLACK, WHITE
+from .bitboard import SHIFT_DIRECTIONS
+from .board import Board
+
+# 位置を指定しないことを示す値（その局面は処理しない）
+NO_SQUARE = -1
+
+# 8ビットごとの立っているビットの数の表
+_BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+# 配列演算用のシフト量とマスクの組（SHIFT_DIRECTIONS と同じ8方向）
+_SHIFT_DIRECTIONS = tuple(
+    (amount > 0, np.uint64(abs(amount)), np.uint64(mask)) for amount, mask in SHIFT_DIRECTIONS
+)
+
+_ZERO = np.uint64(0)
+_ONE = np.uint64(1)
+
+
+def batch_popcount(bits):
+    """
+    各要素の立っているビットの数を返す
+    
+    Args:
+        bits (numpy.ndarray): uint64 のビットボードの配列
+        
+    Returns:
+        numpy.ndarray: ビットの数の配列（int64）
+    """
+    bits = np.ascontiguousarray(bits, dtype=np.uint64)
+    counts = _BYTE_POPCOUNT[bits.view(np.uint8)].reshape(bits.shape + (8,))
+    return counts.sum(axis=-1, dtype=np.int64)
+
+
+def _shift(bits, is_left, amount):
+    """
+    ビットボードの配列を指定量だけシフトする（内部関数）
+    """
+    if is_left:
+        return bits << amount
+    return bits >> amount
+
+
+def batch_legal_moves(player_bits, opponent_bits):
+    """
+    合法手のビットボードを局面ごとに返す（bitboard.legal_moves の配列版）
+    
+    Args:
+        player_bits (numpy.ndarray): 手番側の石の配列
+        opponent_bits (numpy.ndarray): 相手側の石の配列
+        
+    Returns:
+        numpy.ndarray: 合法手の位置に立つビットボードの配列
+    """
+    empty = ~(player_bits | opponent_bits)
+    moves = np.zeros_like(player_bits)
+    
+    for is_left, amount, mask in _SHIFT_DIRECTIONS:
+        masked = opponent_bits & mask
+        x = _shift(player_bits, is_left, amount) & masked
+        for _ in range(BOARD_SIZE - 3):
+            x |= _shift(x, is_left, amount) & masked
+        moves |= _shift(x, is_left, amount) & empty
+    
+    return moves
+
+
+def batch_flips(squares, player_bits, opponent_bits):
+    """
+    指定位置に石を置いた時に反転する石を局面ごとに返す（bitboard.flips の配列版）
+    
+    Args:
+        squares (numpy.ndarray): 石を置く位置のビットの配列（0の局面は何も反転しない）
+        player_bits (numpy.ndarray): 手番側の石の配列
+        opponent_bits (numpy.ndarray): 相手側の石の配列
+        
+    Returns:
+        numpy.ndarray: 反転する石のビットボードの配列
+    """
+    flipped = np.zeros_like(player_bits)
+    
+    for is_left, amount, mask in _SHIFT_DIRECTIONS:
+        masked = opponent_bits & mask
+        # 置いた位置から続く相手の石の並びを伸ばす
+        line = _shift(squares, is_left, amount) & masked
+        for _ in range(BOARD_SIZE - 3):
+            line |= _shift(line, is_left, amount) & masked
+        # 並びの先に自分の石があれば挟める
+        closed = (_shift(line, is_left, amount) & player_bits) != _ZERO
+        flipped |= np.where(closed, line, _ZERO)
+    
+    return flipped
+
+
+class BatchBoard:
+    """N局面のオセロ盤をまとめて管理するクラス"""
+    
+    def __init__(self, size):
+        """
+        初期配置のN局面を作成する
+        
+        Args:
+            size (int): 局面の数
+        """
+        initial = Board()
+        self.black = np.full(size, initial.bitboards[BLACK], dtype=np.uint64)
+        self.white = np.full(size, initial.bitboards[WHITE], dtype=np.uint64)
+    
+    @classmethod
+    def from_boards(cls, boards):
+        """
+        Board のリストから作成する
+        
+        Args:
+            boards (list): 盤面のリスト
+            
+        Returns:
+            BatchBoard: 作成した盤面の集まり
+        """
+        batch = cls(0)
+        batch.black = np.array([board.bitboards[BLACK] for board in boards], dtype=np.uint64)
+        batch.white = np.array([board.bitboards[WHITE] for board in boards], dtype=np.uint64)
+        return batch
+    
+    def __len__(self):
+        return len(self.black)
+    
+    def to_board(self, index):
+        """
+        指定した局面を Board として取り出す
+        
+        Args:
+            index (int): 局面のインデックス
+            
+        Returns:
+            Board: 同じ石の配置を持つ盤面
+        """
+        return Board.from_bitboards(int(self.black[index]), int(self.white[index]))
+    
+    def copy(self):
+        """
+        複製を返す
+        
+        Returns:
+            BatchBoard: 同じ石の配置を持つ新しい盤面の集まり
+        """
+        batch = BatchBoard(0)
+        batch.black = self.black.copy()
+        batch.white = self.white.copy()
+        return batch
+    
+    def _split(self, player_ids):
+        """
+        局面ごとの手番から、手番側と相手側の石の配列を返す（内部メソッド）
+        
+        Args:
+            player_ids (int or numpy.ndarray): 全局面共通、または局面ごとのプレイヤーID
+            
+        Returns:
+            tuple: (黒番かどうかの配列, 手番側の石の配列, 相手側の石の配列)
+        """
+        is_black = np.broadcast_to(np.asarray(player_ids) == BLACK, self.black.shape)
+        player_bits = np.where(is_black, self.black, self.white)
+        opponent_bits = np.where(is_black, self.white, self.black)
+        return is_black, player_bits, opponent_bits
+    
+    def _store(self, is_black, player_bits, opponent_bits):
+        """
+        手番側と相手側の石の配列を黒と白の配列に戻す（内部メソッド）
+        """
+        self.black = np.where(is_black, player_bits, opponent_bits)
+        self.white = np.where(is_black, opponent_bits, player_bits)
+    
+    @staticmethod
+    def _square_bits(squares, shape):
+        """
+        位置の配列をビットの配列に変換する（NO_SQUARE は0になる）（内部メソッド）
+        
+        Args:
+            squares (int or numpy.ndarray): 位置（row * 8 + col）の配列
+            shape (tuple): 局面の配列の形
+            
+        Returns:
+            numpy.ndarray: 位置のビットの配列
+        """
+        squares = np.broadcast_to(np.asarray(squares, dtype=np.int64), shape)
+        valid = (squares >= 0) & (squares < BOARD_SIZE * BOARD_SIZE)
+        shifts = np.where(valid, squares, 0).astype(np.uint64)
+        return np.where(valid, _ONE << shifts, _ZERO)
+    
+    def get_valid_moves_mask(self, player_ids):
+        """
+        局面ごとの合法手のビットボードを返す
+        
+        Args:
+            player_ids (int or numpy.ndarray): 全局面共通、または局面ごとのプレイヤーID
+            
+        Returns:
+            numpy.ndarray: 合法手のビットボードの配列
+        """
+        _, player_bits, opponent_bits = self._split(player_ids)
+        return batch_legal_moves(player_bits, opponent_bits)
+    
+    def place_stones(self, squares, player_ids):
+        """
+        局面ごとに指定位置へ石を置き、反転処理を行う（Board.place_stone の配列版）
+        
+        合法手でない局面は変更しない。
+        
+        Args:
+            squares (int or numpy.ndarray): 位置（row * 8 + col）の配列、NO_SQUARE の局面は処理しない
+            player_ids (int or numpy.ndarray): 全局面共通、または局面ごとのプレイヤーID
+            
+        Returns:
+            numpy.ndarray: 石を置けたかどうかの配列
+        """
+        is_black, player_bits, opponent_bits = self._split(player_ids)
+        square_bits = self._square_bits(squares, self.black.shape)
+        
+        placed = (batch_legal_moves(player_bits, opponent_bits) & square_bits) != _ZERO
+        square_bits = np.where(placed, square_bits, _ZERO)
+        flipped = batch_flips(square_bits, player_bits, opponent_bits)
+        
+        self._store(is_black, player_bits | square_bits | flipped, opponent_bits & ~flipped)
+        return placed
+    
+    def flip_stones(self, squares, player_ids):
+        """
+        指定位置の石に挟まれる相手の石を反転させる（Board.flip_stones の配列版）
+        
+        Args:
+            squares (int or numpy.ndarray): 位置（row * 8 + col）の配列、NO_SQUARE の局面は処理しない
+            player_ids (int or numpy.ndarray): 全局面共通、または局面ごとのプレイヤーID
+            
+        Returns:
+            numpy.ndarray: 反転した石のビットボードの配列
+        """
+        is_black, player_bits, opponent_bits = self._split(player_ids)
+        square_bits = self._square_bits(squares, self.black.shape)
+        flipped = batch_flips(square_bits, player_bits, opponent_bits)
+        
+        self._store(is_black, player_bits | flipped, opponent_bits & ~flipped)
+        return flipped
+    
+    def attack_stones(self, squares, player_ids):
+        """
+        アタックチャンス成功時に石を反転させる（Board.attack_stone の配列版）
+        
+        指定位置に石がある局面だけ、その石を手番側の石にしてから通常の反転を行う。
+        
+        Args:
+            squares (int or numpy.ndarray): 位置（row * 8 + col）の配列、NO_SQUARE の局面は処理しない
+            player_ids (int or numpy.ndarray): 全局面共通、または局面ごとのプレイヤーID
+            
+        Returns:
+            numpy.ndarray: 反転した石（指定位置を含む）のビットボードの配列
+        """
+        is_black, player_bits, opponent_bits = self._split(player_ids)
+        square_bits = self._square_bits(squares, self.black.shape)
+        square_bits &= player_bits | opponent_bits
+        
+        player_bits = player_bits | square_bits
+        opponent_bits = opponent_bits & ~square_bits
+        flipped = batch_flips(square_bits, player_bits, opponent_bits)
+        
+        self._store(is_black, player_bits | flipped, opponent_bits & ~flipped)
+        return flipped | square_bits
+    
+    def count_stones(self):
+        """
+        局面ごとの黒と白の石の数を返す
+        
+        Returns:
+            tuple: (黒の石の数の配列, 白の石の数の配列)
+        """
+        return batch_popcount(self.black), batch_popcount(self.white)
+    
+    def is_game_over(self):
+        """
+        局面ごとにゲーム終了条件を判定する
+        
+        Returns:
+            numpy.ndarray: ゲームが終了したかどうかの配列
+        """
+        black_moves = batch_legal_moves(self.black, self.white)
+        white_moves = batch_legal_moves(self.white, self.black)
+        return (black_moves | white_moves) == _ZERO
+
+
+def _random_positions(count, seed):
+    """
+    ランダムな着手で進めた局面と手番のリストを作成する（内部関数）
+    """
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board = Board()
+        side = BLACK
+        for _ in range(rng.randint(0, 50)):
+            moves = board.get_valid_moves(side)
+            if not moves:
+                side = 1 - side
+                moves = board.get_valid_moves(side)
+                if not moves:
+                    break
+            board.place_stone(*rng.choice(moves), side)
+            side = 1 - side
+        if board.get_valid_moves_mask(side):
+            positions.append((board, side))
+    return positions
+
+
+def measure_throughput(batch_size=4096, seed=0):
+    """
+    同じ局面の集まりに対して、Board と BatchBoard の処理時間を計測する
+    
+    各局面で合法手の生成、最小の位置の合法手への着手、石数の集計を1回ずつ行い、
+    両者の結果が一致することも確認する。
+    
+    Args:
+        batch_size (int): 局面の数
+        seed (int): 局面の作成に使う乱数のシード
+        
+    Returns:
+        dict: 計測結果
+            positions (int): 局面の数
+            scalar_time (float): Board の処理時間（秒）
+            batch_time (float): BatchBoard の処理時間（秒）
+            scalar_rate (float): Board の1秒あたりの局面数
+            batch_rate (float): BatchBoard の1秒あたりの局面数
+            speedup (float): 速度比
+            matched (bool): 結果が一致したかどうか
+    """
+    positions = _random_positions(batch_size, seed)
+    boards = [board.copy() for board, _ in positions]
+    sides = np.array([side for _, side in positions], dtype=np.int64)
+    batch = BatchBoard.from_boards(boards)
+    
+    start = time.perf_counter()
+    scalar_moves = []
+    scalar_counts = []
+    for board, (_, side) in zip(boards, positions):
+        mask = board.get_valid_moves_mask(side)
+        square = (mask & -mask).bit_length() - 1
+        board.place_stone(square // BOARD_SIZE, square % BOARD_SIZE, side)
+        scalar_moves.append(mask)
+        scalar_counts.append(board.count_stones())
+    scalar_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    masks = batch.get_valid_moves_mask(sides)
+    lowest = masks & (~masks + _ONE)
+    squares = batch_popcount(lowest - _ONE)
+    batch.place_stones(squares, sides)
+    black_counts, white_counts = batch.count_stones()
+    batch_time = time.perf_counter() - start
+    
+    matched = (
+        [int(mask) for mask in masks] == scalar_moves
+        and list(zip(black_counts.tolist(), white_counts.tolist())) == scalar_counts
+        and [int(bits) for bits in batch.black] == [board.bitboards[BLACK] for board in boards]
+        and [int(bits) for bits in batch.white] == [board.bitboards[WHITE] for board in boards]
+    )
+    
+    return {
+        "positions": len(positions),
+        "scalar_time": scalar_time,
+        "batch_time": batch_time,
+        "scalar_rate": len(positions) / scalar_time if scalar_time else 0.0,
+        "batch_rate": len(positions) / batch_time if batch_time else 0.0,
+        "speedup": scalar_time / batch_time if batch_time else 0.0,
+        "matched": matched,
+    }
+
+
+def main():
+    """Board と BatchBoard の処理速度を比較して表示する"""
+    parser = argparse.ArgumentParser(description="Compare batched and scalar board throughput")
+    parser.add_argument("--batch-size", type=int, default=4096, help="局面の数")
+    parser.add_argument("--seed", type=int, default=0, help="局面の作成に使う乱数のシード")
+    args = parser.parse_args()
+    
+    report = measure_throughput(args.batch_size, args.seed)
+    print(f"positions={report['positions']} matched={report['matched']}")
+    print(f"scalar: {report['scalar_time']:.4f}s ({report['scalar_rate']:.0f} positions/s)")
+    print(f"batch:  {report['batch_time']:.4f}s ({report['batch_rate']:.0f} positions/s)")
+    print(f"speedup x{report['speedup']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
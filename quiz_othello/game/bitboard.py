@@ -0,0 +1,144 @@
+"""
+ビットボードによる盤面演算を提供するモジュール
+
+黒と白の石をそれぞれ64ビット整数で表し、シフト演算で合法手の生成と
+反転石の計算を行う。ビット番号は row * 8 + col とする。
+"""
+
+from .constants import BOARD_SIZE
+
+# 64ビット全体のマスク
+FULL_MASK = 0xFFFFFFFFFFFFFFFF
+
+# 左端列（col=0）と右端列（col=7）を除いたマスク（横・斜め方向の回り込み防止）
+INNER_COLUMNS_MASK = 0x7E7E7E7E7E7E7E7E
+
+# シフト量と、途中の相手石に掛けるマスクの組（DIRECTIONS と同じ8方向）
+# 正のシフトは左シフト（ビット番号が増える方向）、負は右シフト
+SHIFT_DIRECTIONS = (
+    (-9, INNER_COLUMNS_MASK),  # (-1, -1)
+    (-8, FULL_MASK),           # (-1,  0)
+    (-7, INNER_COLUMNS_MASK),  # (-1,  1)
+    (-1, INNER_COLUMNS_MASK),  # ( 0, -1)
+    (1, INNER_COLUMNS_MASK),   # ( 0,  1)
+    (7, INNER_COLUMNS_MASK),   # ( 1, -1)
+    (8, FULL_MASK),            # ( 1,  0)
+    (9, INNER_COLUMNS_MASK),   # ( 1,  1)
+)
+
+
+def square_bit(row, col):
+    """
+    盤面上の位置に対応するビットを返す
+    
+    Args:
+        row (int): 行インデックス
+        col (int): 列インデックス
+        
+    Returns:
+        int: 対応するビット
+    """
+    return 1 << (row * BOARD_SIZE + col)
+
+
+def popcount(bits):
+    """
+    立っているビットの数を返す
+    
+    Args:
+        bits (int): ビットボード
+        
+    Returns:
+        int: 立っているビットの数
+    """
+    return bin(bits).count("1")
+
+
+def iter_squares(bits):
+    """
+    立っているビットの位置を行優先の順に列挙する
+    
+    Args:
+        bits (int): ビットボード
+        
+    Yields:
+        tuple: 位置 (row, col)
+    """
+    while bits:
+        low = bits & -bits
+        index = low.bit_length() - 1
+        yield divmod(index, BOARD_SIZE)
+        bits ^= low
+
+
+def _shift(bits, amount):
+    """
+    ビットボードを指定量だけシフトする（64ビットに収める）
+    """
+    if amount > 0:
+        return (bits << amount) & FULL_MASK
+    return bits >> -amount
+
+
+def legal_moves(player_bits, opponent_bits):
+    """
+    合法手のビットボードを返す
+    
+    Args:
+        player_bits (int): 手番側の石
+        opponent_bits (int): 相手側の石
+        
+    Returns:
+        int: 合法手の位置に立つビットボード
+    """
+    empty = ~(player_bits | opponent_bits) & FULL_MASK
+    moves = 0
+    
+    for amount, mask in SHIFT_DIRECTIONS:
+        masked = opponent_bits & mask
+        if amount > 0:
+            x = (player_bits << amount) & masked
+            x |= (x << amount) & masked
+            x |= (x << amount) & masked
+            x |= (x << amount) & masked
+            x |= (x << amount) & masked
+            x |= (x << amount) & masked
+            moves |= (x << amount) & empty
+        else:
+            amount = -amount
+            x = (player_bits >> amount) & masked
+            x |= (x >> amount) & masked
+            x |= (x >> amount) & masked
+            x |= (x >> amount) & masked
+            x |= (x >> amount) & masked
+            x |= (x >> amount) & masked
+            moves |= (x >> amount) & empty
+    
+    return moves
+
+
+def flips(square, player_bits, opponent_bits):
+    """
+    指定位置に石を置いた時に反転する相手の石のビットボードを返す
+    
+    Args:
+        square (int): 石を置く位置のビット
+        player_bits (int): 手番側の石
+        opponent_bits (int): 相手側の石
+        
+    Returns:
+        int: 反転する石のビットボード
+    """
+    flipped = 0
+    
+    for amount, mask in SHIFT_DIRECTIONS:
+        masked = opponent_bits & mask
+        line = 0
+        x = _shift(square, amount)
+        while x & masked:
+            line |= x
+            x = _shift(x, amount)
+        if x & player_bits:
+            flipped |= line
+    
+    return flipped
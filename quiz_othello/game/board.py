@@ -2,7 +2,9 @@
 オセロ盤を管理するモジュール
 """
 
-from .constants import BOARD_SIZE, BLACK, WHITE, EMPTY, DIRECTIONS
+from .constants import BOARD_SIZE, BLACK, WHITE, EMPTY
+from .bitboard import square_bit, popcount, iter_squares, legal_moves, flips
+from .zobrist import STONE_KEYS, FLIP_KEYS, stones_hash, state_key
 
 
 class Board:
@@ -13,14 +15,95 @@ class Board:
         8x8の盤面を初期化し、初期配置（中央に黒白を配置）を設定
         """
         # 8x8の盤面を初期化（-1は空きマス）
+        # 表示用の盤面。石の配置はビットボードと常に一致させる
         self.grid = [[EMPTY for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
         
+        # 黒と白の石のビットボード（ビット番号は row * 8 + col）
+        self.bitboards = [0, 0]
+        
+        # 黒と白の石の数（石の設置と反転のたびに差分で更新する）
+        self.stone_counts = [0, 0]
+        
+        # 石の配置のZobristハッシュ（石の設置と反転のたびに差分で更新する）
+        self.hash = 0
+        
+        # 盤面が変化するたびに増える版数（合法手キャッシュの無効化に使う）
+        self.version = 0
+        
+        # プレイヤーごとの合法手キャッシュ [(版数, ビットボード, 位置リスト), ...]
+        self._move_cache = [None, None]
+        
+        # 合法手キャッシュのヒット数とミス数
+        self.move_cache_hits = 0
+        self.move_cache_misses = 0
+        
         # 初期配置（中央に黒白を配置）
         center = BOARD_SIZE // 2
-        self.grid[center-1][center-1] = WHITE
-        self.grid[center][center] = WHITE
-        self.grid[center-1][center] = BLACK
-        self.grid[center][center-1] = BLACK
+        self._set_stone(center-1, center-1, WHITE)
+        self._set_stone(center, center, WHITE)
+        self._set_stone(center-1, center, BLACK)
+        self._set_stone(center, center-1, BLACK)
+    
+    @classmethod
+    def from_bitboards(cls, black_bits, white_bits):
+        """
+        ビットボードから盤面を作成する
+        
+        Args:
+            black_bits (int): 黒の石のビットボード
+            white_bits (int): 白の石のビットボード
+            
+        Returns:
+            Board: 作成した盤面
+        """
+        # 初期配置を作らずに、__init__ と同じ属性を直接設定する
+        board = cls.__new__(cls)
+        board.grid = [[EMPTY] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+        for player_id, bits in ((BLACK, black_bits), (WHITE, white_bits)):
+            for r, c in iter_squares(bits):
+                board.grid[r][c] = player_id
+        board.bitboards = [black_bits, white_bits]
+        board.stone_counts = [popcount(black_bits), popcount(white_bits)]
+        board.hash = stones_hash(black_bits, white_bits)
+        board.version = 0
+        board._move_cache = [None, None]
+        board.move_cache_hits = 0
+        board.move_cache_misses = 0
+        return board
+    
+    def copy(self):
+        """
+        盤面の複製を返す
+        
+        Returns:
+            Board: 同じ石の配置を持つ新しい盤面
+        """
+        return self.from_bitboards(self.bitboards[BLACK], self.bitboards[WHITE])
+    
+    def _set_stone(self, row, col, player_id):
+        """
+        指定位置の石をビットボードと表示用の盤面の両方に設定する（内部メソッド）
+        
+        Args:
+            row (int): 行インデックス
+            col (int): 列インデックス
+            player_id (int): プレイヤーID（0:黒, 1:白）
+        """
+        square = row * BOARD_SIZE + col
+        previous = self.grid[row][col]
+        if previous != player_id:
+            self.stone_counts[player_id] += 1
+            if previous != EMPTY:
+                self.stone_counts[previous] -= 1
+                self.hash ^= FLIP_KEYS[square]
+            else:
+                self.hash ^= STONE_KEYS[player_id][square]
+        
+        bit = 1 << square
+        self.bitboards[player_id] |= bit
+        self.bitboards[1 - player_id] &= ~bit
+        self.grid[row][col] = player_id
+        self.version += 1
     
     def place_stone(self, row, col, player_id):
         """
@@ -39,7 +122,7 @@ class Board:
             return False
         
         # 石を置く
-        self.grid[row][col] = player_id
+        self._set_stone(row, col, player_id)
         
         # 反転処理
         self.flip_stones(row, col, player_id)
@@ -62,60 +145,44 @@ class Board:
         if not (0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE):
             return False
         
-        # すでに石が置かれている
-        if self.grid[row][col] != EMPTY:
-            return False
-        
-        # 8方向のいずれかで相手の石を挟めるかチェック
-        for dr, dc in DIRECTIONS:
-            if self._check_direction(row, col, dr, dc, player_id):
-                return True
-        
-        return False
+        return bool(self.get_valid_moves_mask(player_id) & square_bit(row, col))
     
-    def _check_direction(self, row, col, dr, dc, player_id):
+    def flip_stones(self, row, col, player_id):
         """
-        指定方向に相手の石を挟めるかチェック
+        石を置いた時に挟まれる相手の石を反転させる
         
         Args:
             row (int): 行インデックス
             col (int): 列インデックス
-            dr (int): 行方向の増分
-            dc (int): 列方向の増分
             player_id (int): プレイヤーID（0:黒, 1:白）
             
         Returns:
-            bool: 相手の石を挟めるかどうか
+            list: 反転した石の位置リスト [(row, col), ...]
         """
-        opponent = 1 - player_id
-        r, c = row + dr, col + dc
+        player_bits = self.bitboards[player_id]
+        opponent_bits = self.bitboards[1 - player_id]
+        flipped_bits = flips(square_bit(row, col), player_bits, opponent_bits)
         
-        # 隣が相手の石でなければ挟めない
-        if not (0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE) or self.grid[r][c] != opponent:
-            return False
+        if not flipped_bits:
+            return []
         
-        # さらに隣を調べる
-        r += dr
-        c += dc
+        self.bitboards[player_id] = player_bits | flipped_bits
+        self.bitboards[1 - player_id] = opponent_bits & ~flipped_bits
+        self.version += 1
         
-        while 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE:
-            # 空きマスがあれば挟めない
-            if self.grid[r][c] == EMPTY:
-                return False
-            
-            # 自分の石があれば挟める
-            if self.grid[r][c] == player_id:
-                return True
-            
-            # 次のマスへ
-            r += dr
-            c += dc
+        flipped = list(iter_squares(flipped_bits))
+        for r, c in flipped:
+            self.grid[r][c] = player_id
+            self.hash ^= FLIP_KEYS[r * BOARD_SIZE + c]
+        
+        self.stone_counts[player_id] += len(flipped)
+        self.stone_counts[1 - player_id] -= len(flipped)
         
-        return False
+        return flipped
     
-    def flip_stones(self, row, col, player_id):
+    def attack_stone(self, row, col, player_id):
         """
-        石を置いた時に挟まれる相手の石を反転させる
+        アタックチャンス成功時に石を反転させる処理
         
         Args:
             row (int): 行インデックス
@@ -127,20 +194,19 @@ class Board:
         """
         flipped = []
         
-        for dr, dc in DIRECTIONS:
-            if self._check_direction(row, col, dr, dc, player_id):
-                r, c = row + dr, col + dc
-                while self.grid[r][c] != player_id:
-                    self.grid[r][c] = player_id
-                    flipped.append((r, c))
-                    r += dr
-                    c += dc
+        # 指定位置の石を反転
+        if 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE and self.grid[row][col] != EMPTY:
+            self._set_stone(row, col, player_id)
+            flipped.append((row, col))
+            
+            # 通常の反転ルールで挟まれる石も反転
+            flipped.extend(self.flip_stones(row, col, player_id))
         
         return flipped
     
-    def attack_stone(self, row, col, player_id):
+    def make_move(self, row, col, player_id):
         """
-        アタックチャンス成功時に石を反転させる処理
+        探索用に石を置き、元に戻すための記録を返す
         
         Args:
             row (int): 行インデックス
@@ -148,19 +214,102 @@ class Board:
             player_id (int): プレイヤーID（0:黒, 1:白）
             
         Returns:
-            list: 反転した石の位置リスト [(row, col), ...]
+            tuple: 取り消し記録 (row, col, player_id, 反転した石の位置リスト, False)、
+                   有効な手でない場合はNone
         """
-        flipped = []
+        if not self.is_valid_move(row, col, player_id):
+            return None
         
-        # 指定位置の石を反転
-        if 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE and self.grid[row][col] != EMPTY:
-            self.grid[row][col] = player_id
-            flipped.append((row, col))
+        self._set_stone(row, col, player_id)
+        flipped = self.flip_stones(row, col, player_id)
+        return (row, col, player_id, flipped, False)
+    
+    def make_attack(self, row, col, player_id):
+        """
+        探索用にアタックチャンス成功時の反転を行い、元に戻すための記録を返す
+        
+        Args:
+            row (int): 行インデックス
+            col (int): 列インデックス
+            player_id (int): プレイヤーID（0:黒, 1:白）
             
-            # 通常の反転ルールで挟まれる石も反転
-            flipped.extend(self.flip_stones(row, col, player_id))
+        Returns:
+            tuple: 取り消し記録 (row, col, player_id, 反転した石の位置リスト, True)、
+                   指定位置が相手の石でない場合はNone
+        """
+        if not (0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE) or self.grid[row][col] != 1 - player_id:
+            return None
         
-        return flipped
+        # 反転した石のリストには指定位置の石も含まれる
+        flipped = self.attack_stone(row, col, player_id)
+        return (row, col, player_id, flipped, True)
+    
+    def unmake(self, record):
+        """
+        make_move / make_attack の取り消し記録から盤面を元に戻す
+        
+        記録は作られた順と逆の順に戻す必要がある
+        
+        Args:
+            record (tuple): make_move または make_attack が返した取り消し記録
+        """
+        row, col, player_id, flipped, is_attack = record
+        opponent = 1 - player_id
+        
+        # 反転した石を相手の色に戻す
+        mask = 0
+        for r, c in flipped:
+            mask |= square_bit(r, c)
+            self.grid[r][c] = opponent
+            self.hash ^= FLIP_KEYS[r * BOARD_SIZE + c]
+        self.bitboards[player_id] &= ~mask
+        self.bitboards[opponent] |= mask
+        self.stone_counts[player_id] -= len(flipped)
+        self.stone_counts[opponent] += len(flipped)
+        
+        # 通常の手の場合は置いた石を取り除く
+        if not is_attack:
+            self.bitboards[player_id] &= ~square_bit(row, col)
+            self.grid[row][col] = EMPTY
+            self.stone_counts[player_id] -= 1
+            self.hash ^= STONE_KEYS[player_id][row * BOARD_SIZE + col]
+        
+        self.version += 1
+    
+    def _get_move_cache(self, player_id):
+        """
+        現在の盤面に対する合法手キャッシュを返す（内部メソッド）
+        
+        盤面の版数が変わっていなければ前回の計算結果を再利用する
+        
+        Args:
+            player_id (int): プレイヤーID（0:黒, 1:白）
+            
+        Returns:
+            tuple: (版数, 合法手のビットボード, 合法手の位置タプル)
+        """
+        entry = self._move_cache[player_id]
+        if entry is not None and entry[0] == self.version:
+            self.move_cache_hits += 1
+            return entry
+        
+        self.move_cache_misses += 1
+        mask = legal_moves(self.bitboards[player_id], self.bitboards[1 - player_id])
+        entry = (self.version, mask, tuple(iter_squares(mask)))
+        self._move_cache[player_id] = entry
+        return entry
+    
+    def get_valid_moves_mask(self, player_id):
+        """
+        プレイヤーが石を置ける位置をビットボードで返す
+        
+        Args:
+            player_id (int): プレイヤーID（0:黒, 1:白）
+            
+        Returns:
+            int: 有効な手の位置に立つビットボード
+        """
+        return self._get_move_cache(player_id)[1]
     
     def get_valid_moves(self, player_id):
         """
@@ -172,14 +321,16 @@ class Board:
         Returns:
             list: 有効な手の位置リスト [(row, col), ...]
         """
-        valid_moves = []
-        
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                if self.is_valid_move(row, col, player_id):
-                    valid_moves.append((row, col))
+        return list(self._get_move_cache(player_id)[2])
+    
+    def get_move_cache_stats(self):
+        """
+        合法手キャッシュのヒット数とミス数を返す
         
-        return valid_moves
+        Returns:
+            tuple: (ヒット数, ミス数)
+        """
+        return self.move_cache_hits, self.move_cache_misses
     
     def count_stones(self):
         """
@@ -188,17 +339,7 @@ class Board:
         Returns:
             tuple: (黒の石の数, 白の石の数)
         """
-        black_count = 0
-        white_count = 0
-        
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                if self.grid[row][col] == BLACK:
-                    black_count += 1
-                elif self.grid[row][col] == WHITE:
-                    white_count += 1
-        
-        return black_count, white_count
+        return self.stone_counts[BLACK], self.stone_counts[WHITE]
     
     def is_game_over(self):
         """
@@ -208,7 +349,36 @@ class Board:
             bool: ゲームが終了したかどうか
         """
         # 両プレイヤーとも石を置ける場所がなければゲーム終了
-        return not self.get_valid_moves(BLACK) and not self.get_valid_moves(WHITE)
+        return not self.get_valid_moves_mask(BLACK) and not self.get_valid_moves_mask(WHITE)
+    
+    def get_hash(self, side_to_move, attack_chances):
+        """
+        手番と残りアタックチャンス回数を含めた局面のハッシュ値を返す
+        
+        石の配置のハッシュは差分で更新済みのため、盤面全体の再計算は行わない
+        
+        Args:
+            side_to_move (int): 手番のプレイヤーID（0:黒, 1:白）
+            attack_chances (tuple): (黒の残り回数, 白の残り回数)
+            
+        Returns:
+            int: 64ビットのハッシュ値
+        """
+        return self.hash ^ state_key(side_to_move, attack_chances)
+    
+    def get_stones(self, player_id):
+        """
+        指定プレイヤーの石の位置リストを返す
+        
+        盤面全体を走査せず、ビットボードの立っているビットだけを列挙する
+        
+        Args:
+            player_id (int): プレイヤーID（0:黒, 1:白）
+            
+        Returns:
+            list: 石の位置リスト [(row, col), ...]
+        """
+        return list(iter_squares(self.bitboards[player_id]))
     
     def get_opponent_stones(self, player_id):
         """
@@ -220,12 +390,4 @@ class Board:
         Returns:
             list: 相手の石の位置リスト [(row, col), ...]
         """
-        opponent = 1 - player_id
-        stones = []
-        
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                if self.grid[row][col] == opponent:
-                    stones.append((row, col))
-        
-        return stones
+        return self.get_stones(1 - player_id)
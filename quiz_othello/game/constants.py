@@ -24,9 +24,19 @@ DIRECTIONS = [
     (1, -1),  (1, 0),  (1, 1)
 ]
 
+# 各プレイヤーのアタックチャンスの初期回数
+INITIAL_ATTACK_CHANCES = 2
+
 # クイズの難易度
 DIFFICULTY_EASY = "easy"
 DIFFICULTY_HARD = "hard"
 
 # タイマー設定
 QUIZ_TIMER_SECONDS = 30
+
+# コンピュータの行動の種類
+ACTION_MOVE = "move"
+ACTION_ATTACK = "attack"
+
+# コンピュータの1手あたりの持ち時間（秒）
+AI_TIME_LIMIT = 1.0
@@ -2,9 +2,11 @@
 ゲーム全体の進行を管理するモジュール
 """
 
+import threading
+
 from .board import Board
 from .player import Player
-from .constants import BLACK, WHITE, STATE_PLAYING, STATE_ATTACK_CHANCE, STATE_GAME_OVER
+from .constants import BLACK, WHITE, STATE_PLAYING, STATE_ATTACK_CHANCE, STATE_GAME_OVER, ACTION_ATTACK
 
 
 class GameManager:
@@ -23,24 +25,43 @@ class GameManager:
         self.state = STATE_PLAYING
         self.quiz_manager = quiz_manager
         self.attack_target = None  # アタックチャンスの対象位置
+        self.attack_difficulty = None  # アタックチャンスのクイズの難易度
         self.game_over_callback = None
+        self.record_writer = None  # 棋譜の記録先（GameRecordWriter）
+        self.ai_thinking = False  # コンピュータが別のスレッドで行動を探索中かどうか
+        self.ai_turn_token = 0  # 探索を始めるたびに変わる番号（古い探索結果を無視するために使う）
         
-    def start_game(self, player1_name="Player 1", player2_name="Player 2"):
+    def start_game(self, player1_name="Player 1", player2_name="Player 2", players=None, attack_chances=None):
         """
         ゲームを開始
         
         Args:
             player1_name (str): プレイヤー1の名前
             player2_name (str): プレイヤー2の名前
+            players (list): 使用するプレイヤーオブジェクト [黒, 白]（AIPlayer など）、
+                            省略時は人間のプレイヤーを作成
+            attack_chances (tuple): (黒の初期回数, 白の初期回数)、省略時はプレイヤーの初期値
         """
         # 盤面の初期化
         self.board = Board()
         
         # プレイヤーの初期化
-        self.players = [
-            Player(BLACK, player1_name),
-            Player(WHITE, player2_name)
-        ]
+        if players:
+            self.players = list(players)
+        else:
+            self.players = [
+                Player(BLACK, player1_name),
+                Player(WHITE, player2_name)
+            ]
+        
+        if attack_chances is not None:
+            for player in self.players:
+                player.attack_chances = attack_chances[player.player_id]
+        
+        # アタックチャンスの難易度は使用回数で決まるため、初期回数をプレイヤーに知らせる
+        initial_attack_chances = (self.players[BLACK].attack_chances, self.players[WHITE].attack_chances)
+        for player in self.players:
+            player.on_game_start(initial_attack_chances)
         
         # 黒から開始
         self.current_player_idx = 0
@@ -50,6 +71,15 @@ class GameManager:
         
         # アタックターゲットをリセット
         self.attack_target = None
+        self.attack_difficulty = None
+        
+        # 前のゲームで探索中だった行動を無視する
+        self.ai_turn_token += 1
+        self.ai_thinking = False
+        
+        # 棋譜の記録を開始
+        if self.record_writer:
+            self.record_writer.begin_game(initial_attack_chances)
     
     def get_current_player(self):
         """
@@ -80,9 +110,7 @@ class GameManager:
             # 両プレイヤーとも石を置ける場所がなければゲーム終了
             next_player = self.get_current_player()
             if not self.board.get_valid_moves(next_player.player_id):
-                self.state = STATE_GAME_OVER
-                if self.game_over_callback:
-                    self.game_over_callback()
+                self._set_game_over()
                 return False
             
             return False  # パスを示す
@@ -107,6 +135,9 @@ class GameManager:
         result = self.board.place_stone(row, col, current_player.player_id)
         
         if result:
+            if self.record_writer:
+                self.record_writer.add_move(row, col)
+            
             # 石を置けたら手番を交代
             self.switch_turn()
         
@@ -149,6 +180,7 @@ class GameManager:
             
             # 難易度を決定
             difficulty = self.quiz_manager.get_difficulty_for_attack_chance(attack_chance_count)
+            self.attack_difficulty = difficulty
             
             # クイズを出題
             self.quiz_manager.start_quiz(difficulty, self.on_quiz_time_up)
@@ -168,14 +200,22 @@ class GameManager:
             return
         
         current_player = self.get_current_player()
+        row, col = self.attack_target
+        
+        if self.record_writer:
+            self.record_writer.add_attack(row, col, self.attack_difficulty, is_correct)
         
         if is_correct:
             # 正解の場合、指定した石を反転
-            row, col = self.attack_target
             self.board.attack_stone(row, col, current_player.player_id)
         
         # アタックターゲットをリセット
         self.attack_target = None
+        self.attack_difficulty = None
+        
+        # 前のゲームで探索中だった行動を無視する
+        self.ai_turn_token += 1
+        self.ai_thinking = False
         
         # ゲーム状態を戻す
         self.state = STATE_PLAYING
@@ -211,6 +251,110 @@ class GameManager:
         
         return is_correct
     
+    def is_ai_turn(self):
+        """
+        現在の手番がコンピュータかどうかを返す
+        
+        Returns:
+            bool: コンピュータの手番かどうか
+        """
+        if not self.players or self.state == STATE_GAME_OVER:
+            return False
+        return self.get_current_player().is_ai
+    
+    def play_ai_turn(self):
+        """
+        コンピュータの手番を1つ進める
+        
+        通常時は探索で選んだ手を打つかアタックチャンスを宣言し、
+        クイズ中はコンピュータがクイズに回答する
+        
+        Returns:
+            bool: 行動したかどうか
+        """
+        if not self.is_ai_turn():
+            return False
+        
+        current_player = self.get_current_player()
+        
+        if self.state == STATE_ATTACK_CHANCE:
+            quiz = self.get_current_quiz()
+            if not quiz:
+                return False
+            self.answer_quiz(current_player.answer_quiz(quiz, self.attack_difficulty))
+            return True
+        
+        attack_chances = (self.players[BLACK].attack_chances, self.players[WHITE].attack_chances)
+        return self._apply_ai_action(current_player.choose_action(self.board, attack_chances))
+    
+    def start_ai_turn(self, event_queue):
+        """
+        コンピュータの手番を画面のスレッドを止めずに進める
+        
+        通常時は別のスレッドで盤面の複製から行動を探索し、選んだ行動を
+        event_queue に積む（メインループが drain した時にこのスレッドで反映する）。
+        クイズ中の回答はすぐに終わるため、その場で行う。
+        
+        Args:
+            event_queue (EventQueue): 選んだ行動を渡すメインループのキュー
+            
+        Returns:
+            bool: 探索を開始したか、クイズに回答したかどうか
+        """
+        if not self.is_ai_turn() or self.ai_thinking:
+            return False
+        
+        if self.state == STATE_ATTACK_CHANCE:
+            return self.play_ai_turn()
+        
+        self.ai_turn_token += 1
+        self.ai_thinking = True
+        token = self.ai_turn_token
+        current_player = self.get_current_player()
+        board = self.board.copy()
+        attack_chances = (self.players[BLACK].attack_chances, self.players[WHITE].attack_chances)
+        
+        def think():
+            action = None
+            try:
+                action = current_player.choose_action(board, attack_chances)
+            finally:
+                event_queue.post(self._finish_ai_turn, token, action)
+        
+        threading.Thread(target=think, daemon=True).start()
+        return True
+    
+    def _finish_ai_turn(self, token, action):
+        """
+        別のスレッドで選んだ行動を反映する（メインループのスレッドで呼ばれる内部メソッド）
+        
+        Args:
+            token (int): 探索を始めた時の番号、現在の番号と違う場合は何もしない
+            action (tuple): 選んだ行動、行動が無い場合はNone
+        """
+        if token != self.ai_turn_token:
+            return
+        self.ai_thinking = False
+        self._apply_ai_action(action)
+    
+    def _apply_ai_action(self, action):
+        """
+        コンピュータが選んだ行動を盤面に反映する（内部メソッド）
+        
+        Args:
+            action (tuple): (ACTION_MOVE または ACTION_ATTACK, row, col)、行動が無い場合はNone
+            
+        Returns:
+            bool: 行動したかどうか
+        """
+        if action is None:
+            return False
+        
+        kind, row, col = action
+        if kind == ACTION_ATTACK:
+            return self.start_attack_chance(row, col)
+        return self.place_stone(row, col)
+    
     def check_game_over(self):
         """
         ゲーム終了条件をチェック
@@ -224,12 +368,23 @@ class GameManager:
         is_over = self.board.is_game_over()
         
         if is_over:
-            self.state = STATE_GAME_OVER
-            if self.game_over_callback:
-                self.game_over_callback()
+            self._set_game_over()
         
         return is_over
     
+    def _set_game_over(self):
+        """
+        ゲームを終了状態にする（内部メソッド）
+        """
+        self.state = STATE_GAME_OVER
+        
+        # 棋譜を書き出す
+        if self.record_writer:
+            self.record_writer.end_game()
+        
+        if self.game_over_callback:
+            self.game_over_callback()
+    
     def get_winner(self):
         """
         勝者を判定して返す
@@ -249,6 +404,28 @@ class GameManager:
         else:
             return -1  # 引き分け
     
+    def get_position_hash(self):
+        """
+        現在の局面のハッシュ値を返す（手番と残りアタックチャンス回数を含む）
+        
+        Returns:
+            int: 64ビットのハッシュ値、ゲーム開始前はNone
+        """
+        if not self.board:
+            return None
+        
+        attack_chances = (self.players[BLACK].attack_chances, self.players[WHITE].attack_chances)
+        return self.board.get_hash(self.get_current_player().player_id, attack_chances)
+    
+    def set_record_writer(self, writer):
+        """
+        棋譜の記録先を設定する（次のゲームから記録する）
+        
+        Args:
+            writer (GameRecordWriter): 棋譜の記録先、Noneの場合は記録しない
+        """
+        self.record_writer = writer
+    
     def set_game_over_callback(self, callback):
         """
         ゲーム終了時のコールバック関数を設定
@@ -0,0 +1,246 @@
+"""
+合法手生成の正しさと速度を確かめる perft のモジュール
+
+初期配置から指定の深さまでのすべての手順をたどり、末端の局面の数を数える。
+既知の局面数と比べることで合法手生成と反転処理の誤りを検出し、
+1秒あたりの局面数で盤面の実装の速さを比べる。
+
+アタックチャンスを含める場合は、残り回数がある手番で相手の石それぞれを
+対象としたアタックチャンスの成功と失敗の両方を子局面として数える。
+パスは1手として数え、深さに達する前に終局した局面は末端の局面として数える。
+
+Board と、リスト形式の盤面だけで動く参照実装 ListBoard の両方で実行する：
+    python -m game.perft --depth 7
+    python -m game.perft --depth 5 --attacks
+"""
+
+import argparse
+import sys
+import time
+
+from .board import Board
+from .constants import BOARD_SIZE, BLACK, WHITE, EMPTY, DIRECTIONS, INITIAL_ATTACK_CHANCES
+
+# 初期配置からの深さごとの局面数（アタックチャンスなし、インデックスが深さ）
+KNOWN_COUNTS = (1, 4, 12, 56, 244, 1396, 8200, 55092, 390216, 3005288, 24571284)
+
+# 初期配置からの深さごとの局面数（両者のアタックチャンスが INITIAL_ATTACK_CHANCES 回）
+KNOWN_ATTACK_COUNTS = (1, 8, 78, 634, 5846, 49090, 511266)
+
+
+class ListBoard:
+    """
+    リスト形式の盤面だけで合法手と反転を求める参照実装
+    
+    ビットボードを使う前の Board と同じ方法で8方向を1マスずつたどる。
+    perft で使う操作（Board と同じ取り消し記録の形式）だけを持つ。
+    """
+    
+    def __init__(self):
+        self.grid = [[EMPTY for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+        center = BOARD_SIZE // 2
+        self.grid[center-1][center-1] = WHITE
+        self.grid[center][center] = WHITE
+        self.grid[center-1][center] = BLACK
+        self.grid[center][center-1] = BLACK
+    
+    def _check_direction(self, row, col, dr, dc, player_id):
+        """
+        指定方向に相手の石を挟めるかチェック（内部メソッド）
+        """
+        opponent = 1 - player_id
+        r, c = row + dr, col + dc
+        if not (0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE) or self.grid[r][c] != opponent:
+            return False
+        
+        r += dr
+        c += dc
+        while 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE:
+            if self.grid[r][c] == EMPTY:
+                return False
+            if self.grid[r][c] == player_id:
+                return True
+            r += dr
+            c += dc
+        return False
+    
+    def _flip_stones(self, row, col, player_id):
+        """
+        挟まれる相手の石を反転させる（内部メソッド）
+        """
+        flipped = []
+        for dr, dc in DIRECTIONS:
+            if self._check_direction(row, col, dr, dc, player_id):
+                r, c = row + dr, col + dc
+                while self.grid[r][c] != player_id:
+                    self.grid[r][c] = player_id
+                    flipped.append((r, c))
+                    r += dr
+                    c += dc
+        return flipped
+    
+    def get_valid_moves(self, player_id):
+        """
+        プレイヤーが石を置ける位置のリストを返す
+        """
+        return [
+            (row, col)
+            for row in range(BOARD_SIZE)
+            for col in range(BOARD_SIZE)
+            if self.grid[row][col] == EMPTY
+            and any(self._check_direction(row, col, dr, dc, player_id) for dr, dc in DIRECTIONS)
+        ]
+    
+    def get_opponent_stones(self, player_id):
+        """
+        相手の石の位置リストを返す
+        """
+        opponent = 1 - player_id
+        return [
+            (row, col)
+            for row in range(BOARD_SIZE)
+            for col in range(BOARD_SIZE)
+            if self.grid[row][col] == opponent
+        ]
+    
+    def make_move(self, row, col, player_id):
+        """
+        石を置き、Board.make_move と同じ形式の取り消し記録を返す
+        """
+        self.grid[row][col] = player_id
+        return (row, col, player_id, self._flip_stones(row, col, player_id), False)
+    
+    def make_attack(self, row, col, player_id):
+        """
+        アタックチャンス成功時の反転を行い、Board.make_attack と同じ形式の取り消し記録を返す
+        """
+        self.grid[row][col] = player_id
+        flipped = [(row, col)] + self._flip_stones(row, col, player_id)
+        return (row, col, player_id, flipped, True)
+    
+    def unmake(self, record):
+        """
+        取り消し記録から盤面を元に戻す
+        """
+        row, col, player_id, flipped, is_attack = record
+        for r, c in flipped:
+            self.grid[r][c] = 1 - player_id
+        if not is_attack:
+            self.grid[row][col] = EMPTY
+
+
+# perft で比べる盤面の実装
+BACKENDS = {
+    "board": Board,
+    "list": ListBoard,
+}
+
+
+def perft(board, side, depth, attack_chances=None):
+    """
+    指定の深さまでの末端の局面の数を数える
+    
+    盤面は make_move / make_attack / unmake で更新し、呼び出し後は元に戻る。
+    
+    Args:
+        board: 盤面（Board または同じ操作を持つ実装）
+        side (int): 手番のプレイヤーID（0:黒, 1:白）
+        depth (int): 深さ
+        attack_chances (tuple): (黒の残り回数, 白の残り回数)、Noneの場合はアタックチャンスを含めない
+        
+    Returns:
+        int: 末端の局面の数
+    """
+    if depth == 0:
+        return 1
+    
+    opponent = 1 - side
+    moves = board.get_valid_moves(side)
+    if not moves:
+        if not board.get_valid_moves(opponent):
+            return 1
+        return perft(board, opponent, depth - 1, attack_chances)
+    
+    nodes = 0
+    for row, col in moves:
+        record = board.make_move(row, col, side)
+        nodes += perft(board, opponent, depth - 1, attack_chances)
+        board.unmake(record)
+    
+    if attack_chances is not None and attack_chances[side] > 0:
+        remaining = list(attack_chances)
+        remaining[side] -= 1
+        remaining = tuple(remaining)
+        
+        targets = board.get_opponent_stones(side)
+        for row, col in targets:
+            record = board.make_attack(row, col, side)
+            nodes += perft(board, opponent, depth - 1, remaining)
+            board.unmake(record)
+        
+        # 失敗した場合は対象によらず盤面が変わらないため、1回だけ数える
+        nodes += len(targets) * perft(board, opponent, depth - 1, remaining)
+    
+    return nodes
+
+
+def run_perft(backend, depth, attacks=False):
+    """
+    初期配置から perft を実行し、局面数と速度を返す
+    
+    Args:
+        backend (str): 盤面の実装の名前（BACKENDS のキー）
+        depth (int): 深さ
+        attacks (bool): アタックチャンスを含めるかどうか
+        
+    Returns:
+        dict: 実行結果
+            nodes (int): 末端の局面の数
+            expected (int): 既知の局面数、不明な場合はNone
+            time (float): 実行時間（秒）
+            nodes_per_second (float): 1秒あたりの局面数
+    """
+    board = BACKENDS[backend]()
+    attack_chances = (INITIAL_ATTACK_CHANCES, INITIAL_ATTACK_CHANCES) if attacks else None
+    known = KNOWN_ATTACK_COUNTS if attacks else KNOWN_COUNTS
+    
+    start_time = time.perf_counter()
+    nodes = perft(board, BLACK, depth, attack_chances)
+    elapsed = time.perf_counter() - start_time
+    
+    return {
+        "nodes": nodes,
+        "expected": known[depth] if depth < len(known) else None,
+        "time": elapsed,
+        "nodes_per_second": nodes / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main():
+    """初期配置から perft を実行し、既知の局面数と比べる"""
+    parser = argparse.ArgumentParser(description="Count leaf nodes from the initial position")
+    parser.add_argument("--depth", type=int, default=6, help="最大の深さ")
+    parser.add_argument("--attacks", action="store_true", help="アタックチャンスを含める")
+    parser.add_argument("--backend", choices=sorted(BACKENDS) + ["all"], default="all", help="盤面の実装")
+    args = parser.parse_args()
+    
+    backends = sorted(BACKENDS) if args.backend == "all" else [args.backend]
+    failed = False
+    for depth in range(1, args.depth + 1):
+        for backend in backends:
+            result = run_perft(backend, depth, args.attacks)
+            if result["expected"] is None:
+                status = "?"
+            elif result["nodes"] == result["expected"]:
+                status = "ok"
+            else:
+                status = f"MISMATCH (expected {result['expected']})"
+                failed = True
+            print(f"depth {depth:2d} {backend:6s} {result['nodes']:>12d} nodes "
+                  f"{result['time']:8.3f}s {result['nodes_per_second']:>12.0f} nodes/s  {status}")
+    
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
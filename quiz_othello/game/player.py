@@ -2,9 +2,14 @@
 プレイヤー情報を管理するモジュール
 """
 
+from .constants import INITIAL_ATTACK_CHANCES
+
+
 class Player:
     """プレイヤー情報を管理するクラス"""
     
+    is_ai = False  # コンピュータが操作するプレイヤーかどうか
+    
     def __init__(self, player_id, name):
         """
         プレイヤー情報を初期化
@@ -15,7 +20,7 @@ class Player:
         """
         self.player_id = player_id
         self.name = name
-        self.attack_chances = 2  # 残りアタックチャンス回数（初期値2）
+        self.attack_chances = INITIAL_ATTACK_CHANCES  # 残りアタックチャンス回数（初期値2）
         self.used_attack_chances = 0  # 使用済みアタックチャンス回数
     
     def use_attack_chance(self):
@@ -40,3 +45,12 @@ class Player:
             bool: アタックチャンスが残っているかどうか
         """
         return self.attack_chances > 0
+    
+    def on_game_start(self, initial_attack_chances):
+        """
+        ゲーム開始時に呼ばれる（コンピュータプレイヤーが難易度の判定に使う）
+        
+        Args:
+            initial_attack_chances (tuple): (黒の初期回数, 白の初期回数)
+        """
+        pass
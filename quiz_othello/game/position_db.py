@@ -0,0 +1,339 @@
+"""
+棋譜の局面を検索するデータベースのモジュール
+
+棋譜ファイル（game.record 形式）を再生し、各対局で現れたすべての局面の
+ハッシュ値（Board.get_hash）を SQLite のデータベースに記録する。
+ある局面がどの対局の何手目に現れたか、その局面からの勝敗と
+アタックチャンスの使用状況を検索できる。
+
+登録は対局をまとめて挿入しながら進めるため、棋譜が大きくてもメモリ使用量は
+一定に収まる。登録する局面が登録済みの局面に比べて多い場合は、ハッシュ値の
+インデックスを外して挿入し、挿入が終わってから作り直す。棋譜ファイルに
+追記された対局は、次の登録で未登録の分だけ、インデックスを保ったまま追加される。
+
+データベースの作成と、対局 12 の 8 手目の局面の検索：
+    python -m game.position_db games.rec --db positions.db
+    python -m game.position_db games.rec --db positions.db --game 12 --ply 8
+"""
+
+import argparse
+import json
+import sqlite3
+
+from .constants import BOARD_SIZE, BLACK, WHITE
+from .archive import GameArchive
+from .record import ENTRY_ATTACK, replay_game
+
+# 1回の挿入でまとめる局面の数
+INSERT_BATCH_SIZE = 50000
+
+# 登録する局面の数が登録済みの局面の数のこの割合を超えたら、インデックスを外して挿入する
+INDEX_REBUILD_RATIO = 0.5
+
+# 引き分けの勝者の値
+DRAW = -1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game INTEGER PRIMARY KEY,
+    winner INTEGER NOT NULL,
+    black_stones INTEGER NOT NULL,
+    white_stones INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS positions (
+    hash INTEGER NOT NULL,
+    game INTEGER NOT NULL,
+    ply INTEGER NOT NULL,
+    side INTEGER,
+    attack INTEGER,
+    square INTEGER,
+    success INTEGER
+);
+"""
+
+_CREATE_INDEX = "CREATE INDEX IF NOT EXISTS positions_hash ON positions (hash)"
+_DROP_INDEX = "DROP INDEX IF EXISTS positions_hash"
+
+_INSERT_POSITION = "INSERT INTO positions VALUES (?, ?, ?, ?, ?, ?, ?)"
+_INSERT_GAME = "INSERT INTO games VALUES (?, ?, ?, ?)"
+
+_STATS_QUERY = """
+SELECT COUNT(*),
+       SUM(g.winner = p.side), SUM(g.winner = -1), SUM(g.winner = 1 - p.side),
+       SUM(p.attack = 1), SUM(p.success = 1)
+FROM positions p JOIN games g ON g.game = p.game
+WHERE p.hash = ?
+"""
+
+
+def _to_signed(value):
+    """
+    64ビットの符号なし整数を SQLite の整数に収まる符号付き整数に変換する（内部関数）
+    """
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def game_positions(game_index, game):
+    """
+    1局を再生して、各局面の行と対局の行を作る
+    
+    Args:
+        game_index (int): 対局番号
+        game (dict): 棋譜（game.record.decode_body 参照）
+        
+    Returns:
+        tuple: (局面の行のリスト, 対局の行)
+               局面の行は (ハッシュ値, 対局番号, 手数, 手番, アタックチャンスかどうか, 位置, 正解かどうか)、
+               終局後の局面は手番を黒（Board.get_hash と同じ）とし、行動の列が None になる
+    """
+    rows = []
+    board = None
+    for ply, (board, player_id, attack_chances, entry) in enumerate(replay_game(game)):
+        side = BLACK if player_id is None else player_id
+        key = _to_signed(board.get_hash(side, attack_chances))
+        if entry is None:
+            rows.append((key, game_index, ply, side, None, None, None))
+        elif entry[0] == ENTRY_ATTACK:
+            rows.append((key, game_index, ply, player_id, 1, entry[1] * BOARD_SIZE + entry[2], int(entry[4])))
+        else:
+            rows.append((key, game_index, ply, player_id, 0, entry[1] * BOARD_SIZE + entry[2], None))
+    
+    black_stones, white_stones = board.count_stones()
+    if black_stones > white_stones:
+        winner = BLACK
+    elif white_stones > black_stones:
+        winner = WHITE
+    else:
+        winner = DRAW
+    return rows, (game_index, winner, black_stones, white_stones)
+
+
+class PositionDatabase:
+    """局面のハッシュ値から対局を検索するデータベース"""
+    
+    def __init__(self, path):
+        """
+        データベースを開く（無ければ作成する）
+        
+        Args:
+            path (str): データベースファイルのパス
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """
+        データベースを閉じる
+        """
+        self.connection.close()
+    
+    def game_count(self):
+        """
+        登録済みの対局数を返す
+        
+        Returns:
+            int: 対局数
+        """
+        return self.connection.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+    
+    def next_game(self):
+        """
+        次に登録する対局番号を返す
+        
+        Returns:
+            int: 登録済みの最大の対局番号 + 1
+        """
+        last = self.connection.execute("SELECT MAX(game) FROM games").fetchone()[0]
+        return 0 if last is None else last + 1
+    
+    def add_games(self, games, batch_size=INSERT_BATCH_SIZE, progress=None):
+        """
+        対局をまとめて登録する
+        
+        挿入した局面の数が登録済みの局面の数の INDEX_REBUILD_RATIO 倍を超えたら
+        ハッシュ値のインデックスを外し、最後に作り直す。少数の対局の追加では
+        インデックスを保ったまま挿入する。挿入は batch_size 局面ごとに行うため、
+        games はジェネレーターでよい。
+        
+        Args:
+            games (iterable): (対局番号, 棋譜) の組
+            batch_size (int): 1回の挿入でまとめる局面の数
+            progress (function): 挿入するたびに呼ばれる関数（引数は登録した対局数）
+            
+        Returns:
+            int: 登録した対局数
+        """
+        connection = self.connection
+        connection.execute("PRAGMA synchronous = OFF")
+        # 局面の行は削除しないため、行数は走査せずに最大の rowid から求める
+        existing = connection.execute("SELECT MAX(rowid) FROM positions").fetchone()[0] or 0
+        
+        added = 0
+        inserted = 0
+        index_dropped = False
+        position_rows = []
+        game_rows = []
+        
+        def flush():
+            nonlocal inserted, index_dropped
+            inserted += len(position_rows)
+            if not index_dropped and inserted > existing * INDEX_REBUILD_RATIO:
+                connection.execute(_DROP_INDEX)
+                index_dropped = True
+            connection.executemany(_INSERT_POSITION, position_rows)
+            connection.executemany(_INSERT_GAME, game_rows)
+            connection.commit()
+            position_rows.clear()
+            game_rows.clear()
+            if progress:
+                progress(added)
+        
+        try:
+            for game_index, game in games:
+                rows, game_row = game_positions(game_index, game)
+                position_rows.extend(rows)
+                game_rows.append(game_row)
+                added += 1
+                if len(position_rows) >= batch_size:
+                    flush()
+            flush()
+        finally:
+            connection.execute(_CREATE_INDEX)
+            connection.commit()
+            connection.execute("PRAGMA synchronous = FULL")
+        
+        return added
+    
+    def index_archive(self, archive, batch_size=INSERT_BATCH_SIZE, progress=None):
+        """
+        棋譜のうち未登録の対局を登録する
+        
+        Args:
+            archive (GameArchive): 棋譜
+            batch_size (int): 1回の挿入でまとめる局面の数
+            progress (function): 挿入するたびに呼ばれる関数（引数は登録した対局数）
+            
+        Returns:
+            int: 登録した対局数
+        """
+        start = self.next_game()
+        if start >= len(archive):
+            return 0
+        games = ((index, archive[index]) for index in range(start, len(archive)))
+        return self.add_games(games, batch_size, progress)
+    
+    def find(self, key, limit=None):
+        """
+        局面が現れた対局と手数を返す
+        
+        Args:
+            key (int): 局面のハッシュ値（Board.get_hash）
+            limit (int): 返す件数の上限、省略時はすべて
+            
+        Returns:
+            list: (対局番号, 手数) のリスト（手数は0から数えた、その局面までのエントリ数）
+        """
+        query = "SELECT game, ply FROM positions WHERE hash = ? ORDER BY game"
+        parameters = [_to_signed(key)]
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters.append(limit)
+        return self.connection.execute(query, parameters).fetchall()
+    
+    def stats(self, key):
+        """
+        局面からの勝敗とアタックチャンスの使用状況を集計する
+        
+        Args:
+            key (int): 局面のハッシュ値（Board.get_hash）
+            
+        Returns:
+            dict: 集計結果
+                occurrences (int): 局面が現れた回数
+                wins (int): 手番側が勝った対局数
+                draws (int): 引き分けの対局数
+                losses (int): 手番側が負けた対局数
+                attacks (int): この局面でアタックチャンスを使った回数
+                attack_successes (int): そのうちクイズに正解した回数
+                actions (dict): 位置ごとの {"moves": 着手の回数, "attacks": アタックチャンスの回数}
+        """
+        signed_key = _to_signed(key)
+        row = self.connection.execute(_STATS_QUERY, (signed_key,)).fetchone()
+        occurrences, wins, draws, losses, attacks, successes = (value or 0 for value in row)
+        
+        actions = {}
+        for attack, square, count in self.connection.execute(
+                "SELECT attack, square, COUNT(*) FROM positions WHERE hash = ? AND square IS NOT NULL "
+                "GROUP BY attack, square", (signed_key,)):
+            counts = actions.setdefault(divmod(square, BOARD_SIZE), {"moves": 0, "attacks": 0})
+            counts["attacks" if attack else "moves"] += count
+        
+        return {
+            "occurrences": occurrences,
+            "wins": wins,
+            "draws": draws,
+            "losses": losses,
+            "attacks": attacks,
+            "attack_successes": successes,
+            "actions": actions,
+        }
+
+
+def position_key(archive, game_index, ply):
+    """
+    棋譜の指定した対局の指定した手数の局面のハッシュ値を返す
+    
+    Args:
+        archive (GameArchive): 棋譜
+        game_index (int): 対局番号
+        ply (int): 手数（0から数えたエントリ数）
+        
+    Returns:
+        int: 局面のハッシュ値
+        
+    Raises:
+        IndexError: 手数が対局の長さを超える場合
+    """
+    for current, (board, player_id, attack_chances, _) in enumerate(replay_game(archive[game_index])):
+        if current == ply:
+            return board.get_hash(BLACK if player_id is None else player_id, attack_chances)
+    raise IndexError("ply out of range")
+
+
+def main():
+    """棋譜ファイルから局面のデータベースを作成し、局面を検索する"""
+    parser = argparse.ArgumentParser(description="Index and query positions in a game record file")
+    parser.add_argument("record", help="棋譜ファイルのパス")
+    parser.add_argument("--db", default="positions.db", help="データベースファイルのパス")
+    parser.add_argument("--game", type=int, help="検索する局面の対局番号")
+    parser.add_argument("--ply", type=int, default=0, help="検索する局面の手数")
+    parser.add_argument("--limit", type=int, default=20, help="表示する対局の数")
+    args = parser.parse_args()
+    
+    with GameArchive(args.record) as archive, PositionDatabase(args.db) as database:
+        added = database.index_archive(
+            archive, progress=lambda count: print(f"\r{count} games indexed", end="", flush=True)
+        )
+        if added:
+            print()
+        
+        if args.game is None:
+            print(f"{database.game_count()} games in {args.db}")
+            return
+        
+        key = position_key(archive, args.game, args.ply)
+        result = database.stats(key)
+        result["actions"] = {f"{row},{col}": counts for (row, col), counts in result["actions"].items()}
+        result["games"] = database.find(key, args.limit)
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""
+棋譜を記録・読み込みするモジュール
+
+棋譜ファイルは8バイトのファイルヘッダの後に、1局ずつのフレームを
+追記していく形式とする。
+    ファイルヘッダ: RECORD_MAGIC
+    フレーム: 長さ (1バイト), アタックチャンスの初期回数 (1バイト, 上位4ビットが黒、下位4ビットが白), 本体
+本体のエントリ：
+    通常の手: 位置 (row * 8 + col) の1バイト
+    アタックチャンス: タグ (0x40 | 難易度 << 1 | 正解なら1) の1バイトと、対象の位置の1バイト
+パスは記録しない（再生時に打てる手が無ければ手番を飛ばす）。
+"""
+
+import io
+
+from .board import Board
+from .constants import BOARD_SIZE, BLACK, WHITE, DIFFICULTY_EASY, DIFFICULTY_HARD
+
+# ファイルの識別子（最後の1バイトは形式のバージョン）
+RECORD_MAGIC = b"QOREC\x00\x00\x01"
+
+# エントリの種類
+ENTRY_MOVE = 0
+ENTRY_ATTACK = 1
+
+# アタックチャンスのエントリのタグ
+ATTACK_TAG = 0x40
+_ATTACK_TAG_MASK = 0xFC
+
+# 難易度とタグのビットの対応
+DIFFICULTY_BITS = {DIFFICULTY_EASY: 0, DIFFICULTY_HARD: 1}
+_DIFFICULTIES = {bit: difficulty for difficulty, bit in DIFFICULTY_BITS.items()}
+
+# 1局の本体の最大長（1バイトの長さに収める）
+MAX_GAME_BYTES = 0xFF
+
+# アタックチャンスの初期回数の最大値（4ビット）
+MAX_RECORDED_ATTACK_CHANCES = 0x0F
+
+# 読み込み時のバッファサイズ
+READ_BUFFER_SIZE = 1 << 20
+
+
+def encode_game(attack_chances, entries):
+    """
+    1局をフレームのバイト列に変換する
+    
+    Args:
+        attack_chances (tuple): (黒の初期回数, 白の初期回数)
+        entries (list): エントリのリスト
+                        (ENTRY_MOVE, row, col) または (ENTRY_ATTACK, row, col, 難易度, 正解かどうか)
+                        
+    Returns:
+        bytes: フレームのバイト列
+        
+    Raises:
+        ValueError: 記録できない値が含まれる場合
+    """
+    black_chances, white_chances = attack_chances
+    if not (0 <= black_chances <= MAX_RECORDED_ATTACK_CHANCES and 0 <= white_chances <= MAX_RECORDED_ATTACK_CHANCES):
+        raise ValueError(f"attack chances out of range: {attack_chances}")
+    
+    body = bytearray()
+    for entry in entries:
+        square = entry[1] * BOARD_SIZE + entry[2]
+        if entry[0] == ENTRY_MOVE:
+            body.append(square)
+        else:
+            difficulty, success = entry[3], entry[4]
+            body.append(ATTACK_TAG | DIFFICULTY_BITS[difficulty] << 1 | int(bool(success)))
+            body.append(square)
+    
+    if len(body) > MAX_GAME_BYTES:
+        raise ValueError(f"game record too long: {len(body)} bytes")
+    
+    return bytes((len(body), black_chances << 4 | white_chances)) + bytes(body)
+
+
+def decode_body(chances_byte, body):
+    """
+    フレームの本体を1局の棋譜に変換する
+    
+    Args:
+        chances_byte (int): アタックチャンスの初期回数のバイト
+        body (bytes): 本体のバイト列
+        
+    Returns:
+        dict: 棋譜
+            attack_chances (tuple): (黒の初期回数, 白の初期回数)
+            entries (list): エントリのリスト（encode_game 参照）
+            
+    Raises:
+        ValueError: 本体の形式が正しくない場合
+    """
+    entries = []
+    index = 0
+    length = len(body)
+    while index < length:
+        value = body[index]
+        if value < BOARD_SIZE * BOARD_SIZE:
+            entries.append((ENTRY_MOVE, value >> 3, value & 7))
+            index += 1
+        elif value & _ATTACK_TAG_MASK == ATTACK_TAG and index + 1 < length:
+            square = body[index + 1]
+            entries.append((ENTRY_ATTACK, square >> 3, square & 7, _DIFFICULTIES[(value >> 1) & 1], bool(value & 1)))
+            index += 2
+        else:
+            raise ValueError(f"invalid record entry: 0x{value:02x}")
+    
+    return {"attack_chances": (chances_byte >> 4, chances_byte & 0x0F), "entries": entries}
+
+
+def iter_frames(stream):
+    """
+    ストリームからフレームを順に取り出す（ファイルヘッダの後から読む）
+    
+    Args:
+        stream (io.BufferedIOBase): バイナリのストリーム
+        
+    Yields:
+        tuple: (アタックチャンスの初期回数のバイト, 本体のバイト列)
+        
+    Raises:
+        ValueError: ファイルの末尾でフレームが途切れている場合
+    """
+    buffer = b""
+    offset = 0
+    while True:
+        chunk = stream.read(READ_BUFFER_SIZE)
+        if not chunk:
+            break
+        buffer = buffer[offset:] + chunk
+        offset = 0
+        end = len(buffer)
+        while offset + 2 <= end:
+            frame_end = offset + 2 + buffer[offset]
+            if frame_end > end:
+                break
+            yield buffer[offset + 1], buffer[offset + 2:frame_end]
+            offset = frame_end
+    
+    if offset < len(buffer):
+        raise ValueError("truncated game record")
+
+
+def read_header(stream):
+    """
+    ファイルヘッダを読んで確認する
+    
+    Args:
+        stream (io.BufferedIOBase): バイナリのストリーム
+        
+    Raises:
+        ValueError: 棋譜ファイルでない場合
+    """
+    if stream.read(len(RECORD_MAGIC)) != RECORD_MAGIC:
+        raise ValueError("not a game record file")
+
+
+def read_games(path):
+    """
+    棋譜ファイルの対局を順に読み込む
+    
+    Args:
+        path (str): 棋譜ファイルのパス
+        
+    Yields:
+        dict: 棋譜（decode_body 参照）
+    """
+    with open(path, "rb") as f:
+        read_header(f)
+        for chances_byte, body in iter_frames(f):
+            yield decode_body(chances_byte, body)
+
+
+def next_player(board, player_id):
+    """
+    着手後の手番を返す（GameManager.switch_turn と同じ規則）
+    
+    Args:
+        board (Board): 盤面
+        player_id (int): 着手したプレイヤーID
+        
+    Returns:
+        int: 次の手番のプレイヤーID、終局の場合はNone
+    """
+    opponent_id = 1 - player_id
+    if board.get_valid_moves_mask(opponent_id):
+        return opponent_id
+    if board.get_valid_moves_mask(player_id):
+        return player_id
+    return None
+
+
+def replay_game(game):
+    """
+    棋譜を初期配置から再生する
+    
+    各エントリを適用する前の状態を返し、最後に全エントリを適用した後の状態を
+    エントリ None として返す。盤面は同じオブジェクトを更新しながら返すため、
+    保存する場合は copy() すること。
+    
+    Args:
+        game (dict): 棋譜（decode_body 参照）
+        
+    Yields:
+        tuple: (盤面, 手番のプレイヤーID（終局後はNone）, (黒の残り回数, 白の残り回数), エントリ)
+        
+    Raises:
+        ValueError: 棋譜が規則に合わない場合
+    """
+    board = Board()
+    player_id = BLACK
+    attack_chances = list(game["attack_chances"])
+    
+    for entry in game["entries"]:
+        if player_id is None:
+            raise ValueError("game record continues after the game is over")
+        
+        yield board, player_id, (attack_chances[BLACK], attack_chances[WHITE]), entry
+        
+        row, col = entry[1], entry[2]
+        if entry[0] == ENTRY_MOVE:
+            if not board.place_stone(row, col, player_id):
+                raise ValueError(f"illegal move in game record: {(row, col)}")
+        else:
+            if attack_chances[player_id] <= 0 or board.grid[row][col] != 1 - player_id:
+                raise ValueError(f"illegal attack chance in game record: {(row, col)}")
+            attack_chances[player_id] -= 1
+            if entry[4]:
+                board.attack_stone(row, col, player_id)
+        
+        player_id = next_player(board, player_id)
+    
+    yield board, player_id, (attack_chances[BLACK], attack_chances[WHITE]), None
+
+
+def final_board(game):
+    """
+    棋譜を最後まで再生した盤面を返す
+    
+    Args:
+        game (dict): 棋譜（decode_body 参照）
+        
+    Returns:
+        Board: 最後の盤面
+    """
+    board = None
+    for board, _, _, _ in replay_game(game):
+        pass
+    return board
+
+
+class GameRecordWriter:
+    """対局を棋譜として追記するクラス（GameManager から呼び出される）"""
+    
+    def __init__(self, stream):
+        """
+        ストリームに書き出すライターを作成する（ファイルヘッダは書かない）
+        
+        Args:
+            stream (io.BufferedIOBase): 書き出し先のバイナリのストリーム
+        """
+        self.stream = stream
+        self.attack_chances = None
+        self.entries = None
+        self.games_written = 0
+    
+    @classmethod
+    def open(cls, path):
+        """
+        棋譜ファイルを追記用に開く（新しいファイルにはファイルヘッダを書く）
+        
+        Args:
+            path (str): 棋譜ファイルのパス
+            
+        Returns:
+            GameRecordWriter: 作成したライター
+            
+        Raises:
+            ValueError: 既存のファイルが棋譜ファイルでない場合
+        """
+        stream = open(path, "a+b")
+        try:
+            stream.seek(0, io.SEEK_END)
+            if stream.tell() == 0:
+                stream.write(RECORD_MAGIC)
+            else:
+                stream.seek(0)
+                read_header(stream)
+                stream.seek(0, io.SEEK_END)
+        except Exception:
+            stream.close()
+            raise
+        return cls(stream)
+    
+    def close(self):
+        """
+        記録中の対局を破棄してストリームを閉じる
+        """
+        self.entries = None
+        self.stream.close()
+    
+    def begin_game(self, attack_chances):
+        """
+        対局の記録を始める（記録中の対局は破棄する）
+        
+        Args:
+            attack_chances (tuple): (黒の初期回数, 白の初期回数)
+        """
+        self.attack_chances = tuple(attack_chances)
+        self.entries = []
+    
+    def add_move(self, row, col):
+        """
+        通常の手を記録する
+        
+        Args:
+            row (int): 行インデックス
+            col (int): 列インデックス
+        """
+        if self.entries is not None:
+            self.entries.append((ENTRY_MOVE, row, col))
+    
+    def add_attack(self, row, col, difficulty, success):
+        """
+        アタックチャンスを記録する
+        
+        Args:
+            row (int): 対象の行インデックス
+            col (int): 対象の列インデックス
+            difficulty (str): クイズの難易度 ("easy" または "hard")
+            success (bool): クイズに正解したかどうか
+        """
+        if self.entries is not None:
+            self.entries.append((ENTRY_ATTACK, row, col, difficulty, success))
+    
+    def end_game(self):
+        """
+        記録中の対局をストリームに書き出す
+        """
+        if self.entries is None:
+            return
+        self.write_frame(encode_game(self.attack_chances, self.entries))
+        self.entries = None
+    
+    def write_frame(self, frame):
+        """
+        エンコード済みのフレームを書き出す（別プロセスで記録した対局用）
+        
+        Args:
+            frame (bytes): encode_game の結果
+        """
+        self.stream.write(frame)
+        self.games_written += 1
@@ -0,0 +1,253 @@
+"""
+盤面の対称変換を提供するモジュール
+
+オセロ盤の8つの対称変換（回転と反転）をビットボードのビット演算で行い、
+局面を同値類の代表（正規形）に変換する。変換番号 0〜7 は次の3つの
+操作の組み合わせで、この順に適用する。
+    ビット2: 対角線（左上〜右下）での反転 (row, col) -> (col, row)
+    ビット1: 上下反転 (row, col) -> (7 - row, col)
+    ビット0: 左右反転 (row, col) -> (row, 7 - col)
+変換番号0は恒等変換。
+"""
+
+from .constants import BOARD_SIZE, BLACK, WHITE, EMPTY
+from .bitboard import iter_squares
+from .zobrist import position_hash
+
+# 変換の数
+TRANSFORM_COUNT = 8
+
+# 恒等変換の番号
+IDENTITY = 0
+
+
+def flip_vertical(bits):
+    """
+    ビットボードを上下反転する
+    
+    Args:
+        bits (int): ビットボード
+        
+    Returns:
+        int: 反転したビットボード
+    """
+    return int.from_bytes(bits.to_bytes(8, "little"), "big")
+
+
+def flip_horizontal(bits):
+    """
+    ビットボードを左右反転する
+    
+    Args:
+        bits (int): ビットボード
+        
+    Returns:
+        int: 反転したビットボード
+    """
+    bits = ((bits >> 1) & 0x5555555555555555) | ((bits & 0x5555555555555555) << 1)
+    bits = ((bits >> 2) & 0x3333333333333333) | ((bits & 0x3333333333333333) << 2)
+    return ((bits >> 4) & 0x0F0F0F0F0F0F0F0F) | ((bits & 0x0F0F0F0F0F0F0F0F) << 4)
+
+
+def flip_diagonal(bits):
+    """
+    ビットボードを対角線（左上〜右下）で反転する
+    
+    Args:
+        bits (int): ビットボード
+        
+    Returns:
+        int: 反転したビットボード
+    """
+    t = 0x0F0F0F0F00000000 & (bits ^ (bits << 28))
+    bits ^= t ^ (t >> 28)
+    t = 0x3333000033330000 & (bits ^ (bits << 14))
+    bits ^= t ^ (t >> 14)
+    t = 0x5500550055005500 & (bits ^ (bits << 7))
+    bits ^= t ^ (t >> 7)
+    return bits
+
+
+def transform_bits(bits, transform):
+    """
+    ビットボードに対称変換を適用する
+    
+    Args:
+        bits (int): ビットボード
+        transform (int): 変換番号（0〜7）
+        
+    Returns:
+        int: 変換したビットボード
+    """
+    if transform & 4:
+        bits = flip_diagonal(bits)
+    if transform & 2:
+        bits = flip_vertical(bits)
+    if transform & 1:
+        bits = flip_horizontal(bits)
+    return bits
+
+
+def transform_square(row, col, transform):
+    """
+    盤面上の位置に対称変換を適用する
+    
+    Args:
+        row (int): 行インデックス
+        col (int): 列インデックス
+        transform (int): 変換番号（0〜7）
+        
+    Returns:
+        tuple: 変換後の位置 (row, col)
+    """
+    last = BOARD_SIZE - 1
+    if transform & 4:
+        row, col = col, row
+    if transform & 2:
+        row = last - row
+    if transform & 1:
+        col = last - col
+    return row, col
+
+
+def _find_inverse(transform):
+    """
+    逆変換の番号を求める（内部関数）
+    """
+    for candidate in range(TRANSFORM_COUNT):
+        if all(
+            transform_square(*transform_square(row, col, transform), candidate) == (row, col)
+            for row, col in ((0, 1), (1, 3))
+        ):
+            return candidate
+    raise ValueError(f"invalid transform: {transform}")
+
+
+# 変換番号ごとの逆変換の番号
+INVERSE_TRANSFORMS = tuple(_find_inverse(transform) for transform in range(TRANSFORM_COUNT))
+
+
+def inverse_transform(transform):
+    """
+    逆変換の番号を返す
+    
+    Args:
+        transform (int): 変換番号（0〜7）
+        
+    Returns:
+        int: 変換を元に戻す変換番号
+    """
+    return INVERSE_TRANSFORMS[transform]
+
+
+def canonicalize_bitboards(black_bits, white_bits):
+    """
+    局面を正規形に変換する
+    
+    8つの変換のうち (黒のビットボード, 白のビットボード) が最小になるものを
+    正規形とする（同じ最小値になる変換が複数ある場合は番号の小さい方）。
+    
+    Args:
+        black_bits (int): 黒の石のビットボード
+        white_bits (int): 白の石のビットボード
+        
+    Returns:
+        tuple: (正規形の黒のビットボード, 正規形の白のビットボード, 使った変換番号)
+    """
+    best = (black_bits, white_bits)
+    best_transform = IDENTITY
+    
+    for transform in range(1, TRANSFORM_COUNT):
+        candidate = (transform_bits(black_bits, transform), transform_bits(white_bits, transform))
+        if candidate < best:
+            best = candidate
+            best_transform = transform
+    
+    return best[0], best[1], best_transform
+
+
+def grid_to_bitboards(grid):
+    """
+    リスト形式の盤面をビットボードに変換する
+    
+    Args:
+        grid (list): 8x8 の盤面（EMPTY / BLACK / WHITE）
+        
+    Returns:
+        tuple: (黒のビットボード, 白のビットボード)
+    """
+    bitboards = [0, 0]
+    for row in range(BOARD_SIZE):
+        for col in range(BOARD_SIZE):
+            stone = grid[row][col]
+            if stone != EMPTY:
+                bitboards[stone] |= 1 << (row * BOARD_SIZE + col)
+    return bitboards[BLACK], bitboards[WHITE]
+
+
+def bitboards_to_grid(black_bits, white_bits):
+    """
+    ビットボードをリスト形式の盤面に変換する
+    
+    Args:
+        black_bits (int): 黒の石のビットボード
+        white_bits (int): 白の石のビットボード
+        
+    Returns:
+        list: 8x8 の盤面（EMPTY / BLACK / WHITE）
+    """
+    grid = [[EMPTY for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+    for player_id, bits in ((BLACK, black_bits), (WHITE, white_bits)):
+        for row, col in iter_squares(bits):
+            grid[row][col] = player_id
+    return grid
+
+
+def transform_grid(grid, transform):
+    """
+    リスト形式の盤面に対称変換を適用する
+    
+    Args:
+        grid (list): 8x8 の盤面
+        transform (int): 変換番号（0〜7）
+        
+    Returns:
+        list: 変換した新しい盤面
+    """
+    result = [[EMPTY for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+    for row in range(BOARD_SIZE):
+        for col in range(BOARD_SIZE):
+            new_row, new_col = transform_square(row, col, transform)
+            result[new_row][new_col] = grid[row][col]
+    return result
+
+
+def canonicalize_grid(grid):
+    """
+    リスト形式の盤面を正規形に変換する（canonicalize_bitboards と同じ代表を選ぶ）
+    
+    Args:
+        grid (list): 8x8 の盤面
+        
+    Returns:
+        tuple: (正規形の新しい盤面, 使った変換番号)
+    """
+    black_bits, white_bits, transform = canonicalize_bitboards(*grid_to_bitboards(grid))
+    return bitboards_to_grid(black_bits, white_bits), transform
+
+
+def canonical_position_hash(black_bits, white_bits, side_to_move, attack_chances):
+    """
+    正規形の局面のハッシュ値を返す（対称な局面は同じ値になる）
+    
+    Args:
+        black_bits (int): 黒の石のビットボード
+        white_bits (int): 白の石のビットボード
+        side_to_move (int): 手番のプレイヤーID（0:黒, 1:白）
+        attack_chances (tuple): (黒の残り回数, 白の残り回数)
+        
+    Returns:
+        tuple: (64ビットのハッシュ値, 正規形にするために使った変換番号)
+    """
+    black_bits, white_bits, transform = canonicalize_bitboards(black_bits, white_bits)
+    return position_hash(black_bits, white_bits, side_to_move, attack_chances), transform
@@ -0,0 +1,104 @@
+"""
+局面のZobristハッシュを提供するモジュール
+
+石の配置・手番・各プレイヤーの残りアタックチャンス回数から64ビットの
+ハッシュ値を作る。乱数は固定シードで生成するため、プロセスや実行を
+またいでも同じ局面には同じハッシュ値が割り当てられる。
+"""
+
+import random
+
+from .constants import BOARD_SIZE, BLACK, WHITE
+
+# 乱数表の生成に使う固定シード
+ZOBRIST_SEED = 0x5A0B7157
+
+# ハッシュに含める残りアタックチャンス回数の上限
+MAX_ATTACK_CHANCES = 8
+
+
+def _generate_keys():
+    """
+    Zobristハッシュ用の乱数表を生成する（内部関数）
+    
+    Returns:
+        tuple: (石のキー, 手番のキー, アタックチャンスのキー)
+    """
+    rng = random.Random(ZOBRIST_SEED)
+    squares = BOARD_SIZE * BOARD_SIZE
+    stone_keys = tuple(
+        tuple(rng.getrandbits(64) for _ in range(squares))
+        for _ in (BLACK, WHITE)
+    )
+    side_key = rng.getrandbits(64)
+    attack_chance_keys = tuple(
+        tuple(rng.getrandbits(64) for _ in range(MAX_ATTACK_CHANCES + 1))
+        for _ in (BLACK, WHITE)
+    )
+    return stone_keys, side_key, attack_chance_keys
+
+
+# STONE_KEYS[player_id][square]: 石ごとのキー
+# SIDE_KEY: 白番の時に加えるキー
+# ATTACK_CHANCE_KEYS[player_id][回数]: 残りアタックチャンス回数ごとのキー
+STONE_KEYS, SIDE_KEY, ATTACK_CHANCE_KEYS = _generate_keys()
+
+# FLIP_KEYS[square]: 石が反転した時にハッシュへ加えるキー（黒と白のキーの排他的論理和）
+FLIP_KEYS = tuple(black ^ white for black, white in zip(STONE_KEYS[BLACK], STONE_KEYS[WHITE]))
+
+
+def stones_hash(black_bits, white_bits):
+    """
+    石の配置だけからハッシュ値を計算する
+    
+    Args:
+        black_bits (int): 黒の石のビットボード
+        white_bits (int): 白の石のビットボード
+        
+    Returns:
+        int: 石の配置のハッシュ値
+    """
+    value = 0
+    for player_id, bits in ((BLACK, black_bits), (WHITE, white_bits)):
+        keys = STONE_KEYS[player_id]
+        while bits:
+            low = bits & -bits
+            value ^= keys[low.bit_length() - 1]
+            bits ^= low
+    return value
+
+
+def state_key(side_to_move, attack_chances):
+    """
+    手番と残りアタックチャンス回数に対応するキーを返す
+    
+    Args:
+        side_to_move (int): 手番のプレイヤーID（0:黒, 1:白）
+        attack_chances (tuple): (黒の残り回数, 白の残り回数)
+        
+    Returns:
+        int: 石の配置のハッシュ値に排他的論理和で加えるキー
+    """
+    value = ATTACK_CHANCE_KEYS[BLACK][attack_chances[BLACK]] ^ ATTACK_CHANCE_KEYS[WHITE][attack_chances[WHITE]]
+    if side_to_move == WHITE:
+        value ^= SIDE_KEY
+    return value
+
+
+def position_hash(black_bits, white_bits, side_to_move, attack_chances):
+    """
+    局面全体のハッシュ値を最初から計算する
+    
+    Board.get_hash と同じ値になる。差分更新を使えない場合（ファイルから
+    読み込んだ局面など）に使う。
+    
+    Args:
+        black_bits (int): 黒の石のビットボード
+        white_bits (int): 白の石のビットボード
+        side_to_move (int): 手番のプレイヤーID（0:黒, 1:白）
+        attack_chances (tuple): (黒の残り回数, 白の残り回数)
+        
+    Returns:
+        int: 64ビットのハッシュ値
+    """
+    return stones_hash(black_bits, white_bits) ^ state_key(side_to_move, attack_chances)
@@ -3,17 +3,86 @@ Quiz Othello Game Main Module
 """
 
 import sys
+import argparse
 import pygame
 from quiz.quiz_data import QuizData
 from quiz.quiz_manager import QuizManager
 from game.game_manager import GameManager
+from game.player import Player
+from game.constants import BLACK, WHITE, AI_TIME_LIMIT
+from game.record import GameRecordWriter
+from ai.ai_player import AIPlayer
+from ai.search import SearchEngine
+from ai.parallel import ParallelSearchEngine
+from ai.opening_book import OpeningBook
 from ui.game_view import GameView
 from ui.quiz_view import QuizView
 from utils.helpers import get_quiz_data_path
+from utils.event_queue import EventQueue
+
+
+def parse_args():
+    """
+    コマンドライン引数を解析する
+    
+    Returns:
+        argparse.Namespace: 解析結果
+    """
+    parser = argparse.ArgumentParser(description="Quiz Othello")
+    parser.add_argument("--ai", choices=["black", "white", "both"],
+                        help="コンピュータが担当する手番")
+    parser.add_argument("--ai-time", type=float, default=AI_TIME_LIMIT,
+                        help="コンピュータの1手あたりの持ち時間（秒）")
+    parser.add_argument("--ai-workers", type=int, default=1,
+                        help="コンピュータの探索に使うプロセス数（2以上で並列探索）")
+    parser.add_argument("--book", help="コンピュータが使う定跡ファイルのパス")
+    parser.add_argument("--record", help="棋譜を追記するファイルのパス")
+    parser.add_argument("--quiz-data", default=None,
+                        help="クイズデータファイルのパス（.db の場合は SQLite のクイズストア）")
+    return parser.parse_args()
+
+
+def create_engine(ai_time, ai_workers=1):
+    """
+    コンピュータの探索エンジンを作成する
+    
+    Args:
+        ai_time (float): コンピュータの1手あたりの持ち時間（秒）
+        ai_workers (int): コンピュータの探索に使うプロセス数（2以上で並列探索）
+        
+    Returns:
+        SearchEngine: 探索エンジン（並列探索の場合は ParallelSearchEngine）
+    """
+    if ai_workers > 1:
+        return ParallelSearchEngine(workers=ai_workers, time_limit=ai_time)
+    return SearchEngine(time_limit=ai_time)
+
+
+def create_players(ai_side, engine=None, book=None):
+    """
+    プレイヤーを作成する
+    
+    Args:
+        ai_side (str): コンピュータが担当する手番 ("black", "white", "both" または None)
+        engine (SearchEngine): コンピュータの探索エンジン（両方の手番がコンピュータの場合は共有する）
+        book (OpeningBook): コンピュータが使う定跡、省略時は定跡を使わない
+        
+    Returns:
+        list: [黒のプレイヤー, 白のプレイヤー]
+    """
+    players = []
+    for player_id, side, name in ((BLACK, "black", "Player 1"), (WHITE, "white", "Player 2")):
+        if ai_side in (side, "both"):
+            players.append(AIPlayer(player_id, "Computer", engine, book=book))
+        else:
+            players.append(Player(player_id, name))
+    return players
 
 
 def main():
     """Main function"""
+    args = parse_args()
+    
     # Initialize Pygame
     pygame.init()
     
@@ -30,16 +99,29 @@ def main():
     clock = pygame.time.Clock()
     
     # クイズデータを初期化
-    quiz_data = QuizData(get_quiz_data_path())
+    quiz_data = QuizData(args.quiz_data or get_quiz_data_path())
+    
+    # タイマーなど別スレッドからの通知を受け取るキューを作成
+    event_queue = EventQueue()
     
     # クイズマネージャーを初期化
-    quiz_manager = QuizManager(quiz_data)
+    quiz_manager = QuizManager(quiz_data, event_queue)
     
     # ゲームマネージャーを初期化
     game_manager = GameManager(quiz_manager)
     
+    # 棋譜の記録先を設定
+    record_writer = GameRecordWriter.open(args.record) if args.record else None
+    game_manager.set_record_writer(record_writer)
+    
+    # コンピュータの探索エンジンを作成（コンピュータは1度に1手番しか探索しないため、両方の手番で共有する）
+    engine = create_engine(args.ai_time, args.ai_workers) if args.ai else None
+    
+    # 定跡ファイルを開く
+    book = OpeningBook(args.book) if args.book and args.ai else None
+    
     # ゲームを開始
-    game_manager.start_game("Player 1", "Player 2")
+    game_manager.start_game("Player 1", "Player 2", create_players(args.ai, engine, book))
     
     # ゲーム画面を初期化
     game_view = GameView(game_manager, screen_width, screen_height)
@@ -54,7 +136,7 @@ def main():
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
-            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and not game_manager.is_ai_turn():
                 # 左クリック
                 if game_manager.state == 1:  # STATE_ATTACK_CHANCE
                     # クイズ画面でのクリック
@@ -65,6 +147,13 @@ def main():
                     # ゲーム画面でのクリック
                     game_view.handle_click(event.pos)
         
+        # 別スレッドからの通知（クイズの時間切れなど）をこのスレッドで処理する
+        event_queue.drain()
+        
+        # コンピュータの手番を進める（探索は別のスレッドで行い、選んだ行動は次の drain で反映する）
+        if game_manager.is_ai_turn():
+            game_manager.start_ai_turn(event_queue)
+        
         # マウス位置を取得
         mouse_pos = pygame.mouse.get_pos()
         
@@ -89,6 +178,18 @@ def main():
         # フレームレートを制限
         clock.tick(60)
     
+    # 棋譜ファイルを閉じる
+    if record_writer:
+        record_writer.close()
+    
+    # 並列探索のワーカープロセスを終了
+    if hasattr(engine, "close"):
+        engine.close()
+    
+    # 定跡ファイルを閉じる
+    if book is not None:
+        book.close()
+    
     # Pygameを終了
     pygame.quit()
     sys.exit()
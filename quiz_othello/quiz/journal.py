@@ -0,0 +1,149 @@
+"""
+追加したクイズを記録する追記専用のジャーナルのモジュール
+
+クイズを追加するたびにデータファイル全体を書き直す代わりに、追加したクイズを
+1行1件の JSON（JSONL）でジャーナルファイルの末尾に追記する。読み込み時は
+データファイルの後にジャーナルを再生する。
+
+ジャーナルをデータファイルにまとめる（圧縮する）時は、まずジャーナルを
+圧縮中のファイル（.compacting）に名前を変えて凍結し、以降の追記は新しい
+ジャーナルに書く。凍結したジャーナルの末尾には、まとめた後のデータファイルの
+難易度ごとのクイズの数を記録する。データファイルを os.replace で置き換えた後に
+凍結したジャーナルを削除する。削除の前に中断した場合は、データファイルの
+クイズの数が記録と一致すればまとめ終わっているとみなし、凍結したジャーナルを
+再生せずに削除する（同じ内容のクイズを重複とみなして捨てることはしない）。
+"""
+
+import json
+import os
+
+# ジャーナルファイルの拡張子（データファイルのパスの後に付ける）
+JOURNAL_SUFFIX = ".journal"
+
+# 圧縮中に凍結したジャーナルの拡張子（ジャーナルファイルのパスの後に付ける）
+COMPACTING_SUFFIX = ".compacting"
+
+# 凍結したジャーナルに記録する、まとめた後のクイズの数の項目名
+COMPACTED_KEY = "compacted"
+
+
+class QuizJournal:
+    """追加したクイズを JSONL で追記するジャーナル"""
+    
+    def __init__(self, data_file):
+        """
+        Args:
+            data_file (str): クイズデータファイルのパス（ジャーナルはその隣に作る）
+        """
+        self.path = data_file + JOURNAL_SUFFIX
+        self.frozen_path = self.path + COMPACTING_SUFFIX
+    
+    def append(self, entries):
+        """
+        クイズをまとめて1回の書き込みで追記する
+        
+        Args:
+            entries (list): [(難易度, クイズデータ), ...]
+        """
+        lines = "".join(
+            json.dumps(dict(quiz, difficulty=difficulty), ensure_ascii=False) + "\n"
+            for difficulty, quiz in entries
+        )
+        if not lines:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+    
+    def _read(self, path):
+        """
+        ジャーナルファイルの記録を読む（内部メソッド）
+        
+        途中で書き込みが止まった最後の行など、読めない行は飛ばす。
+        
+        Yields:
+            tuple: (難易度, クイズデータ)、まとめた後のクイズの数の記録は (None, {難易度: 数})
+        """
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if COMPACTED_KEY in record:
+                    yield None, record[COMPACTED_KEY]
+                    continue
+                difficulty = record.pop("difficulty", None)
+                if difficulty is not None:
+                    yield difficulty, record
+    
+    def replay(self, quizzes):
+        """
+        凍結したジャーナルとジャーナルの記録をクイズデータに追加する
+        
+        Args:
+            quizzes (dict): {難易度: [クイズデータ, ...]}（そのまま追加する）
+            
+        Returns:
+            int: データファイルにまとめていない記録の数
+        """
+        count = 0
+        if os.path.exists(self.frozen_path):
+            entries = []
+            compacted = None
+            for difficulty, record in self._read(self.frozen_path):
+                if difficulty is None:
+                    compacted = record
+                else:
+                    entries.append((difficulty, record))
+            
+            counts = {difficulty: len(quizzes_list) for difficulty, quizzes_list in quizzes.items()}
+            if compacted == counts:
+                # 前回の圧縮はデータファイルの置き換えまで終わっている
+                self.discard_frozen()
+            else:
+                for difficulty, quiz in entries:
+                    if difficulty in quizzes:
+                        quizzes[difficulty].append(quiz)
+                    count += 1
+        
+        for difficulty, quiz in self._read(self.path):
+            if difficulty in quizzes:
+                quizzes[difficulty].append(quiz)
+            count += 1
+        return count
+    
+    def freeze(self, compacted_counts):
+        """
+        ジャーナルを凍結して、以降の追記を新しいジャーナルに書くようにする
+        
+        凍結したジャーナルが残っている場合は、その後ろに今のジャーナルを続ける。
+        最後に、まとめた後のデータファイルの難易度ごとのクイズの数を記録する。
+        
+        Args:
+            compacted_counts (dict): まとめた後の {難易度: クイズの数}
+        """
+        if os.path.exists(self.path):
+            if os.path.exists(self.frozen_path):
+                with open(self.path, "r", encoding="utf-8") as src, \
+                        open(self.frozen_path, "a", encoding="utf-8") as dst:
+                    dst.write(src.read())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.frozen_path)
+        elif not os.path.exists(self.frozen_path):
+            return
+        
+        with open(self.frozen_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({COMPACTED_KEY: compacted_counts}, ensure_ascii=False) + "\n")
+    
+    def discard_frozen(self):
+        """
+        データファイルにまとめた凍結したジャーナルを削除する
+        """
+        if os.path.exists(self.frozen_path):
+            os.remove(self.frozen_path)
@@ -0,0 +1,377 @@
+"""
+クイズデータの JSON ファイルを変換したバイナリキャッシュのモジュール
+
+起動のたびに JSON を解析しないように、クイズデータファイルの隣に
+キャッシュファイル（.cache）を作る。キャッシュは文字列表と固定長のレコードからなり、
+mmap で開いて、クイズの項目に初めてアクセスした時にその文字列だけを復号する。
+
+キャッシュファイルの形式（数値はリトルエンディアン）：
+    ヘッダー:   マジック(8バイト), 元ファイルのサイズ(uint64), 更新時刻(int64, ns),
+                元ファイルの SHA-256(32バイト), 難易度の数(uint32)
+    難易度:     名前の位置(uint32), 名前の長さ(uint32), 最初のレコード番号(uint32), レコード数(uint32)
+    レコード:   問題文, 選択肢(JSON), その他の項目(JSON) の位置と長さ(uint32 x 6), 正解(int32)
+    文字列表:   UTF-8 の文字列を並べたもの（位置は文字列表の先頭から数える）
+
+元ファイルのサイズが違う場合はすぐにキャッシュを作り直す。サイズが同じ場合は
+元ファイルの SHA-256 を比べる（更新時刻を保ったままの書き換えも見つけるため、
+更新時刻が一致しても比べる）。一致すればキャッシュを使い、更新時刻だけが違う場合は
+記録した更新時刻を書き直す。ハッシュの計算は JSON の解析よりはるかに速い。
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping, Sequence
+
+# キャッシュファイルの拡張子（データファイルのパスの後に付ける）
+CACHE_SUFFIX = ".cache"
+
+# キャッシュファイルの先頭に置く識別子（最後のバイトは形式の版）
+CACHE_MAGIC = b"QOQZC\x00\x00\x01"
+
+# ヘッダー: マジック, 元ファイルのサイズ, 更新時刻(ns), SHA-256, 難易度の数
+HEADER_FORMAT = "<8sQq32sI"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+# 更新時刻のヘッダー内の位置
+MTIME_OFFSET = 16
+
+# 難易度: 名前の位置, 名前の長さ, 最初のレコード番号, レコード数
+DIFFICULTY_FORMAT = "<IIII"
+DIFFICULTY_SIZE = struct.calcsize(DIFFICULTY_FORMAT)
+
+# レコード: 問題文, 選択肢, その他の項目の位置と長さ, 正解
+RECORD_FORMAT = "<IIIIIIi"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+# レコードに直接持つ項目
+_FIXED_KEYS = ("question", "options", "correct_answer")
+
+
+def cache_path_for(data_file):
+    """
+    クイズデータファイルに対応するキャッシュファイルのパスを返す
+    
+    Args:
+        data_file (str): クイズデータファイルのパス
+        
+    Returns:
+        str: キャッシュファイルのパス
+    """
+    return data_file + CACHE_SUFFIX
+
+
+class CachedQuiz(Mapping):
+    """キャッシュのレコードから項目を必要な時に復号するクイズ"""
+    
+    __slots__ = ("cache", "index", "_values")
+    
+    def __init__(self, cache, index):
+        """
+        Args:
+            cache (QuizCache): 読み込み元のキャッシュ
+            index (int): レコード番号
+        """
+        self.cache = cache
+        self.index = index
+        self._values = {}
+    
+    def _extra(self):
+        """
+        レコードに直接持たない項目を復号する（内部メソッド）
+        """
+        if "_extra" not in self._values:
+            self._values["_extra"] = self.cache.extra(self.index)
+        return self._values["_extra"]
+    
+    def __getitem__(self, key):
+        if key in self._values:
+            return self._values[key]
+        if key == "question":
+            value = self.cache.question(self.index)
+        elif key == "options":
+            value = self.cache.options(self.index)
+        elif key == "correct_answer":
+            value = self.cache.correct_answer(self.index)
+        else:
+            return self._extra()[key]
+        self._values[key] = value
+        return value
+    
+    def __iter__(self):
+        yield from _FIXED_KEYS
+        yield from self._extra()
+    
+    def __len__(self):
+        return len(_FIXED_KEYS) + len(self._extra())
+    
+    def __repr__(self):
+        return f"CachedQuiz({self.index})"
+
+
+class CachedQuizList(Sequence):
+    """キャッシュの1つの難易度のクイズの列（追加したクイズは後ろに持つ）"""
+    
+    def __init__(self, cache, start, count):
+        """
+        Args:
+            cache (QuizCache): 読み込み元のキャッシュ
+            start (int): 最初のレコード番号
+            count (int): レコード数
+        """
+        self.cache = cache
+        self.start = start
+        self.count = count
+        self.added = []
+    
+    def __len__(self):
+        return self.count + len(self.added)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("quiz index out of range")
+        if index < self.count:
+            return CachedQuiz(self.cache, self.start + index)
+        return self.added[index - self.count]
+    
+    def append(self, quiz):
+        """
+        クイズを末尾に追加する
+        
+        Args:
+            quiz (dict): クイズデータ
+        """
+        self.added.append(quiz)
+
+
+class QuizCache:
+    """mmap で開いたクイズデータのキャッシュ"""
+    
+    def __init__(self, path):
+        """
+        キャッシュファイルを開く
+        
+        Args:
+            path (str): キャッシュファイルのパス
+            
+        Raises:
+            ValueError: キャッシュファイルの形式が正しくない場合
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self.source_size, self.source_mtime_ns, self.source_hash, difficulty_count = \
+                struct.unpack_from(HEADER_FORMAT, self._mmap, 0)
+            if magic != CACHE_MAGIC:
+                raise ValueError(f"{path} is not a quiz cache")
+            
+            entries = [
+                struct.unpack_from(DIFFICULTY_FORMAT, self._mmap, HEADER_SIZE + i * DIFFICULTY_SIZE)
+                for i in range(difficulty_count)
+            ]
+            self._records_offset = HEADER_SIZE + difficulty_count * DIFFICULTY_SIZE
+            record_count = sum(entry[3] for entry in entries)
+            self._strings_offset = self._records_offset + record_count * RECORD_SIZE
+            if self._strings_offset > len(self._mmap):
+                raise ValueError(f"{path} is truncated")
+            
+            # 難易度ごとの (最初のレコード番号, レコード数)
+            self.difficulties = {
+                self._string(name_offset, name_length): (start, count)
+                for name_offset, name_length, start, count in entries
+            }
+        except (struct.error, ValueError, UnicodeDecodeError, OSError):
+            self.close()
+            raise
+    
+    def close(self):
+        """
+        キャッシュファイルを閉じる
+        """
+        if getattr(self, "_mmap", None) is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+    
+    def quizzes(self):
+        """
+        難易度ごとのクイズの列を返す
+        
+        Returns:
+            dict: {難易度: CachedQuizList}
+        """
+        return {difficulty: CachedQuizList(self, start, count)
+                for difficulty, (start, count) in self.difficulties.items()}
+    
+    def _string(self, offset, length):
+        """
+        文字列表から文字列を復号する（内部メソッド）
+        """
+        start = self._strings_offset + offset
+        return self._mmap[start:start + length].decode("utf-8")
+    
+    def _record(self, index):
+        """
+        レコードを読む（内部メソッド）
+        """
+        return struct.unpack_from(RECORD_FORMAT, self._mmap, self._records_offset + index * RECORD_SIZE)
+    
+    def question(self, index):
+        """
+        レコードの問題文を復号する
+        
+        Args:
+            index (int): レコード番号
+            
+        Returns:
+            str: 問題文
+        """
+        record = self._record(index)
+        return self._string(record[0], record[1])
+    
+    def options(self, index):
+        """
+        レコードの選択肢を復号する
+        
+        Args:
+            index (int): レコード番号
+            
+        Returns:
+            list: 選択肢のリスト
+        """
+        record = self._record(index)
+        return json.loads(self._string(record[2], record[3]))
+    
+    def extra(self, index):
+        """
+        レコードの問題文・選択肢・正解以外の項目を復号する
+        
+        Args:
+            index (int): レコード番号
+            
+        Returns:
+            dict: その他の項目（タグなど）
+        """
+        record = self._record(index)
+        if record[5] == 0:
+            return {}
+        return json.loads(self._string(record[4], record[5]))
+    
+    def correct_answer(self, index):
+        """
+        レコードの正解の選択肢のインデックスを返す
+        
+        Args:
+            index (int): レコード番号
+            
+        Returns:
+            int: 正解の選択肢のインデックス
+        """
+        return self._record(index)[6]
+
+
+def write_cache(data_file, quizzes, data):
+    """
+    クイズデータのキャッシュファイルを作る
+    
+    Args:
+        data_file (str): クイズデータファイルのパス
+        quizzes (dict): data を解析した {難易度: [クイズデータ, ...]}
+        data (bytes): クイズデータファイルの内容
+    """
+    strings = bytearray()
+    encode_json = json.JSONEncoder(ensure_ascii=False).encode
+    
+    def add_string(text):
+        offset = len(strings)
+        encoded = text.encode("utf-8")
+        strings.extend(encoded)
+        return offset, len(encoded)
+    
+    difficulty_table = bytearray()
+    records = bytearray()
+    record_count = 0
+    for difficulty, difficulty_quizzes in quizzes.items():
+        name_offset, name_length = add_string(difficulty)
+        difficulty_table += struct.pack(DIFFICULTY_FORMAT, name_offset, name_length, record_count, len(difficulty_quizzes))
+        for quiz in difficulty_quizzes:
+            extra = {key: value for key, value in quiz.items() if key not in _FIXED_KEYS}
+            question = add_string(quiz["question"])
+            options = add_string(encode_json(quiz["options"]))
+            extra = add_string(encode_json(extra)) if extra else (0, 0)
+            records += struct.pack(RECORD_FORMAT, *question, *options, *extra, quiz["correct_answer"])
+            record_count += 1
+    
+    stat = os.stat(data_file)
+    header = struct.pack(HEADER_FORMAT, CACHE_MAGIC, len(data), stat.st_mtime_ns,
+                         hashlib.sha256(data).digest(), len(quizzes))
+    
+    path = cache_path_for(data_file)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(header + difficulty_table + records + strings)
+    os.replace(temp_path, path)
+
+
+def _open_valid_cache(data_file, stat):
+    """
+    元ファイルに一致するキャッシュを開く（内部関数）
+    
+    Returns:
+        QuizCache: キャッシュ、無いか一致しない場合はNone
+    """
+    path = cache_path_for(data_file)
+    if not os.path.exists(path):
+        return None
+    try:
+        cache = QuizCache(path)
+    except (struct.error, ValueError, UnicodeDecodeError, OSError):
+        return None
+    
+    if cache.source_size == stat.st_size:
+        # サイズと更新時刻が同じでも内容が書き換えられている場合があるため、常に内容を比べる
+        with open(data_file, "rb") as f:
+            digest = hashlib.sha256(f.read()).digest()
+        if digest == cache.source_hash:
+            if cache.source_mtime_ns != stat.st_mtime_ns:
+                try:
+                    with open(path, "r+b") as f:
+                        f.seek(MTIME_OFFSET)
+                        f.write(struct.pack("<q", stat.st_mtime_ns))
+                except OSError:
+                    pass
+            return cache
+    
+    cache.close()
+    return None
+
+
+def load_quizzes(data_file):
+    """
+    クイズデータを読み込む（キャッシュが使えない場合は JSON を解析してキャッシュを作る）
+    
+    Args:
+        data_file (str): クイズデータファイルのパス
+        
+    Returns:
+        dict: {難易度: クイズの列}（キャッシュから読んだ場合は CachedQuizList）
+    """
+    cache = _open_valid_cache(data_file, os.stat(data_file))
+    if cache is not None:
+        return cache.quizzes()
+    
+    with open(data_file, "rb") as f:
+        data = f.read()
+    quizzes = json.loads(data)
+    try:
+        write_cache(data_file, quizzes, data)
+    except Exception as e:
+        print(f"Quiz cache writing error: {e}")
+    return quizzes
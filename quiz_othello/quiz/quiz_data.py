@@ -1,10 +1,25 @@
 """
 クイズデータを管理するモジュール
+
+データファイルの拡張子が .db などの場合は SQLite のクイズストア（quiz_store.py）を使い、
+すべてのクイズをメモリに読み込まずに出題する。
+JSON ファイルの場合、追加したクイズはジャーナル（journal.py）に追記し、
+記録が一定数たまったら別のスレッドでデータファイルにまとめる。
+JSON ファイルは隣に作るバイナリキャッシュ（quiz_cache.py）から読み込み、
+問題文などはクイズの項目に初めてアクセスした時に復号する。
 """
 
 import json
 import os
 import random
+import threading
+
+from .journal import QuizJournal
+from .quiz_cache import load_quizzes, write_cache
+from .quiz_store import SQLiteQuizStore, is_store_path
+
+# ジャーナルをデータファイルにまとめる記録の数
+JOURNAL_COMPACT_THRESHOLD = 500
 
 
 class QuizData:
@@ -15,28 +30,63 @@ class QuizData:
         クイズデータを初期化
         
         Args:
-            data_file (str): クイズデータファイルのパス
+            data_file (str): クイズデータファイルのパス（JSON または SQLite のクイズストア）
         """
         self.data_file = data_file
         self.quizzes = {"easy": [], "hard": []}
-        self.load_quiz_data()
+        
+        # SQLite のクイズストア（JSON ファイルを使う場合はNone）
+        self.store = None
+        
+        # 追加したクイズのジャーナルと、データファイルにまとめていない記録の数
+        self.journal = None
+        self.journal_entries = 0
+        
+        # クイズの追加とデータファイルへの保存を守るロック
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._compaction = None
+        
+        # 難易度ごとの {タグ: クイズの位置のリスト}（最初にタグで出題する時に作る）
+        self._tag_index = {}
+        
+        if is_store_path(data_file):
+            self.store = SQLiteQuizStore(data_file)
+        else:
+            self.journal = QuizJournal(data_file)
+            self.load_quiz_data()
     
     def load_quiz_data(self):
         """
-        JSONファイルからクイズデータを読み込む
+        JSONファイルからクイズデータを読み込み、ジャーナルの記録を追加する
         ファイルが存在しない場合はサンプルデータを作成
         """
+        created = False
+        self._tag_index = {}
         try:
             if os.path.exists(self.data_file):
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    self.quizzes = json.load(f)
+                # キャッシュが使えない場合は JSON を解析してキャッシュを作る
+                self.quizzes = load_quizzes(self.data_file)
             else:
                 # サンプルデータを作成
                 self._create_sample_data()
+                created = True
         except Exception as e:
             print(f"Quiz data loading error: {e}")
             # エラー時もサンプルデータを作成
             self._create_sample_data()
+            created = True
+        
+        try:
+            self.journal_entries = self.journal.replay(self.quizzes)
+        except Exception as e:
+            print(f"Quiz journal loading error: {e}")
+        
+        if created:
+            # サンプルデータ（とジャーナルの記録）を保存
+            self.save_quiz_data()
+        else:
+            self._schedule_compaction()
     
     def _create_sample_data(self):
         """サンプルのクイズデータを作成"""
@@ -76,36 +126,106 @@ class QuizData:
                 }
             ]
         }
-        
-        # サンプルデータを保存
-        self.save_quiz_data()
     
     def save_quiz_data(self):
-        """クイズデータをJSONファイルに保存"""
-        try:
-            # ディレクトリが存在しない場合は作成
-            os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
+        """
+        クイズデータをJSONファイルに保存し、ジャーナルの記録をまとめる
+        
+        ジャーナルを凍結してからクイズデータを写し、一時ファイルに書いて
+        os.replace で置き換える。保存中に追加されたクイズは新しいジャーナルに書く。
+        保存した内容でキャッシュも作り直す。
+        """
+        if self.store is not None:
+            # SQLite のクイズストアは追加のたびにコミットしている
+            return
+        
+        with self._save_lock:
+            with self._lock:
+                snapshot = {difficulty: list(quizzes) for difficulty, quizzes in self.quizzes.items()}
+                self.journal.freeze({difficulty: len(quizzes) for difficulty, quizzes in snapshot.items()})
+                self.journal_entries = 0
             
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(self.quizzes, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"クイズデータの保存エラー: {e}")
+            try:
+                # キャッシュから読んだクイズを辞書に戻す
+                snapshot = {difficulty: [dict(quiz) for quiz in quizzes] for difficulty, quizzes in snapshot.items()}
+                data = json.dumps(snapshot, ensure_ascii=False, indent=2).encode('utf-8')
+                
+                # ディレクトリが存在しない場合は作成
+                os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
+                
+                temp_file = self.data_file + ".tmp"
+                with open(temp_file, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_file, self.data_file)
+                self.journal.discard_frozen()
+                write_cache(self.data_file, snapshot, data)
+            except Exception as e:
+                print(f"クイズデータの保存エラー: {e}")
+    
+    def _schedule_compaction(self):
+        """
+        ジャーナルの記録がたまっていれば別のスレッドでデータファイルにまとめる（内部メソッド）
+        """
+        with self._lock:
+            if self.journal_entries < JOURNAL_COMPACT_THRESHOLD:
+                return
+            if self._compaction is not None and self._compaction.is_alive():
+                return
+            # 終了時に書き込みが途中で止まらないようにデーモンにしない
+            self._compaction = threading.Thread(target=self.save_quiz_data, name="quiz-compaction")
+            self._compaction.start()
+    
+    def wait_for_compaction(self):
+        """
+        別のスレッドで行っているデータファイルへの保存が終わるまで待つ
+        """
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
     
-    def get_random_quiz(self, difficulty):
+    def get_random_quiz(self, difficulty, tag=None):
         """
         指定された難易度のクイズをランダムに取得
         
         Args:
             difficulty (str): 難易度 ("easy" または "hard")
+            tag (str): タグ、指定した場合はそのタグが付いたクイズから選ぶ
             
         Returns:
             dict: クイズデータ、または難易度に合うクイズがない場合はNone
         """
-        if difficulty in self.quizzes and self.quizzes[difficulty]:
-            return random.choice(self.quizzes[difficulty])
+        if self.store is not None:
+            return self.store.get_random_quiz(difficulty, tag)
+        
+        quizzes = self.quizzes.get(difficulty)
+        if not quizzes:
+            return None
+        if tag is None:
+            return random.choice(quizzes)
+        
+        positions = self._get_tag_index(difficulty).get(tag)
+        if positions:
+            return quizzes[random.choice(positions)]
         return None
     
-    def add_quiz(self, difficulty, question, options, correct_answer):
+    def _get_tag_index(self, difficulty):
+        """
+        難易度の {タグ: クイズの位置のリスト} を返す（内部メソッド）
+        
+        キャッシュから読んだクイズのタグを起動時に復号しないように、最初に
+        タグで出題する時に作る。以降は _append で追加したクイズを反映する。
+        """
+        with self._lock:
+            index = self._tag_index.get(difficulty)
+            if index is None:
+                index = {}
+                for position, quiz in enumerate(self.quizzes[difficulty]):
+                    for tag in dict.fromkeys(quiz.get("tags", ())):
+                        index.setdefault(tag, []).append(position)
+                self._tag_index[difficulty] = index
+            return index
+    
+    def add_quiz(self, difficulty, question, options, correct_answer, tags=None):
         """
         新しいクイズを追加
         
@@ -114,10 +234,14 @@ class QuizData:
             question (str): 問題文
             options (list): 選択肢のリスト
             correct_answer (int): 正解の選択肢のインデックス
+            tags (list): タグのリスト（省略可）
             
         Returns:
             bool: 追加に成功したかどうか
         """
+        if self.store is not None:
+            return self.store.add_quiz(difficulty, question, options, correct_answer, tags or ())
+        
         if difficulty not in self.quizzes:
             return False
         
@@ -126,7 +250,61 @@ class QuizData:
             "options": options,
             "correct_answer": correct_answer
         }
+        if tags:
+            new_quiz["tags"] = list(tags)
         
-        self.quizzes[difficulty].append(new_quiz)
-        self.save_quiz_data()
+        self._append([(difficulty, new_quiz)])
         return True
+    
+    def bulk_add_quizzes(self, quizzes):
+        """
+        複数のクイズをまとめて追加する（ジャーナルへの書き込みは1回）
+        
+        Args:
+            quizzes (iterable): {"difficulty", "question", "options", "correct_answer", "tags"(任意)} の辞書
+            
+        Returns:
+            int: 追加したクイズの数（難易度が正しくないものは飛ばす）
+        """
+        if self.store is not None:
+            return self.store.add_quizzes(quizzes)
+        
+        entries = []
+        for quiz in quizzes:
+            difficulty = quiz["difficulty"]
+            if difficulty not in self.quizzes:
+                continue
+            new_quiz = {
+                "question": quiz["question"],
+                "options": quiz["options"],
+                "correct_answer": quiz["correct_answer"]
+            }
+            if quiz.get("tags"):
+                new_quiz["tags"] = list(quiz["tags"])
+            entries.append((difficulty, new_quiz))
+        
+        self._append(entries)
+        return len(entries)
+    
+    def _append(self, entries):
+        """
+        クイズを追加してジャーナルに追記する（内部メソッド）
+        
+        Args:
+            entries (list): [(難易度, クイズデータ), ...]
+        """
+        if not entries:
+            return
+        with self._lock:
+            try:
+                self.journal.append(entries)
+            except Exception as e:
+                print(f"クイズデータの保存エラー: {e}")
+            for difficulty, quiz in entries:
+                index = self._tag_index.get(difficulty)
+                if index is not None:
+                    for tag in dict.fromkeys(quiz.get("tags", ())):
+                        index.setdefault(tag, []).append(len(self.quizzes[difficulty]))
+                self.quizzes[difficulty].append(quiz)
+            self.journal_entries += len(entries)
+        self._schedule_compaction()
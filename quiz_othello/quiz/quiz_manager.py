@@ -2,24 +2,33 @@
 クイズの出題と回答判定を管理するモジュール
 """
 
+import random
+from functools import partial
+
 from .timer import Timer
-from game.constants import DIFFICULTY_EASY, DIFFICULTY_HARD, QUIZ_TIMER_SECONDS
+from game.constants import DIFFICULTY_EASY, DIFFICULTY_HARD, QUIZ_TIMER_SECONDS, INITIAL_ATTACK_CHANCES
 
 
 class QuizManager:
     """クイズの出題と回答判定を管理するクラス"""
     
-    def __init__(self, quiz_data):
+    def __init__(self, quiz_data, event_queue=None):
         """
         クイズマネージャーを初期化
         
         Args:
             quiz_data (QuizData): クイズデータオブジェクト
+            event_queue (EventQueue): 時間切れを渡すメインループのキュー、
+                                      省略時はタイマーのスレッドから直接コールバックを呼ぶ
         """
         self.quiz_data = quiz_data
+        self.event_queue = event_queue
         self.current_quiz = None
         self.timer = None
         self.time_up_callback = None
+        
+        # 出題ごとに変わる番号（回答済みのクイズの時間切れを無視するために使う）
+        self.quiz_token = 0
     
     def start_quiz(self, difficulty, time_up_callback=None):
         """
@@ -35,6 +44,7 @@ class QuizManager:
         # 前回のタイマーが動いていれば停止
         if self.timer and self.timer.is_running:
             self.timer.stop()
+        self.quiz_token += 1
         
         # クイズを取得
         self.current_quiz = self.quiz_data.get_random_quiz(difficulty)
@@ -46,7 +56,7 @@ class QuizManager:
         self.time_up_callback = time_up_callback
         
         # タイマーを初期化して開始
-        self.timer = Timer(QUIZ_TIMER_SECONDS, self.time_up)
+        self.timer = Timer(QUIZ_TIMER_SECONDS, partial(self._on_timer_expired, self.quiz_token))
         self.timer.start()
         
         return self.current_quiz
@@ -64,19 +74,37 @@ class QuizManager:
         if not self.current_quiz:
             return False
         
-        # タイマーを停止
+        # タイマーを停止し、キューに積まれた時間切れがあれば無効にする
         if self.timer:
             self.timer.stop()
+        self.quiz_token += 1
         
         # 回答を判定
         is_correct = (answer_index == self.current_quiz["correct_answer"])
         
         return is_correct
     
-    def time_up(self):
+    def _on_timer_expired(self, token):
+        """
+        タイマーの時間切れを受け取る（タイマーのスレッドから呼ばれる内部メソッド）
+        
+        Args:
+            token (int): 時間切れになったクイズの番号
+        """
+        if self.event_queue is not None:
+            self.event_queue.post(self.time_up, token)
+        else:
+            self.time_up(token)
+    
+    def time_up(self, token=None):
         """
         時間切れ処理
+        
+        Args:
+            token (int): 時間切れになったクイズの番号、現在のクイズと違う場合は何もしない
         """
+        if token is not None and token != self.quiz_token:
+            return
         if self.time_up_callback:
             self.time_up_callback()
     
@@ -91,7 +119,8 @@ class QuizManager:
             return self.timer.get_remaining_time()
         return 0
     
-    def get_difficulty_for_attack_chance(self, attack_chance_count):
+    @staticmethod
+    def get_difficulty_for_attack_chance(attack_chance_count):
         """
         アタックチャンスの回数に応じた難易度を返す
         
@@ -105,3 +134,41 @@ class QuizManager:
             return DIFFICULTY_EASY
         else:
             return DIFFICULTY_HARD
+    
+    @staticmethod
+    def get_difficulty_for_remaining_chances(remaining, initial_chances=INITIAL_ATTACK_CHANCES):
+        """
+        残り回数から、次に使うアタックチャンスの難易度を返す
+        
+        ゲームと同じく使用回数（初期回数 - 残り回数 + 1）から難易度を決める。
+        
+        Args:
+            remaining (int): 使用前のアタックチャンスの残り回数
+            initial_chances (int): アタックチャンスの初期回数
+            
+        Returns:
+            str: 難易度 ("easy" または "hard")
+        """
+        return QuizManager.get_difficulty_for_attack_chance(initial_chances - remaining + 1)
+    
+    @staticmethod
+    def answer_with_accuracy(quiz, accuracy, rng=random):
+        """
+        正解率に従ってクイズに回答する（コンピュータと自己対戦の回答に使う）
+        
+        Args:
+            quiz (dict): クイズデータ
+            accuracy (float): 正解する確率
+            rng (random.Random): 乱数生成器
+            
+        Returns:
+            int: 選択した回答のインデックス（不正解の場合は正解以外から一様に選ぶ）
+        """
+        correct_answer = quiz["correct_answer"]
+        if rng.random() < accuracy:
+            return correct_answer
+        
+        wrong_answers = [i for i in range(len(quiz["options"])) if i != correct_answer]
+        if not wrong_answers:
+            return correct_answer
+        return rng.choice(wrong_answers)
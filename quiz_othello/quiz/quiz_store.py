@@ -0,0 +1,297 @@
+"""
+SQLite にクイズを保存するクイズストアのモジュール
+
+問題数が多い場合に、すべてのクイズをメモリに読み込まずに出題する。
+クイズには難易度ごとの連番（position）を振り、(難易度, 連番) と
+(タグ, 難易度, 連番) の索引から乱数で選んだ1行だけを読む。
+件数は索引の最大値から求めるため、起動時にテーブルを走査しない。
+問題文と選択肢は、返したクイズの項目に初めてアクセスした時に読み込む。
+
+JSON のクイズデータからデータベースを作成するコマンド：
+    python -m quiz.quiz_store data/quiz_data.json data/quiz_data.db
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+from collections.abc import Mapping
+
+from game.constants import DIFFICULTY_EASY, DIFFICULTY_HARD
+
+# SQLite のクイズストアとして扱うファイルの拡張子
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+# 扱う難易度
+DIFFICULTIES = (DIFFICULTY_EASY, DIFFICULTY_HARD)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quizzes (
+    id INTEGER PRIMARY KEY,
+    difficulty TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    question TEXT NOT NULL,
+    options TEXT NOT NULL,
+    correct_answer INTEGER NOT NULL,
+    tags TEXT NOT NULL DEFAULT '[]'
+);
+CREATE UNIQUE INDEX IF NOT EXISTS quizzes_difficulty ON quizzes (difficulty, position);
+CREATE TABLE IF NOT EXISTS quiz_tags (
+    tag TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    quiz_id INTEGER NOT NULL,
+    PRIMARY KEY (tag, difficulty, position)
+) WITHOUT ROWID;
+"""
+
+
+def is_store_path(path):
+    """
+    ファイルが SQLite のクイズストアかどうかを拡張子で判定する
+    
+    Args:
+        path (str): クイズデータファイルのパス
+        
+    Returns:
+        bool: SQLite のクイズストアとして扱う場合はTrue
+    """
+    return path.lower().endswith(SQLITE_SUFFIXES)
+
+
+class LazyQuiz(Mapping):
+    """項目に初めてアクセスした時にデータベースから読み込むクイズ"""
+    
+    _KEYS = ("question", "options", "correct_answer", "tags")
+    
+    def __init__(self, store, quiz_id):
+        """
+        Args:
+            store (SQLiteQuizStore): 読み込み元のクイズストア
+            quiz_id (int): クイズの行ID
+        """
+        self.store = store
+        self.quiz_id = quiz_id
+        self._data = None
+    
+    def _load(self):
+        """
+        クイズの行を読み込む（内部メソッド）
+        """
+        if self._data is None:
+            self._data = self.store.load_quiz(self.quiz_id)
+        return self._data
+    
+    def __getitem__(self, key):
+        return self._load()[key]
+    
+    def __iter__(self):
+        return iter(self._KEYS)
+    
+    def __len__(self):
+        return len(self._KEYS)
+    
+    def __repr__(self):
+        return f"LazyQuiz({self.quiz_id})"
+
+
+class SQLiteQuizStore:
+    """SQLite に保存したクイズを出題するクラス"""
+    
+    def __init__(self, path):
+        """
+        クイズストアを開く（無ければ作成する）
+        
+        Args:
+            path (str): データベースファイルのパス
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+        
+        # (難易度, タグ) ごとの件数（必要になった時に索引から求める）
+        self._counts = {}
+    
+    def close(self):
+        """
+        データベースを閉じる
+        """
+        self.connection.close()
+    
+    def count(self, difficulty, tag=None):
+        """
+        指定した難易度（とタグ）のクイズの数を返す
+        
+        Args:
+            difficulty (str): 難易度 ("easy" または "hard")
+            tag (str): タグ、省略時はすべて
+            
+        Returns:
+            int: クイズの数
+        """
+        key = (difficulty, tag)
+        if key not in self._counts:
+            if tag is None:
+                row = self.connection.execute(
+                    "SELECT MAX(position) FROM quizzes WHERE difficulty = ?", (difficulty,)
+                ).fetchone()
+            else:
+                row = self.connection.execute(
+                    "SELECT MAX(position) FROM quiz_tags WHERE tag = ? AND difficulty = ?", (tag, difficulty)
+                ).fetchone()
+            self._counts[key] = 0 if row[0] is None else row[0] + 1
+        return self._counts[key]
+    
+    def get_random_quiz(self, difficulty, tag=None, rng=random):
+        """
+        指定された難易度（とタグ）のクイズをランダムに取得
+        
+        Args:
+            difficulty (str): 難易度 ("easy" または "hard")
+            tag (str): タグ、省略時はすべてのクイズから選ぶ
+            rng (random.Random): 乱数生成器
+            
+        Returns:
+            LazyQuiz: クイズデータ（項目は初めてアクセスした時に読み込む）、
+                      条件に合うクイズがない場合はNone
+        """
+        count = self.count(difficulty, tag)
+        if count == 0:
+            return None
+        
+        position = rng.randrange(count)
+        if tag is None:
+            row = self.connection.execute(
+                "SELECT id FROM quizzes WHERE difficulty = ? AND position = ?", (difficulty, position)
+            ).fetchone()
+        else:
+            row = self.connection.execute(
+                "SELECT quiz_id FROM quiz_tags WHERE tag = ? AND difficulty = ? AND position = ?",
+                (tag, difficulty, position)
+            ).fetchone()
+        return LazyQuiz(self, row[0]) if row else None
+    
+    def load_quiz(self, quiz_id):
+        """
+        クイズの行を辞書として読み込む
+        
+        Args:
+            quiz_id (int): クイズの行ID
+            
+        Returns:
+            dict: クイズデータ
+        """
+        question, options, correct_answer, tags = self.connection.execute(
+            "SELECT question, options, correct_answer, tags FROM quizzes WHERE id = ?", (quiz_id,)
+        ).fetchone()
+        return {
+            "question": question,
+            "options": json.loads(options),
+            "correct_answer": correct_answer,
+            "tags": json.loads(tags),
+        }
+    
+    def _insert(self, difficulty, question, options, correct_answer, tags):
+        """
+        クイズを1件挿入する（コミットは呼び出し側で行う内部メソッド）
+        """
+        tags = list(dict.fromkeys(tags))
+        position = self.count(difficulty)
+        cursor = self.connection.execute(
+            "INSERT INTO quizzes (difficulty, position, question, options, correct_answer, tags) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (difficulty, position, question, json.dumps(options, ensure_ascii=False), correct_answer,
+             json.dumps(tags, ensure_ascii=False))
+        )
+        self._counts[(difficulty, None)] = position + 1
+        
+        for tag in tags:
+            tag_position = self.count(difficulty, tag)
+            self.connection.execute(
+                "INSERT INTO quiz_tags (tag, difficulty, position, quiz_id) VALUES (?, ?, ?, ?)",
+                (tag, difficulty, tag_position, cursor.lastrowid)
+            )
+            self._counts[(difficulty, tag)] = tag_position + 1
+    
+    def add_quiz(self, difficulty, question, options, correct_answer, tags=()):
+        """
+        新しいクイズを追加
+        
+        Args:
+            difficulty (str): 難易度 ("easy" または "hard")
+            question (str): 問題文
+            options (list): 選択肢のリスト
+            correct_answer (int): 正解の選択肢のインデックス
+            tags (list): タグのリスト
+            
+        Returns:
+            bool: 追加に成功したかどうか
+        """
+        if difficulty not in DIFFICULTIES:
+            return False
+        with self.connection:
+            self._insert(difficulty, question, options, correct_answer, tags)
+        return True
+    
+    def add_quizzes(self, quizzes):
+        """
+        複数のクイズを1つのトランザクションで追加する
+        
+        Args:
+            quizzes (iterable): {"difficulty", "question", "options", "correct_answer", "tags"(任意)} の辞書
+            
+        Returns:
+            int: 追加したクイズの数（難易度が正しくないものは飛ばす）
+        """
+        added = 0
+        try:
+            with self.connection:
+                for quiz in quizzes:
+                    if quiz["difficulty"] not in DIFFICULTIES:
+                        continue
+                    self._insert(quiz["difficulty"], quiz["question"], quiz["options"],
+                                 quiz["correct_answer"], quiz.get("tags", ()))
+                    added += 1
+        except Exception:
+            # ロールバックされた分の件数を捨てる
+            self._counts = {}
+            raise
+        return added
+
+
+def import_json(json_path, store):
+    """
+    JSON のクイズデータをクイズストアに追加する
+    
+    Args:
+        json_path (str): {難易度: [クイズ, ...]} 形式の JSON ファイルのパス
+        store (SQLiteQuizStore): 追加先のクイズストア
+        
+    Returns:
+        int: 追加したクイズの数
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return store.add_quizzes(
+        dict(quiz, difficulty=difficulty) for difficulty, quizzes in data.items() for quiz in quizzes
+    )
+
+
+def main():
+    """JSON のクイズデータから SQLite のクイズストアを作成する"""
+    parser = argparse.ArgumentParser(description="Import quiz data into a SQLite quiz store")
+    parser.add_argument("source", help="JSON のクイズデータファイルのパス")
+    parser.add_argument("database", help="クイズストアのデータベースファイルのパス")
+    args = parser.parse_args()
+    
+    store = SQLiteQuizStore(args.database)
+    try:
+        added = import_json(args.source, store)
+        counts = ", ".join(f"{difficulty}={store.count(difficulty)}" for difficulty in DIFFICULTIES)
+    finally:
+        store.close()
+    print(f"{added} quizzes imported into {args.database} ({counts})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+期限付きの呼び出しをまとめて管理するスケジューラーのモジュール
+
+1つのスレッドがヒープで期限の近い順に予約を管理し、期限になったら
+コールバックを呼び出す。期限は time.monotonic で計るため、時刻の変更の
+影響を受けない。取り消しは予約に印を付けるだけの O(1) で、取り消された
+予約は期限に達した時か、ヒープの半分以上を占めた時にまとめて取り除く。
+クイズのタイマーがいくつあってもスレッドは1つで済む。
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+
+class ScheduledCall:
+    """スケジューラーに予約した呼び出し"""
+    
+    __slots__ = ("deadline", "callback", "cancelled", "scheduler")
+    
+    def __init__(self, deadline, callback, scheduler):
+        """
+        Args:
+            deadline (float): 呼び出す時刻（time.monotonic の値）
+            callback (function): 呼び出す関数（引数なし）
+            scheduler (DeadlineScheduler): 予約したスケジューラー
+        """
+        self.deadline = deadline
+        self.callback = callback
+        self.cancelled = False
+        self.scheduler = scheduler
+    
+    def cancel(self):
+        """
+        予約を取り消す（呼び出し済みの場合は何もしない）
+        """
+        self.scheduler.cancel(self)
+
+
+class DeadlineScheduler:
+    """1つのスレッドで期限付きの呼び出しを行うスケジューラー"""
+    
+    def __init__(self, name="quiz-scheduler"):
+        """
+        Args:
+            name (str): スケジューラーのスレッド名
+        """
+        self.name = name
+        self._heap = []
+        self._counter = itertools.count()
+        self._cancelled = 0
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+    
+    def __len__(self):
+        with self._condition:
+            return len(self._heap) - self._cancelled
+    
+    def schedule(self, delay, callback):
+        """
+        指定の秒数の後に関数を呼び出すように予約する
+        
+        コールバックはスケジューラーのスレッドから呼ばれるため、短い処理にすること。
+        
+        Args:
+            delay (float): 呼び出すまでの秒数
+            callback (function): 呼び出す関数（引数なし）
+            
+        Returns:
+            ScheduledCall: 予約（cancel で取り消せる）
+        """
+        call = ScheduledCall(time.monotonic() + delay, callback, self)
+        with self._condition:
+            if self._thread is None:
+                self._running = True
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            heapq.heappush(self._heap, (call.deadline, next(self._counter), call))
+            # 先頭が変わった場合は待ち時間を計算し直させる
+            if self._heap[0][2] is call:
+                self._condition.notify()
+        return call
+    
+    def cancel(self, call):
+        """
+        予約を取り消す
+        
+        ヒープからはすぐに取り除かず、取り消された予約が多くなった時にまとめて取り除く。
+        
+        Args:
+            call (ScheduledCall): schedule が返した予約
+        """
+        with self._condition:
+            if call.cancelled:
+                return
+            call.cancelled = True
+            self._cancelled += 1
+            if self._cancelled * 2 > len(self._heap):
+                self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
+    
+    def shutdown(self):
+        """
+        スケジューラーのスレッドを止める（予約は呼び出さずに破棄する）
+        """
+        with self._condition:
+            self._running = False
+            self._heap = []
+            self._cancelled = 0
+            self._condition.notify()
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+    
+    def _run(self):
+        """
+        期限になった予約を呼び出す（スケジューラーのスレッドで実行する内部メソッド）
+        """
+        while True:
+            with self._condition:
+                call = self._next_due()
+                if call is None:
+                    return
+            try:
+                call.callback()
+            except Exception as e:
+                print(f"Scheduled callback error: {e}")
+    
+    def _next_due(self):
+        """
+        次に期限になる予約を待って取り出す（ロックを持った状態で呼ぶ内部メソッド）
+        
+        Returns:
+            ScheduledCall: 期限になった予約、スケジューラーが止められた場合はNone
+        """
+        while self._running:
+            if not self._heap:
+                self._condition.wait()
+                continue
+            
+            deadline, _, call = self._heap[0]
+            if call.cancelled:
+                heapq.heappop(self._heap)
+                self._cancelled -= 1
+                continue
+            
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                self._condition.wait(remaining)
+                continue
+            
+            heapq.heappop(self._heap)
+            # 呼び出した予約は取り消されても数えない
+            call.cancelled = True
+            return call
+        return None
+
+
+# プロセスで共有するスケジューラー
+_default_scheduler = None
+_default_lock = threading.Lock()
+
+
+def get_scheduler():
+    """
+    プロセスで共有するスケジューラーを返す（最初の呼び出しで作成する）
+    
+    Returns:
+        DeadlineScheduler: 共有のスケジューラー
+    """
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = DeadlineScheduler()
+        return _default_scheduler
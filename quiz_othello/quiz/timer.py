@@ -5,23 +5,28 @@
 import time
 import threading
 
+from .scheduler import get_scheduler
+
 
 class Timer:
-    """タイマー機能を提供するクラス"""
+    """タイマー機能を提供するクラス（共有のスケジューラーで時間切れを通知する）"""
     
-    def __init__(self, duration, callback):
+    def __init__(self, duration, callback, scheduler=None):
         """
         タイマーを初期化
         
         Args:
             duration (int): タイマーの時間（秒）
             callback (function): タイムアップ時のコールバック関数
+            scheduler (DeadlineScheduler): 時間切れを通知するスケジューラー、省略時は共有のスケジューラー
         """
         self.duration = duration
         self.callback = callback
+        self.scheduler = scheduler
         self.start_time = None
         self.is_running = False
-        self.timer_thread = None
+        self._call = None
+        self._lock = threading.Lock()
     
     def start(self):
         """
@@ -30,37 +35,34 @@ class Timer:
         if self.is_running:
             return
         
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
         self.is_running = True
         
-        # 別スレッドでタイマーを実行
-        self.timer_thread = threading.Thread(target=self._run_timer)
-        self.timer_thread.daemon = True
-        self.timer_thread.start()
+        # 専用のスレッドは作らず、スケジューラーに期限を予約する
+        scheduler = self.scheduler or get_scheduler()
+        self._call = scheduler.schedule(self.duration, self._expire)
     
-    def _run_timer(self):
+    def _expire(self):
         """
-        タイマーを実行（内部メソッド）
+        時間切れを処理する（スケジューラーのスレッドから呼ばれる内部メソッド）
         """
-        while self.is_running:
-            elapsed = time.time() - self.start_time
-            
-            if elapsed >= self.duration:
-                self.is_running = False
-                if self.callback:
-                    self.callback()
-                break
-            
-            # CPUの負荷を減らすために少し待機
-            time.sleep(0.1)
+        with self._lock:
+            if not self.is_running:
+                return
+            self.is_running = False
+        
+        if self.callback:
+            self.callback()
     
     def stop(self):
         """
-        タイマーを停止
+        タイマーを停止（予約を取り消すだけで、呼び出し元を待たせない）
         """
-        self.is_running = False
-        if self.timer_thread and self.timer_thread.is_alive():
-            self.timer_thread.join(0.5)
+        with self._lock:
+            self.is_running = False
+        if self._call is not None:
+            self._call.cancel()
+            self._call = None
     
     def get_remaining_time(self):
         """
@@ -72,6 +74,6 @@ class Timer:
         if not self.is_running or self.start_time is None:
             return 0
         
-        elapsed = time.time() - self.start_time
+        elapsed = time.monotonic() - self.start_time
         remaining = max(0, self.duration - elapsed)
         return remaining
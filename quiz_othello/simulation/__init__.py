@@ -0,0 +1,4 @@
+"""
+simulation パッケージ
+画面を使わずに自己対戦を行うモジュール群
+"""
@@ -0,0 +1,270 @@
+"""
+自己対戦で使う手の選び方（ポリシー）を提供するモジュール
+
+ポリシーは "名前" または "名前:引数" の文字列で指定する。
+    random        合法手から一様に選び、一定の確率でアタックチャンスを使う
+    random:0.2    アタックチャンスを使う確率を指定
+    greedy        反転する石が最も多い手を選ぶ
+    search:3      探索エンジンで指定の深さまで読む（時間制限なし）
+"""
+
+from game.player import Player
+from game.constants import ACTION_MOVE, ACTION_ATTACK, BOARD_SIZE
+from game.bitboard import popcount, flips, iter_squares
+from quiz.quiz_manager import QuizManager
+from ai.actions import decode_action
+from ai.search import SearchEngine, DEFAULT_SUCCESS_RATES, DEFAULT_INITIAL_ATTACK_CHANCES
+
+
+def _expected_attack_gain(board, player_id, attack_chances, success_rates,
+                          initial_attack_chances=DEFAULT_INITIAL_ATTACK_CHANCES):
+    """
+    アタックチャンスで最も多く石を得られる対象と、その期待値を返す（内部関数）
+    
+    Returns:
+        tuple: (期待される獲得石数, (row, col))、対象が無い場合は (0.0, None)
+    """
+    player_bits = board.bitboards[player_id]
+    opponent_bits = board.bitboards[1 - player_id]
+    difficulty = QuizManager.get_difficulty_for_remaining_chances(
+        attack_chances[player_id], initial_attack_chances[player_id]
+    )
+    probability = success_rates[difficulty]
+    
+    best_gain = 0
+    best_target = None
+    for row, col in iter_squares(opponent_bits):
+        target_bit = 1 << (row * BOARD_SIZE + col)
+        gain = 1 + popcount(flips(target_bit, player_bits | target_bit, opponent_bits & ~target_bit))
+        if gain > best_gain:
+            best_gain = gain
+            best_target = (row, col)
+    
+    return probability * best_gain, best_target
+
+
+class RandomPolicy:
+    """合法手から一様に選ぶポリシー"""
+    
+    def __init__(self, attack_probability=0.1):
+        """
+        Args:
+            attack_probability (float): アタックチャンスを使う確率
+        """
+        self.attack_probability = float(attack_probability)
+    
+    def choose_action(self, board, player_id, attack_chances, rng):
+        """
+        次の行動を選ぶ
+        
+        Args:
+            board (Board): 盤面
+            player_id (int): 手番のプレイヤーID
+            attack_chances (tuple): (黒の残り回数, 白の残り回数)
+            rng (random.Random): 乱数生成器
+            
+        Returns:
+            tuple: (ACTION_MOVE または ACTION_ATTACK, row, col)、行動が無い場合はNone
+        """
+        moves = board.get_valid_moves(player_id)
+        if not moves:
+            return None
+        
+        if attack_chances[player_id] > 0 and rng.random() < self.attack_probability:
+            targets = board.get_opponent_stones(player_id)
+            if targets:
+                return (ACTION_ATTACK,) + rng.choice(targets)
+        
+        return (ACTION_MOVE,) + rng.choice(moves)
+
+
+class GreedyPolicy:
+    """反転する石が最も多い手を選ぶポリシー"""
+    
+    def __init__(self, success_rates=None):
+        """
+        Args:
+            success_rates (dict): アタックチャンスの損得の判断に使う難易度ごとの成功確率
+        """
+        self.success_rates = dict(success_rates or DEFAULT_SUCCESS_RATES)
+        self.initial_attack_chances = DEFAULT_INITIAL_ATTACK_CHANCES
+    
+    def set_initial_attack_chances(self, initial_attack_chances):
+        """
+        アタックチャンスの初期回数を設定する（成功確率の難易度の判定に使う）
+        
+        Args:
+            initial_attack_chances (tuple): (黒の初期回数, 白の初期回数)
+        """
+        self.initial_attack_chances = tuple(initial_attack_chances)
+    
+    def choose_action(self, board, player_id, attack_chances, rng):
+        """
+        次の行動を選ぶ（同数の手は乱数で選ぶ）
+        
+        期待される獲得石数が最善の手を上回る場合はアタックチャンスを使う。
+        
+        Args:
+            board (Board): 盤面
+            player_id (int): 手番のプレイヤーID
+            attack_chances (tuple): (黒の残り回数, 白の残り回数)
+            rng (random.Random): 乱数生成器
+            
+        Returns:
+            tuple: (ACTION_MOVE または ACTION_ATTACK, row, col)、行動が無い場合はNone
+        """
+        mask = board.get_valid_moves_mask(player_id)
+        if not mask:
+            return None
+        
+        player_bits = board.bitboards[player_id]
+        opponent_bits = board.bitboards[1 - player_id]
+        best_gain = -1
+        best_moves = []
+        for row, col in iter_squares(mask):
+            gain = 1 + popcount(flips(1 << (row * BOARD_SIZE + col), player_bits, opponent_bits))
+            if gain > best_gain:
+                best_gain = gain
+                best_moves = [(row, col)]
+            elif gain == best_gain:
+                best_moves.append((row, col))
+        
+        if attack_chances[player_id] > 0:
+            attack_gain, target = _expected_attack_gain(
+                board, player_id, attack_chances, self.success_rates, self.initial_attack_chances
+            )
+            if target is not None and attack_gain > best_gain:
+                return (ACTION_ATTACK,) + target
+        
+        return (ACTION_MOVE,) + rng.choice(best_moves)
+
+
+class SearchPolicy:
+    """探索エンジンで指定の深さまで読むポリシー"""
+    
+    def __init__(self, depth=2, success_rates=None):
+        """
+        Args:
+            depth (int): 探索の深さ
+            success_rates (dict): 探索で使う難易度ごとのアタックチャンス成功確率
+        """
+        self.engine = SearchEngine(
+            time_limit=float("inf"), max_depth=int(depth), tt_bucket_bits=14, success_rates=success_rates
+        )
+    
+    def set_initial_attack_chances(self, initial_attack_chances):
+        """
+        アタックチャンスの初期回数を設定する（成功確率の難易度の判定に使う）
+        
+        Args:
+            initial_attack_chances (tuple): (黒の初期回数, 白の初期回数)
+        """
+        self.engine.set_initial_attack_chances(initial_attack_chances)
+    
+    def choose_action(self, board, player_id, attack_chances, rng):
+        """
+        次の行動を選ぶ（探索結果は乱数に依存しない）
+        
+        Args:
+            board (Board): 盤面
+            player_id (int): 手番のプレイヤーID
+            attack_chances (tuple): (黒の残り回数, 白の残り回数)
+            rng (random.Random): 乱数生成器（使わない）
+            
+        Returns:
+            tuple: (ACTION_MOVE または ACTION_ATTACK, row, col)、行動が無い場合はNone
+        """
+        if not board.get_valid_moves_mask(player_id):
+            return None
+        action = self.engine.search(board, player_id, attack_chances)["action"]
+        if action is None:
+            return None
+        return decode_action(action)
+
+
+# 名前とポリシーのクラスの対応
+POLICY_TYPES = {
+    "random": RandomPolicy,
+    "greedy": GreedyPolicy,
+    "search": SearchPolicy,
+}
+
+
+def create_policy(spec, success_rates=None):
+    """
+    文字列の指定からポリシーを作成する
+    
+    Args:
+        spec (str): "名前" または "名前:引数"（例: "search:3"）
+        success_rates (dict): greedy と search に渡す難易度ごとのアタックチャンス成功確率
+        
+    Returns:
+        object: ポリシー
+        
+    Raises:
+        ValueError: 未知のポリシー名の場合
+    """
+    name, _, argument = spec.partition(":")
+    if name not in POLICY_TYPES:
+        raise ValueError(f"unknown policy: {name} (choose from {', '.join(POLICY_TYPES)})")
+    
+    args = [argument] if argument else []
+    if name == "random":
+        return RandomPolicy(*args)
+    return POLICY_TYPES[name](*args, success_rates=success_rates)
+
+
+class PolicyPlayer(Player):
+    """ポリシーで手を選び、回答モデルでクイズに答えるプレイヤークラス"""
+    
+    is_ai = True
+    
+    def __init__(self, player_id, name, policy, quiz_model, rng):
+        """
+        Args:
+            player_id (int): プレイヤーID（0:黒, 1:白）
+            name (str): プレイヤー名
+            policy (object): 手の選び方
+            quiz_model (QuizModel): クイズの回答モデル
+            rng (random.Random): ポリシーに渡す乱数生成器
+        """
+        super().__init__(player_id, name)
+        self.policy = policy
+        self.quiz_model = quiz_model
+        self.random = rng
+    
+    def choose_action(self, board, attack_chances):
+        """
+        次の行動を選ぶ
+        
+        Args:
+            board (Board): 盤面
+            attack_chances (tuple): (黒の残り回数, 白の残り回数)
+            
+        Returns:
+            tuple: (ACTION_MOVE または ACTION_ATTACK, row, col)、行動が無い場合はNone
+        """
+        return self.policy.choose_action(board, self.player_id, attack_chances, self.random)
+    
+    def on_game_start(self, initial_attack_chances):
+        """
+        ゲーム開始時にアタックチャンスの初期回数をポリシーに設定する
+        
+        Args:
+            initial_attack_chances (tuple): (黒の初期回数, 白の初期回数)
+        """
+        if hasattr(self.policy, "set_initial_attack_chances"):
+            self.policy.set_initial_attack_chances(initial_attack_chances)
+    
+    def answer_quiz(self, quiz, difficulty):
+        """
+        クイズに回答する
+        
+        Args:
+            quiz (dict): クイズデータ
+            difficulty (str): 難易度 ("easy" または "hard")
+            
+        Returns:
+            int: 選択した回答のインデックス
+        """
+        return self.quiz_model.answer(quiz, difficulty)
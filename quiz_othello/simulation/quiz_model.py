@@ -0,0 +1,85 @@
+"""
+自己対戦用のクイズの出題と回答を提供するモジュール
+
+実時間のタイマーを使わずにクイズを出題し、回答はシード付きの乱数で
+難易度ごとの正解率に従って決める。
+"""
+
+import random
+
+from game.constants import DIFFICULTY_EASY, DIFFICULTY_HARD
+from quiz.quiz_manager import QuizManager
+
+# クイズデータを使わない場合に出題するクイズ
+SIMULATED_QUIZZES = {
+    DIFFICULTY_EASY: {
+        "question": "simulated easy quiz",
+        "options": ["A", "B", "C", "D"],
+        "correct_answer": 0,
+    },
+    DIFFICULTY_HARD: {
+        "question": "simulated hard quiz",
+        "options": ["A", "B", "C", "D"],
+        "correct_answer": 0,
+    },
+}
+
+
+class SimulatedQuizManager(QuizManager):
+    """タイマーを使わずにクイズを出題するクイズマネージャー"""
+    
+    def __init__(self, quiz_data=None):
+        """
+        自己対戦用のクイズマネージャーを初期化
+        
+        Args:
+            quiz_data (QuizData): クイズデータオブジェクト、省略時は SIMULATED_QUIZZES を出題
+        """
+        super().__init__(quiz_data)
+    
+    def start_quiz(self, difficulty, time_up_callback=None):
+        """
+        指定された難易度のクイズを出題する（タイマーは開始しない）
+        
+        Args:
+            difficulty (str): 難易度 ("easy" または "hard")
+            time_up_callback (function): 時間切れ時のコールバック関数（呼び出されない）
+            
+        Returns:
+            dict: 出題するクイズデータ、または出題できない場合はNone
+        """
+        if self.quiz_data is not None:
+            self.current_quiz = self.quiz_data.get_random_quiz(difficulty)
+        else:
+            self.current_quiz = SIMULATED_QUIZZES.get(difficulty)
+        
+        self.time_up_callback = time_up_callback
+        return self.current_quiz
+
+
+class QuizModel:
+    """難易度ごとの正解率でクイズに回答するクラス"""
+    
+    def __init__(self, accuracy, seed=None):
+        """
+        回答モデルを初期化
+        
+        Args:
+            accuracy (dict): 難易度ごとの正解率
+            seed (int): 乱数のシード
+        """
+        self.accuracy = dict(accuracy)
+        self.random = random.Random(seed)
+    
+    def answer(self, quiz, difficulty):
+        """
+        クイズに回答する
+        
+        Args:
+            quiz (dict): クイズデータ
+            difficulty (str): 難易度 ("easy" または "hard")
+            
+        Returns:
+            int: 選択した回答のインデックス
+        """
+        return QuizManager.answer_with_accuracy(quiz, self.accuracy.get(difficulty, 0.0), self.random)
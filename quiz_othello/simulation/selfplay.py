@@ -0,0 +1,319 @@
+"""
+画面を使わずに自己対戦を行うモジュール
+
+GameManager をそのまま使って対局を進め、クイズの回答はシード付きの
+回答モデルで決める（実時間のタイマーは動かない）。対局はチャンク単位で
+ワーカープロセスに分配し、1局ごとの結果を JSON Lines 形式でファイルに
+書き出す。棋譜ファイル（game.record 形式）を同時に書き出すこともできる。
+
+アタックチャンスの回数による勝率の変化は、例えば次の2つの実行結果を
+比較して調べる：
+    python -m simulation.selfplay --games 100000 --attack-chances 2 2 --output with.jsonl
+    python -m simulation.selfplay --games 100000 --attack-chances 0 2 --output without.jsonl
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from game.game_manager import GameManager
+from game.record import GameRecordWriter
+from game.constants import BLACK, WHITE, STATE_ATTACK_CHANCE, STATE_GAME_OVER, INITIAL_ATTACK_CHANCES
+from ai.search import DEFAULT_SUCCESS_RATES
+from .quiz_model import SimulatedQuizManager, QuizModel
+from .policies import PolicyPlayer, create_policy
+
+# 1つのタスクで続けて行う対局数の既定値
+DEFAULT_CHUNK_SIZE = 100
+
+# ワーカーごとに同時に投入しておくタスク数
+_TASKS_PER_WORKER = 2
+
+
+def _game_seed(seed, index):
+    """
+    対局ごとの乱数のシードを返す（内部関数）
+    """
+    return (seed << 32) ^ index
+
+
+def play_game(index, config, policies=None, record=False):
+    """
+    1局を最後まで進めて結果を返す
+    
+    Args:
+        index (int): 対局番号（乱数のシードに使う）
+        config (dict): 対局の設定
+            black (str): 黒のポリシー
+            white (str): 白のポリシー
+            attack_chances (tuple): (黒の初期回数, 白の初期回数)
+            accuracy (tuple): (黒の正解率, 白の正解率)、それぞれ難易度ごとの dict
+            seed (int): 乱数のシード
+        policies (tuple): 作成済みのポリシー (黒, 白)、省略時は config から作成
+        record (bool): 棋譜を記録するかどうか
+        
+    Returns:
+        dict: 対局結果
+            game (int): 対局番号
+            winner (int): 勝者のプレイヤーID、引き分けの場合は-1
+            black_stones (int): 黒の石の数
+            white_stones (int): 白の石の数
+            actions (int): 行動の数（着手とアタックチャンスの宣言）
+            attacks (list): プレイヤーごとの [使用回数, 成功回数]
+            record (bytes): 棋譜のフレーム（record が True の場合のみ）
+    """
+    rng = random.Random(_game_seed(config["seed"], index))
+    if policies is None:
+        policies = _create_policies(config)
+    
+    players = []
+    for player_id, name in ((BLACK, "black"), (WHITE, "white")):
+        quiz_model = QuizModel(config["accuracy"][player_id], rng.getrandbits(64))
+        player = PolicyPlayer(player_id, name, policies[player_id], quiz_model,
+                              random.Random(rng.getrandbits(64)))
+        players.append(player)
+    
+    game_manager = GameManager(SimulatedQuizManager())
+    record_stream = None
+    if record:
+        record_stream = io.BytesIO()
+        game_manager.set_record_writer(GameRecordWriter(record_stream))
+    game_manager.start_game(players=players, attack_chances=config["attack_chances"])
+    
+    actions = 0
+    attacks = [[0, 0], [0, 0]]
+    while game_manager.state != STATE_GAME_OVER:
+        player = game_manager.get_current_player()
+        
+        if game_manager.state == STATE_ATTACK_CHANCE:
+            quiz = game_manager.get_current_quiz()
+            answer = player.answer_quiz(quiz, game_manager.attack_difficulty)
+            attacks[player.player_id][0] += 1
+            if game_manager.answer_quiz(answer):
+                attacks[player.player_id][1] += 1
+            continue
+        
+        if not game_manager.play_ai_turn():
+            raise RuntimeError(f"game {index}: {player.name} could not act")
+        actions += 1
+    
+    black_stones, white_stones = game_manager.board.count_stones()
+    result = {
+        "game": index,
+        "winner": game_manager.get_winner(),
+        "black_stones": black_stones,
+        "white_stones": white_stones,
+        "actions": actions,
+        "attacks": attacks,
+    }
+    if record_stream is not None:
+        result["record"] = record_stream.getvalue()
+    return result
+
+
+def _create_policies(config):
+    """
+    設定から黒と白のポリシーを作成する（内部関数）
+    """
+    return tuple(
+        create_policy(config[side], config["accuracy"][player_id])
+        for player_id, side in ((BLACK, "black"), (WHITE, "white"))
+    )
+
+
+def _play_chunk(start, count, config, record=False):
+    """
+    連続した対局番号の対局をまとめて行う（内部関数）
+    
+    ポリシーはチャンク内で使い回す。
+    
+    Returns:
+        list: 対局結果のリスト
+    """
+    policies = _create_policies(config)
+    return [play_game(index, config, policies, record) for index in range(start, start + count)]
+
+
+class SelfPlaySummary:
+    """対局結果を集計するクラス"""
+    
+    def __init__(self):
+        self.games = 0
+        self.wins = [0, 0]
+        self.draws = 0
+        self.disc_difference = 0
+        self.attacks_used = [0, 0]
+        self.attacks_succeeded = [0, 0]
+    
+    def add(self, result):
+        """
+        対局結果を1つ加える
+        
+        Args:
+            result (dict): play_game の結果
+        """
+        self.games += 1
+        if result["winner"] in (BLACK, WHITE):
+            self.wins[result["winner"]] += 1
+        else:
+            self.draws += 1
+        self.disc_difference += result["black_stones"] - result["white_stones"]
+        for player_id in (BLACK, WHITE):
+            used, succeeded = result["attacks"][player_id]
+            self.attacks_used[player_id] += used
+            self.attacks_succeeded[player_id] += succeeded
+    
+    def to_dict(self):
+        """
+        集計結果を返す
+        
+        Returns:
+            dict: 対局数、勝率、平均石差（黒 - 白）、アタックチャンスの使用回数と成功回数
+        """
+        games = self.games or 1
+        return {
+            "games": self.games,
+            "black_win_rate": self.wins[BLACK] / games,
+            "white_win_rate": self.wins[WHITE] / games,
+            "draw_rate": self.draws / games,
+            "mean_disc_difference": self.disc_difference / games,
+            "attacks_used": list(self.attacks_used),
+            "attacks_succeeded": list(self.attacks_succeeded),
+        }
+
+
+def _chunks(games, chunk_size):
+    """
+    (開始番号, 対局数) の組を順に返す（内部関数）
+    """
+    for start in range(0, games, chunk_size):
+        yield start, min(chunk_size, games - start)
+
+
+def run_selfplay(games, config, output_path, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, progress=None,
+                 record_path=None):
+    """
+    自己対戦を行い、結果をファイルに書き出す
+    
+    対局結果は終わったチャンクから順に書き出すため、対局番号の順にはならない。
+    投入済みのタスクはワーカー数に比例した数に抑え、対局数が多くても
+    メモリ使用量が増えないようにする。
+    
+    Args:
+        games (int): 対局数
+        config (dict): 対局の設定（play_game 参照）
+        output_path (str): 結果を書き出す JSON Lines ファイルのパス
+        workers (int): ワーカープロセス数、省略時はCPUコア数（1の場合は同じプロセスで行う）
+        chunk_size (int): 1つのタスクで行う対局数
+        progress (function): チャンクが終わるたびに呼ばれる関数（引数は終わった対局数）
+        record_path (str): 棋譜を追記するファイルのパス、省略時は記録しない
+        
+    Returns:
+        dict: SelfPlaySummary.to_dict の集計結果
+    """
+    workers = workers or os.cpu_count() or 1
+    summary = SelfPlaySummary()
+    record = record_path is not None
+    record_writer = GameRecordWriter.open(record_path) if record else None
+    
+    try:
+        with open(output_path, "w", encoding="utf-8") as f:
+            def write(results):
+                for result in results:
+                    frame = result.pop("record", None)
+                    if frame is not None:
+                        record_writer.write_frame(frame)
+                    f.write(json.dumps(result, separators=(",", ":")) + "\n")
+                    summary.add(result)
+                f.flush()
+                if progress:
+                    progress(summary.games)
+            
+            if workers == 1:
+                for start, count in _chunks(games, chunk_size):
+                    write(_play_chunk(start, count, config, record))
+                return summary.to_dict()
+            
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunks = _chunks(games, chunk_size)
+                pending = set()
+                for start, count in chunks:
+                    pending.add(pool.submit(_play_chunk, start, count, config, record))
+                    if len(pending) >= workers * _TASKS_PER_WORKER:
+                        break
+                
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        write(future.result())
+                        next_chunk = next(chunks, None)
+                        if next_chunk is not None:
+                            pending.add(pool.submit(_play_chunk, *next_chunk, config, record))
+    finally:
+        if record_writer:
+            record_writer.close()
+    
+    return summary.to_dict()
+
+
+def _parse_accuracy(text):
+    """
+    "easy=0.8,hard=0.5" 形式の正解率を解析する（内部関数）
+    """
+    accuracy = dict(DEFAULT_SUCCESS_RATES)
+    for item in text.split(","):
+        difficulty, _, value = item.partition("=")
+        if difficulty not in accuracy:
+            raise argparse.ArgumentTypeError(f"unknown difficulty: {difficulty}")
+        accuracy[difficulty] = float(value)
+    return accuracy
+
+
+def main():
+    """コマンドラインから自己対戦を行う"""
+    parser = argparse.ArgumentParser(description="Headless Quiz Othello self-play")
+    parser.add_argument("--games", type=int, default=1000, help="対局数")
+    parser.add_argument("--black", default="greedy", help="黒のポリシー（random, greedy, search:深さ）")
+    parser.add_argument("--white", default="greedy", help="白のポリシー（random, greedy, search:深さ）")
+    parser.add_argument("--attack-chances", type=int, nargs=2, metavar=("BLACK", "WHITE"),
+                        default=(INITIAL_ATTACK_CHANCES, INITIAL_ATTACK_CHANCES),
+                        help="アタックチャンスの初期回数")
+    parser.add_argument("--black-accuracy", type=_parse_accuracy, default=dict(DEFAULT_SUCCESS_RATES),
+                        help="黒のクイズ正解率（例: easy=0.8,hard=0.5）")
+    parser.add_argument("--white-accuracy", type=_parse_accuracy, default=dict(DEFAULT_SUCCESS_RATES),
+                        help="白のクイズ正解率（例: easy=0.8,hard=0.5）")
+    parser.add_argument("--seed", type=int, default=0, help="乱数のシード")
+    parser.add_argument("--workers", type=int, default=None, help="ワーカープロセス数")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="1タスクの対局数")
+    parser.add_argument("--output", default="selfplay.jsonl", help="結果の出力先（JSON Lines）")
+    parser.add_argument("--record", help="棋譜を追記するファイルのパス")
+    args = parser.parse_args()
+    
+    config = {
+        "black": args.black,
+        "white": args.white,
+        "attack_chances": tuple(args.attack_chances),
+        "accuracy": (args.black_accuracy, args.white_accuracy),
+        "seed": args.seed,
+    }
+    # ポリシーの指定を先に確認する
+    _create_policies(config)
+    
+    start_time = time.perf_counter()
+    
+    def progress(finished):
+        elapsed = time.perf_counter() - start_time
+        print(f"\r{finished}/{args.games} games ({finished / elapsed:.0f} games/s)", end="", file=sys.stderr)
+    
+    summary = run_selfplay(args.games, config, args.output, args.workers, args.chunk_size, progress, args.record)
+    print(file=sys.stderr)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
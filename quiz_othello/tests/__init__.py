@@ -0,0 +1,4 @@
+"""
+テストパッケージ
+quiz_othello のテストを提供します
+"""
@@ -0,0 +1,90 @@
+"""
+アタックチャンスが残っている局面の完全読みを、枝刈りしない期待値の計算と比べる回帰テスト
+
+quiz_othello ディレクトリで実行する：
+    python -m pytest tests
+"""
+
+import random
+
+import pytest
+
+from game.board import Board
+from game.bitboard import legal_moves, flips, popcount
+from ai.endgame import EndgameSolver, count_empties
+
+# 比べる局面の空きマス数とアタックチャンスの残り回数
+CASES = [
+    (empties, chances, seed)
+    for empties in (2, 3)
+    for chances in ((1, 0), (0, 1), (1, 1), (2, 0))
+    for seed in range(3)
+]
+
+
+def random_position(empties, seed):
+    """
+    初期配置からランダムに打ち進めて、指定の空きマス数で手番側が打てる局面を作る
+    """
+    rng = random.Random(seed)
+    while True:
+        board = Board()
+        side = 0
+        while count_empties(board) > empties:
+            moves = board.get_valid_moves(side)
+            if not moves:
+                side = 1 - side
+                if not board.get_valid_moves(side):
+                    break
+                continue
+            row, col = rng.choice(moves)
+            board.place_stone(row, col, side)
+            side = 1 - side
+        if count_empties(board) == empties and board.get_valid_moves(side):
+            return board, side
+
+
+def expectimax(solver, p, o, cp, co, side):
+    """
+    すべての行動とアタックチャンスの結果を枝刈りせずにたどり、手番側から見た石差の期待値を求める
+    """
+    moves = legal_moves(p, o)
+    if not moves:
+        if not legal_moves(o, p):
+            return popcount(p) - popcount(o)
+        return -expectimax(solver, o, p, co, cp, 1 - side)
+    
+    values = []
+    while moves:
+        square_bit = moves & -moves
+        moves ^= square_bit
+        flipped = flips(square_bit, p, o)
+        values.append(-expectimax(solver, o & ~flipped, p | flipped | square_bit, co, cp, 1 - side))
+    
+    if cp > 0:
+        probability = solver.success_probabilities[side][cp]
+        failure = -expectimax(solver, o, p, co, cp - 1, 1 - side)
+        targets = o
+        while targets:
+            target_bit = targets & -targets
+            targets ^= target_bit
+            attacked_p = p | target_bit
+            attacked_o = o & ~target_bit
+            flipped = flips(target_bit, attacked_p, attacked_o)
+            success = -expectimax(solver, attacked_o & ~flipped, attacked_p | flipped, co, cp - 1, 1 - side)
+            values.append(probability * success + (1.0 - probability) * failure)
+    return max(values)
+
+
+@pytest.mark.parametrize("empties, chances, seed", CASES)
+def test_solve_matches_expectimax(empties, chances, seed):
+    board, side = random_position(empties, seed)
+    solver = EndgameSolver()
+    result = solver.solve(board, side, chances)
+    
+    expected = expectimax(solver, board.bitboards[side], board.bitboards[1 - side],
+                          chances[side], chances[1 - side], side)
+    assert result["side_score"] == pytest.approx(expected)
+    
+    # 置換表が残った状態でもう1度読んでも同じ値になる
+    assert solver.solve(board, side, chances)["side_score"] == pytest.approx(expected)
@@ -0,0 +1,146 @@
+"""
+クイズのジャーナルの再生と、中断した圧縮からの回復を確かめる回帰テスト
+
+quiz_othello ディレクトリで実行する：
+    python -m pytest tests
+"""
+
+import json
+import os
+
+import pytest
+
+from quiz.journal import QuizJournal
+from quiz.quiz_data import QuizData
+
+INITIAL_QUIZZES = {
+    "easy": [{"question": "easy 0", "options": ["A", "B"], "correct_answer": 0}],
+    "hard": [{"question": "hard 0", "options": ["A", "B"], "correct_answer": 1}],
+}
+
+# 内容が同じクイズ（重複とみなして捨ててはいけない）
+DUPLICATE = {"question": "same", "options": ["A", "B"], "correct_answer": 0}
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = str(tmp_path / "quiz_data.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(INITIAL_QUIZZES, f)
+    return path
+
+
+def fail_replacing(data_file, monkeypatch):
+    """
+    データファイルの os.replace だけを失敗させる（ジャーナルの凍結はそのまま行う）
+    """
+    replace = os.replace
+    
+    def replace_except_data_file(src, dst):
+        if dst == data_file:
+            raise OSError("interrupted")
+        replace(src, dst)
+    monkeypatch.setattr(os, "replace", replace_except_data_file)
+
+
+def questions(quiz_data, difficulty):
+    return [quiz["question"] for quiz in quiz_data.quizzes[difficulty]]
+
+
+def add_duplicates(quiz_data):
+    quiz_data.add_quiz("easy", DUPLICATE["question"], DUPLICATE["options"], DUPLICATE["correct_answer"])
+    quiz_data.add_quiz("easy", DUPLICATE["question"], DUPLICATE["options"], DUPLICATE["correct_answer"])
+
+
+def test_journal_is_replayed_on_load(data_file):
+    quiz_data = QuizData(data_file)
+    add_duplicates(quiz_data)
+    quiz_data.add_quiz("hard", "hard 1", ["A", "B"], 0, tags=["math"])
+    
+    reloaded = QuizData(data_file)
+    assert questions(reloaded, "easy") == ["easy 0", "same", "same"]
+    assert questions(reloaded, "hard") == ["hard 0", "hard 1"]
+    assert reloaded.quizzes["hard"][1]["tags"] == ["math"]
+    assert reloaded.journal_entries == 3
+
+
+def test_save_compacts_journal(data_file):
+    quiz_data = QuizData(data_file)
+    add_duplicates(quiz_data)
+    quiz_data.save_quiz_data()
+    
+    journal = QuizJournal(data_file)
+    assert not os.path.exists(journal.path)
+    assert not os.path.exists(journal.frozen_path)
+    
+    reloaded = QuizData(data_file)
+    assert questions(reloaded, "easy") == ["easy 0", "same", "same"]
+    assert reloaded.journal_entries == 0
+
+
+def test_interrupted_before_replacing_data_file(data_file, monkeypatch):
+    quiz_data = QuizData(data_file)
+    add_duplicates(quiz_data)
+    
+    # データファイルを置き換える前に止まった場合は、凍結したジャーナルが残る
+    fail_replacing(data_file, monkeypatch)
+    quiz_data.save_quiz_data()
+    monkeypatch.undo()
+    
+    # 圧縮中に追加したクイズは新しいジャーナルに書かれる
+    quiz_data.add_quiz("easy", "after freeze", ["A", "B"], 1)
+    journal = QuizJournal(data_file)
+    assert os.path.exists(journal.frozen_path)
+    
+    reloaded = QuizData(data_file)
+    assert questions(reloaded, "easy") == ["easy 0", "same", "same", "after freeze"]
+    assert reloaded.journal_entries == 3
+
+
+def test_interrupted_after_replacing_data_file(data_file, monkeypatch):
+    quiz_data = QuizData(data_file)
+    add_duplicates(quiz_data)
+    
+    # データファイルを置き換えた後、凍結したジャーナルを削除する前に止まった場合
+    monkeypatch.setattr(QuizJournal, "discard_frozen", lambda self: None)
+    quiz_data.save_quiz_data()
+    monkeypatch.undo()
+    
+    quiz_data.add_quiz("easy", "after freeze", ["A", "B"], 1)
+    journal = QuizJournal(data_file)
+    assert os.path.exists(journal.frozen_path)
+    
+    # まとめ終わった記録は再生せず、内容が同じクイズも両方残す
+    reloaded = QuizData(data_file)
+    assert questions(reloaded, "easy") == ["easy 0", "same", "same", "after freeze"]
+    assert reloaded.journal_entries == 1
+    assert not os.path.exists(journal.frozen_path)
+
+
+def test_repeated_interruptions_keep_every_entry(data_file, monkeypatch):
+    quiz_data = QuizData(data_file)
+    add_duplicates(quiz_data)
+    
+    fail_replacing(data_file, monkeypatch)
+    quiz_data.save_quiz_data()
+    quiz_data.add_quiz("easy", "between", ["A", "B"], 1)
+    
+    # 凍結したジャーナルが残っている間にもう1度凍結すると、後ろに続ける
+    quiz_data.save_quiz_data()
+    monkeypatch.undo()
+    
+    reloaded = QuizData(data_file)
+    assert questions(reloaded, "easy") == ["easy 0", "same", "same", "between"]
+    
+    reloaded.save_quiz_data()
+    assert questions(QuizData(data_file), "easy") == ["easy 0", "same", "same", "between"]
+
+
+def test_truncated_last_line_is_skipped(data_file):
+    quiz_data = QuizData(data_file)
+    quiz_data.add_quiz("easy", "complete", ["A", "B"], 0)
+    with open(QuizJournal(data_file).path, "a", encoding="utf-8") as f:
+        f.write('{"question": "trunc')
+    
+    reloaded = QuizData(data_file)
+    assert questions(reloaded, "easy") == ["easy 0", "complete"]
@@ -0,0 +1,38 @@
+"""
+perft の局面数を既知の値と比べる回帰テスト
+
+quiz_othello ディレクトリで実行する：
+    python -m pytest tests
+"""
+
+import pytest
+
+from game.constants import BLACK, INITIAL_ATTACK_CHANCES
+from game.perft import BACKENDS, KNOWN_COUNTS, KNOWN_ATTACK_COUNTS, perft
+
+# テストする最大の深さ（アタックチャンスなし、あり）
+MAX_DEPTH = 5
+MAX_ATTACK_DEPTH = 3
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+@pytest.mark.parametrize("depth", range(MAX_DEPTH + 1))
+def test_perft_counts(backend, depth):
+    board = BACKENDS[backend]()
+    assert perft(board, BLACK, depth) == KNOWN_COUNTS[depth]
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+@pytest.mark.parametrize("depth", range(MAX_ATTACK_DEPTH + 1))
+def test_perft_attack_counts(backend, depth):
+    board = BACKENDS[backend]()
+    attack_chances = (INITIAL_ATTACK_CHANCES, INITIAL_ATTACK_CHANCES)
+    assert perft(board, BLACK, depth, attack_chances) == KNOWN_ATTACK_COUNTS[depth]
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+def test_perft_restores_board(backend):
+    board = BACKENDS[backend]()
+    before = [row[:] for row in board.grid]
+    perft(board, BLACK, MAX_ATTACK_DEPTH, (INITIAL_ATTACK_CHANCES, INITIAL_ATTACK_CHANCES))
+    assert board.grid == before
@@ -0,0 +1,118 @@
+"""
+クイズデータのキャッシュを使う条件と作り直す条件を確かめる回帰テスト
+
+quiz_othello ディレクトリで実行する：
+    python -m pytest tests
+"""
+
+import json
+import os
+import struct
+
+import pytest
+
+from quiz import quiz_cache
+from quiz.quiz_cache import CachedQuizList, QuizCache, cache_path_for, load_quizzes
+
+QUIZZES = {
+    "easy": [
+        {"question": "easy 0", "options": ["A", "B"], "correct_answer": 0, "tags": ["math"]},
+        {"question": "easy 1", "options": ["A", "B"], "correct_answer": 1},
+    ],
+    "hard": [{"question": "hard 0", "options": ["A", "B", "C"], "correct_answer": 2}],
+}
+
+
+def write_json(path, quizzes):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(quizzes, f, ensure_ascii=False)
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = str(tmp_path / "quiz_data.json")
+    write_json(path, QUIZZES)
+    return path
+
+
+@pytest.fixture
+def cache_writes(monkeypatch):
+    """
+    キャッシュを作った回数を数える
+    """
+    writes = []
+    write_cache = quiz_cache.write_cache
+    
+    def counting_write_cache(*args):
+        writes.append(args[0])
+        write_cache(*args)
+    monkeypatch.setattr(quiz_cache, "write_cache", counting_write_cache)
+    return writes
+
+
+def as_dicts(quizzes):
+    return {difficulty: [dict(quiz) for quiz in items] for difficulty, items in quizzes.items()}
+
+
+def test_cache_is_created_and_reused(data_file, cache_writes):
+    assert load_quizzes(data_file) == QUIZZES
+    assert os.path.exists(cache_path_for(data_file))
+    assert len(cache_writes) == 1
+    
+    quizzes = load_quizzes(data_file)
+    assert len(cache_writes) == 1
+    assert isinstance(quizzes["easy"], CachedQuizList)
+    assert as_dicts(quizzes) == QUIZZES
+
+
+def test_rewrite_with_same_size_and_mtime_rebuilds(data_file, cache_writes):
+    load_quizzes(data_file)
+    stat = os.stat(data_file)
+    
+    # 長さを変えずに内容を書き換え、更新時刻を元に戻す
+    changed = json.loads(json.dumps(QUIZZES))
+    changed["easy"][0]["question"] = "EASY 0"
+    write_json(data_file, changed)
+    os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert os.stat(data_file).st_size == stat.st_size
+    assert os.stat(data_file).st_mtime_ns == stat.st_mtime_ns
+    
+    assert as_dicts(load_quizzes(data_file)) == changed
+    assert len(cache_writes) == 2
+
+
+def test_size_change_rebuilds(data_file, cache_writes):
+    load_quizzes(data_file)
+    
+    changed = json.loads(json.dumps(QUIZZES))
+    changed["hard"].append({"question": "hard 1", "options": ["A", "B"], "correct_answer": 0})
+    write_json(data_file, changed)
+    
+    assert as_dicts(load_quizzes(data_file)) == changed
+    assert len(cache_writes) == 2
+
+
+def test_mtime_change_with_same_content_reuses_cache(data_file, cache_writes):
+    load_quizzes(data_file)
+    stat = os.stat(data_file)
+    new_mtime_ns = stat.st_mtime_ns + 5 * 10 ** 9
+    os.utime(data_file, ns=(stat.st_atime_ns, new_mtime_ns))
+    
+    assert as_dicts(load_quizzes(data_file)) == QUIZZES
+    assert len(cache_writes) == 1
+    
+    # 記録した更新時刻を書き直している
+    cache = QuizCache(cache_path_for(data_file))
+    try:
+        assert cache.source_mtime_ns == new_mtime_ns
+    finally:
+        cache.close()
+
+
+def test_corrupt_cache_rebuilds(data_file, cache_writes):
+    load_quizzes(data_file)
+    with open(cache_path_for(data_file), "r+b") as f:
+        f.write(struct.pack("<8s", b"garbage!"))
+    
+    assert as_dicts(load_quizzes(data_file)) == QUIZZES
+    assert len(cache_writes) == 2
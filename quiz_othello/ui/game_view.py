@@ -4,6 +4,7 @@
 
 import pygame
 from game.constants import BOARD_SIZE, BLACK, WHITE, EMPTY
+from ai.attack_ranking import AttackRanker
 
 
 class GameView:
@@ -41,6 +42,9 @@ class GameView:
         # アタックモードの初期化
         self.attack_mode = False
         
+        # アタックチャンスの対象の評価（局面が変わるまで結果を再利用する）
+        self.attack_ranker = AttackRanker()
+        
         # ボタンの初期化
         from .components import Button
         button_width = 150
@@ -138,7 +142,9 @@ class GameView:
                         pygame.draw.circle(screen, (0, 0, 0), (center_x, center_y), radius, 1)
     def highlight_opponent_stones(self, screen):
         """
-        相手の石をハイライト表示
+        相手の石をアタックチャンスの対象としての価値に応じてハイライト表示
+        
+        価値が高い石ほど濃い赤、低い石ほど薄い黄色で表示する
         
         Args:
             screen (pygame.Surface): 描画先の画面
@@ -148,23 +154,25 @@ class GameView:
             
         board = self.game_manager.board
         current_player = self.game_manager.get_current_player()
-        opponent_id = 1 - current_player.player_id
+        players = self.game_manager.players
+        attack_chances = (players[BLACK].attack_chances, players[WHITE].attack_chances)
         
-        # ハイライトの色（半透明の黄色）
-        highlight_color = (255, 255, 0, 128)
-        
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                if board.grid[row][col] == opponent_id:
-                    # 相手の石の中心座標
-                    center_x = self.board_x + (col + 0.5) * self.cell_size
-                    center_y = self.board_y + (row + 0.5) * self.cell_size
-                    radius = self.cell_size * 0.45
-                    
-                    # 半透明の円を描画
-                    s = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
-                    pygame.draw.circle(s, highlight_color, (radius, radius), radius)
-                    screen.blit(s, (center_x - radius, center_y - radius))
+        for target in self.attack_ranker.rank(board, current_player.player_id, attack_chances):
+            row, col = target["row"], target["col"]
+            value = target["value"]
+            
+            # ハイライトの色（半透明の黄色から赤色）
+            highlight_color = (255, int(255 * (1 - value)), 0, int(96 + 128 * value))
+            
+            # 相手の石の中心座標
+            center_x = self.board_x + (col + 0.5) * self.cell_size
+            center_y = self.board_y + (row + 0.5) * self.cell_size
+            radius = self.cell_size * 0.45
+            
+            # 半透明の円を描画
+            s = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(s, highlight_color, (radius, radius), radius)
+            screen.blit(s, (center_x - radius, center_y - radius))
     def draw_valid_moves(self, screen):
         """
         有効な手を表示
@@ -0,0 +1,47 @@
+"""
+メインループで処理するイベントのキューを提供するモジュール
+
+タイマーなど別のスレッドで起きた出来事は、ゲームの状態を直接変更せずに
+このキューに関数として積み、メインループ（main.py や画面を使わない実行）が
+1フレームに1回まとめて呼び出す。ゲームの状態を変更するのはメインループの
+スレッドだけになるため、描画の処理でロックを使う必要がない。
+キューは collections.deque の append と popleft だけを使うため、
+ロックを使わずに複数のスレッドから積むことができる。
+"""
+
+from collections import deque
+
+
+class EventQueue:
+    """別のスレッドからメインループに処理を渡すキュー"""
+    
+    def __init__(self):
+        self._events = deque()
+    
+    def __len__(self):
+        return len(self._events)
+    
+    def post(self, callback, *args):
+        """
+        メインループで呼び出す関数を積む（どのスレッドから呼んでもよい）
+        
+        Args:
+            callback (function): メインループで呼び出す関数
+            *args: 関数に渡す引数
+        """
+        self._events.append((callback, args))
+    
+    def drain(self):
+        """
+        積まれているイベントを順に処理する（メインループのスレッドから呼ぶ）
+        
+        処理中に積まれたイベントは次の呼び出しで処理する。
+        
+        Returns:
+            int: 処理したイベントの数
+        """
+        count = len(self._events)
+        for _ in range(count):
+            callback, args = self._events.popleft()
+            callback(*args)
+        return count